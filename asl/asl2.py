@@ -1,11 +1,16 @@
 import cv2
-import numpy as np
 import mediapipe as mp
 import speech_recognition as sr
-import pytesseract
 from datetime import datetime
 import os
 import logging
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'iterationOFcode'))
+
+from asl_rules import classify, hand_array
+from motion_letters import MotionRecognizer
+from ocr_worker import OCRWorker, tesseract_ocr
 
 # Set up logging
 logging.basicConfig(
@@ -18,7 +23,7 @@ logging.basicConfig(
 )
 
 class EnhancedASLDetector:
-    def __init__(self):
+    def __init__(self, ocr=tesseract_ocr):
         # Initialize ASL detection components
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
@@ -28,6 +33,8 @@ class EnhancedASLDetector:
             min_tracking_confidence=0.5
         )
         self.mp_draw = mp.solutions.drawing_utils
+        # J and Z are drawn in the air; the rules only see the handshape
+        self.motion = MotionRecognizer()
         
         # Initialize speech recognition
         self.recognizer = sr.Recognizer()
@@ -45,6 +52,10 @@ class EnhancedASLDetector:
         self.output_dir = 'detection_results'
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # TEXT mode: OCR on a background thread, only when the scene changes;
+        # `ocr` can be any frame -> letters function, e.g. a stand-in for testing
+        self.ocr = OCRWorker(ocr, on_text=self.save_text).start()
+        
         # Calibrate the speech recognition for ambient noise
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source)
@@ -85,196 +96,15 @@ class EnhancedASLDetector:
             logging.error(f"Could not request results: {e}")
             return None, None
 
-    def detect_text_in_image(self, frame):
-        try:
-            # Convert frame to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Apply thresholding to preprocess the image
-            gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-            
-            # Apply some image processing to improve text detection
-            gray = cv2.medianBlur(gray, 3)
-            
-            # Perform text detection
-            text = pytesseract.image_to_string(gray, config='--psm 11')
-            
-            # Clean and process the detected text
-            if text.strip():
-                letters = list(text.upper().replace(' ', '').replace('\n', ''))
-                if letters:
-                    filename = self.save_to_file(letters, 'text')
-                    logging.info(f"Text detected: {''.join(letters)}")
-                    return letters, filename
-            return None, None
-        except Exception as e:
-            logging.error(f"Error in text detection: {e}")
-            return None, None
-
-    def get_finger_states(self, landmarks):
-        # Get fingertip and pip (second joint) y-coordinates
-        fingertips = [8, 12, 16, 20]  # Index, middle, ring, pinky
-        pips = [6, 10, 14, 18]        # Second joints
-        
-        # Compare y-coordinates for each finger (except thumb)
-        states = []
-        for tip, pip in zip(fingertips, pips):
-            states.append(landmarks[tip].y < landmarks[pip].y)
-        
-        # Special case for thumb
-        thumb_extended = (landmarks[4].x < landmarks[3].x if landmarks[0].x < 0.5 
-                         else landmarks[4].x > landmarks[3].x)
-        states.insert(0, thumb_extended)
-        
-        return states
-
-    def get_finger_angles(self, landmarks):
-        angles = []
-        fingers = [
-            [1,2,3,4],    # thumb
-            [5,6,7,8],    # index
-            [9,10,11,12], # middle
-            [13,14,15,16],# ring
-            [17,18,19,20] # pinky
-        ]
-        
-        for finger in fingers:
-            angle = self.calculate_angle(
-                landmarks[finger[0]], 
-                landmarks[finger[1]],
-                landmarks[finger[2]]
-            )
-            angles.append(angle)
-            
-        return angles
-
-    def calculate_angle(self, p1, p2, p3):
-        vector1 = np.array([p1.x - p2.x, p1.y - p2.y])
-        vector2 = np.array([p3.x - p2.x, p3.y - p2.y])
-        
-        cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2))
-        angle = np.arccos(np.clip(cosine, -1.0, 1.0))
-        return np.degrees(angle)
+    def save_text(self, letters):
+        # Called once per new text the OCR worker reads, not once per frame
+        logging.info(f"Text detected: {''.join(letters)}")
+        return self.save_to_file(letters, 'text')
 
     def detect_letter(self, landmarks):
-        states = self.get_finger_states(landmarks.landmark)
-        angles = self.get_finger_angles(landmarks.landmark)
-        
-        # Key points
-        thumb_tip = landmarks.landmark[4]
-        index_tip = landmarks.landmark[8]
-        middle_tip = landmarks.landmark[12]
-        ring_tip = landmarks.landmark[16]
-        pinky_tip = landmarks.landmark[20]
-        
-        # A: Fist with thumb out
-        if all(not state for state in states[1:]) and states[0]:
-            return 'A'
-        
-        # B: Flat hand, fingers together
-        elif all(state for state in states) and all(abs(landmarks.landmark[tip].x - landmarks.landmark[8].x) < 0.03 
-                                                  for tip in [12, 16, 20]):
-            return 'B'
-        
-        # C: Curved hand
-        elif (not any(states) and angles[1] < 130 and angles[2] < 130 
-              and abs(thumb_tip.x - index_tip.x) < 0.1):
-            return 'C'
-        
-        # D: Index up, others closed
-        elif states[1] and not any(states[2:]) and thumb_tip.y > index_tip.y:
-            return 'D'
-        
-        # E: All fingers closed
-        elif not any(states):
-            return 'E'
-        
-        # F: Index and thumb connected, others extended
-        elif not states[0] and all(states[1:]) and abs(index_tip.x - middle_tip.x) < 0.02:
-            return 'F'
-        
-        # G: Index pointing at thumb
-        elif states[1] and not any(states[2:]) and abs(thumb_tip.y - index_tip.y) < 0.05:
-            return 'G'
-        
-        # H: Index and middle out sideways
-        elif states[1] and states[2] and not states[3] and not states[4] and abs(index_tip.x - middle_tip.x) > 0.05:
-            return 'H'
-        
-        # I: Pinky only
-        elif not states[1] and not states[2] and not states[3] and states[4]:
-            return 'I'
-        
-        # J: Same as I with motion (simplified to I)
-        elif not states[1] and not states[2] and not states[3] and states[4]:
-            return 'J'
-        
-        # K: Index and middle up, thumb at middle joint
-        elif states[1] and states[2] and not states[3] and not states[4] and abs(thumb_tip.y - landmarks.landmark[10].y) < 0.05:
-            return 'K'
-        
-        # L: L-shape with thumb and index
-        elif states[0] and states[1] and not any(states[2:]) and abs(thumb_tip.x - index_tip.x) > 0.1:
-            return 'L'
-        
-        # M: Three fingers over thumb
-        elif not states[0] and states[1] and states[2] and states[3] and not states[4]:
-            return 'M'
-        
-        # N: Two fingers over thumb
-        elif not states[0] and states[1] and states[2] and not states[3] and not states[4]:
-            return 'N'
-        
-        # O: Circle shape
-        elif (not any(states) and all(abs(landmarks.landmark[tip].x - landmarks.landmark[4].x) < 0.05 
-              for tip in [8, 12, 16, 20])):
-            return 'O'
-        
-        # P: Two finger gun pointing down
-        elif states[1] and not any(states[2:]) and thumb_tip.y < index_tip.y:
-            return 'P'
-        
-        # Q: Two finger gun pointing down and to the side
-        elif states[1] and not any(states[2:]) and index_tip.y > landmarks.landmark[6].y:
-            return 'Q'
-        
-        # R: Crossed fingers
-        elif all(state for state in states) and abs(index_tip.x - middle_tip.x) > 0.02:
-            return 'R'
-        
-        # S: Fist with thumb over fingers
-        elif not any(states[1:]) and states[0] and thumb_tip.x > index_tip.x:
-            return 'S'
-        
-        # T: Index bent, thumb between index and middle
-        elif not states[1] and not states[2] and states[0]:
-            return 'T'
-        
-        # U: Index and middle parallel
-        elif states[1] and states[2] and not states[3] and not states[4] and abs(index_tip.x - middle_tip.x) < 0.02:
-            return 'U'
-        
-        # V: Peace sign
-        elif states[1] and states[2] and not states[3] and not states[4] and abs(index_tip.x - middle_tip.x) > 0.04:
-            return 'V'
-        
-        # W: Three fingers up
-        elif states[1] and states[2] and states[3] and not states[4]:
-            return 'W'
-        
-        # X: Hook shape with index
-        elif states[1] and not any(states[2:]) and angles[1] < 90:
-            return 'X'
-        
-        # Y: Thumb and pinky out only
-        elif states[0] and states[4] and not any(states[1:4]):
-            return 'Y'
-        
-        # Z: Same as Z with motion (simplified to Z)
-        elif states[1] and not any(states[2:]) and angles[1] > 150:
-            return 'Z'
-        
-        return None
+        # The letter rules live in iterationOFcode/asl_rules.py as one table
+        hand = hand_array(landmarks)
+        return self.motion.update(hand) or classify(hand)
 
     def process_frame(self, frame):
         if self.current_mode == self.MODES['ASL']:
@@ -291,17 +121,20 @@ class EnhancedASLDetector:
                 if detected_letter:
                     cv2.putText(frame, f"Detected: {detected_letter}", (10, 50),
                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            else:
+                self.motion.reset()
 
             return frame, detected_letter, None
 
         elif self.current_mode == self.MODES['TEXT']:
-            # Text detection mode
-            letters, filename = self.detect_text_in_image(frame)
+            # Text detection mode: hand the frame to the OCR worker, show its latest read
+            self.ocr.submit(frame)
+            letters = self.ocr.latest
             if letters:
                 text_display = ','.join(letters)
                 cv2.putText(frame, f"Detected Text: {text_display}", (10, 50),
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            return frame, letters, filename
+            return frame, letters, None
 
         return frame, None, None
 
@@ -353,7 +186,7 @@ def main():
                     print(f"Voice input detected: {','.join(letters)}")
                     print(f"Saved to {filename}")
                 detector.current_mode = detector.MODES['ASL']
-	    elif key == 13 and detection:  # Enter key
+            elif key == 13 and detection:  # Enter key
                 filename = detector.save_to_file(detection, 'asl')
                 if filename:
                     print(f"Saved detection {detection} to {filename}")
@@ -373,6 +206,8 @@ def main():
     finally:
         # Clean up
         try:
+            detector.ocr.stop()
+            logging.info(detector.ocr.summary())
             cap.release()
             cv2.destroyAllWindows()
             logging.info("Resources released successfully")
@@ -0,0 +1,185 @@
+"""Rule-based letter detection for asl.py, as a table evaluated with NumPy.
+
+Each rule is a letter, a finger-state pattern over (thumb, index, middle,
+ring, pinky) -- '1' extended, '0' curled, '.' either -- and zero or more
+extra conditions on landmark coordinates and joint angles. Rules are tried
+in table order and the first match wins, as the old elif chain did.
+
+The table is plain data: patterns and condition tuples. match_rules
+evaluates it column by column over a whole (N, 21, 3) recording in one
+call, and classify_one walks it with scalar math for a single live hand:
+
+    classify(hand_array(hand_landmarks))      # -> 'B' or None
+    classify(store.landmarks)                 # -> (N,) object array
+"""
+import math
+import operator
+from itertools import chain
+
+import numpy as np
+
+from featurizer import NUM_LANDMARKS
+
+FINGERTIPS = np.array([8, 12, 16, 20])  # Index, middle, ring, pinky
+PIPS = np.array([6, 10, 14, 18])        # Second joints
+# (base, joint, next) per finger; the angle is measured at the joint
+ANGLE_JOINTS = np.array([[1, 2, 3], [5, 6, 7], [9, 10, 11], [13, 14, 15], [17, 18, 19]])
+
+# Plain-list copies for the single-hand path
+_TIPS_PIPS = list(zip(FINGERTIPS.tolist(), PIPS.tolist()))
+_ANGLE_JOINTS = ANGLE_JOINTS.tolist()
+
+
+def hand_array(hand_landmarks):
+    """One MediaPipe hand as a (21, 3) float64 array"""
+    return np.fromiter(chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark),
+                       dtype=np.float64, count=NUM_LANDMARKS * 3).reshape(NUM_LANDMARKS, 3)
+
+
+def finger_states(landmarks):
+    """(..., 5) bool, True where the finger is extended"""
+    x = landmarks[..., 0]
+    y = landmarks[..., 1]
+    fingers = y[..., FINGERTIPS] < y[..., PIPS]
+    # Which way an extended thumb points depends on which side of the frame the hand is on
+    thumb = np.where(x[..., 0] < 0.5, x[..., 4] < x[..., 3], x[..., 4] > x[..., 3])
+    return np.concatenate([thumb[..., None], fingers], axis=-1)
+
+
+def finger_angles(landmarks):
+    """(..., 5) angle in degrees at each finger's second joint, in the image plane"""
+    xy = landmarks[..., :2]
+    v1 = xy[..., ANGLE_JOINTS[:, 0], :] - xy[..., ANGLE_JOINTS[:, 1], :]
+    v2 = xy[..., ANGLE_JOINTS[:, 2], :] - xy[..., ANGLE_JOINTS[:, 1], :]
+    dot = v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]
+    norms = np.sqrt(v1[..., 0] ** 2 + v1[..., 1] ** 2) * np.sqrt(v2[..., 0] ** 2 + v2[..., 1] ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.degrees(np.arccos(np.clip(dot / norms, -1.0, 1.0)))
+
+
+OPS = {'<': operator.lt, '>': operator.gt}
+
+# Conditions:  ('dx' | 'dy', a, b, op, t)   |coord[a] - coord[b]| op t
+#              ('x' | 'y', a, op, b)        coord[a] op coord[b]
+#              ('angle', finger, op, t)     finger_angles()[finger] op t
+RULES = [
+    ('A', '10000', []),                                                      # Fist with thumb out
+    ('B', '11111', [('dx', tip, 8, '<', 0.03) for tip in (12, 16, 20)]),     # Flat hand, fingers together
+    ('C', '00000', [('angle', 1, '<', 130), ('angle', 2, '<', 130),
+                    ('dx', 4, 8, '<', 0.1)]),                                # Curved hand
+    ('D', '.1000', [('y', 4, '>', 8)]),                                      # Index up, others closed
+    ('E', '00000', []),                                                      # All fingers closed
+    ('F', '01111', [('dx', 8, 12, '<', 0.02)]),                              # Index and thumb connected
+    ('G', '.1000', [('dy', 4, 8, '<', 0.05)]),                               # Index pointing at thumb
+    ('H', '.1100', [('dx', 8, 12, '>', 0.05)]),                              # Index and middle sideways
+    ('I', '.0001', []),                                                      # Pinky only
+    ('J', '.0001', []),                                                      # I with motion; shadowed by I
+    ('K', '.1100', [('dy', 4, 10, '<', 0.05)]),                              # Thumb at middle joint
+    ('L', '11000', [('dx', 4, 8, '>', 0.1)]),                                # L-shape
+    ('M', '01110', []),                                                      # Three fingers over thumb
+    ('N', '01100', []),                                                      # Two fingers over thumb
+    ('O', '00000', [('dx', tip, 4, '<', 0.05) for tip in (8, 12, 16, 20)]),  # Circle
+    ('P', '.1000', [('y', 4, '<', 8)]),                                      # Finger gun pointing down
+    ('Q', '.1000', [('y', 8, '>', 6)]),                                      # ... and to the side
+    ('R', '11111', [('dx', 8, 12, '>', 0.02)]),                              # Crossed fingers
+    ('S', '10000', [('x', 4, '>', 8)]),                                      # Thumb over fingers
+    ('T', '100..', []),                                                      # Thumb between index and middle
+    ('U', '.1100', [('dx', 8, 12, '<', 0.02)]),                              # Index and middle parallel
+    ('V', '.1100', [('dx', 8, 12, '>', 0.04)]),                              # Peace sign
+    ('W', '.1110', []),                                                      # Three fingers up
+    ('X', '.1000', [('angle', 1, '<', 90)]),                                 # Hook with index
+    ('Y', '10001', []),                                                      # Thumb and pinky out
+    ('Z', '.1000', [('angle', 1, '>', 150)]),                                # Index with motion
+]
+
+LETTERS = np.array([letter for letter, _, _ in RULES] + [None], dtype=object)
+_CARE = np.array([[c != '.' for c in pattern] for _, pattern, _ in RULES])
+_WANT = np.array([[c == '1' for c in pattern] for _, pattern, _ in RULES])
+# The same patterns as bit masks over (thumb << 4 | index << 3 | ... | pinky) for single hands
+_CARE_BITS = [int(pattern.replace('1', 'x').replace('0', 'x').replace('.', '0').replace('x', '1'), 2)
+              for _, pattern, _ in RULES]
+_WANT_BITS = [int(pattern.replace('.', '0'), 2) for _, pattern, _ in RULES]
+
+
+def _condition(kind, args, x, y, angles):
+    """Evaluate one condition on (N, 21) arrays or on per-landmark lists"""
+    if kind == 'dx' or kind == 'dy':
+        a, b, op, t = args
+        coord = x if kind == 'dx' else y
+        return OPS[op](abs(coord[a] - coord[b]), t)
+    if kind == 'x' or kind == 'y':
+        a, op, b = args
+        coord = x if kind == 'x' else y
+        return OPS[op](coord[a], coord[b])
+    finger, op, t = args
+    return OPS[op](angles()[finger], t)
+
+
+def match_rules(landmarks):
+    """(N, R) bool per (N, 21, 3) hands; only the first True in a row is meaningful"""
+    x = landmarks[:, :, 0].T
+    y = landmarks[:, :, 1].T
+    angles = finger_angles(landmarks).T
+    states = finger_states(landmarks)
+    matches = ((states[:, None, :] == _WANT) | ~_CARE).all(axis=2)
+    undecided = np.ones(len(landmarks), dtype=bool)
+    for r, (_, _, conditions) in enumerate(RULES):
+        rows = matches[:, r]
+        # Conditions only matter for hands no earlier rule has claimed
+        rows &= undecided
+        for kind, *args in conditions:
+            if not rows.any():
+                break
+            rows &= _condition(kind, args, x, y, lambda: angles)
+        undecided &= ~rows
+        if not undecided.any():
+            matches[:, r + 1:] = False
+            break
+    return matches
+
+
+def _single_angle(x, y, finger):
+    a, b, c = _ANGLE_JOINTS[finger]
+    v1x, v1y = x[a] - x[b], y[a] - y[b]
+    v2x, v2y = x[c] - x[b], y[c] - y[b]
+    norms = math.sqrt(v1x * v1x + v1y * v1y) * math.sqrt(v2x * v2x + v2y * v2y)
+    if norms == 0:
+        return math.nan
+    return math.degrees(math.acos(max(-1.0, min(1.0, (v1x * v2x + v1y * v2y) / norms))))
+
+
+def classify_one(landmarks):
+    """classify() for one (21, 3) hand: the same table walked with scalar math.
+
+    NumPy's per-call overhead dominates on a single hand, so the first
+    matching rule is found on plain floats and the table is left early.
+    """
+    x = landmarks[:, 0].tolist()
+    y = landmarks[:, 1].tolist()
+    thumb = x[4] < x[3] if x[0] < 0.5 else x[4] > x[3]
+    bits = thumb << 4
+    for i, (tip, pip) in enumerate(_TIPS_PIPS):
+        bits |= (y[tip] < y[pip]) << (3 - i)
+    angles = {}
+
+    def lazy_angles():
+        if not angles:
+            angles.update((f, _single_angle(x, y, f)) for f in range(len(_ANGLE_JOINTS)))
+        return angles
+
+    for (letter, _, conditions), care, want in zip(RULES, _CARE_BITS, _WANT_BITS):
+        if bits & care == want and all(_condition(kind, args, x, y, lazy_angles)
+                                       for kind, *args in conditions):
+            return letter
+    return None
+
+
+def classify(landmarks):
+    """First matching letter (or None) for a (21, 3) hand or each of (N, 21, 3)"""
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.ndim == 2:
+        return classify_one(landmarks)
+    matches = match_rules(landmarks)
+    # argmax finds the first True; rows with no match fall through to the None slot
+    first = np.where(matches.any(axis=1), matches.argmax(axis=1), len(RULES))
+    return LETTERS[first]
@@ -0,0 +1,115 @@
+"""Random landmark-space augmentation for training, vectorized over (N, 21, 3) arrays.
+
+The min-shifted features keep the hand's size, angle and which hand signed,
+so a model trained on one person's captures is thrown by a bigger hand, a
+tilted wrist or a left-handed signer. Augmenter makes new samples from
+existing landmarks instead of capturing more images: every call draws a
+fresh random transform per sample
+
+    - mirroring (probability `mirror`), which also swaps the handedness code,
+    - in-plane rotation up to +-`rotation` degrees about the hand's centre,
+    - scaling by 1 +- `scale`,
+    - a perspective warp foreshortening up to `perspective` across the hand,
+    - per-landmark Gaussian jitter of `jitter` (in normalized image units).
+
+Coordinates are normalized to the frame's width and height, so x is
+stretched by `aspect` (width / height) while rotating and warping, which
+keeps a rotated hand the shape a camera would see.
+
+    augmenter = Augmenter(seed=0)
+    xyz, handedness = augmenter(store.landmarks, store.handedness)
+    fit_augmented(model, store.landmarks, store.label_names(), augmenter, copies=2)
+
+bench_augment.py reports the throughput.
+"""
+import numpy as np
+
+from featurizer import DEFAULT_FEATURES, compute_features, feature_set_of
+from landmark_store import HANDEDNESS_LEFT, HANDEDNESS_RIGHT
+
+
+class Augmenter:
+    def __init__(self, rotation=15.0, scale=0.15, jitter=0.003, mirror=0.5, perspective=0.15,
+                 aspect=640 / 480, seed=None):
+        self.rotation = rotation
+        self.scale = scale
+        self.jitter = jitter
+        self.mirror = mirror
+        self.perspective = perspective
+        self.aspect = aspect
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, landmarks, handedness=None):
+        """Augmented float32 copy of (N, 21, 3) landmarks, and the handedness codes after mirroring"""
+        xyz = np.asarray(landmarks, dtype=np.float64)
+        n = len(xyz)
+        rng = self.rng
+
+        # Square units centred on each hand
+        x = xyz[..., 0] * self.aspect
+        y = xyz[..., 1]
+        cx = x.mean(axis=1, keepdims=True)
+        cy = y.mean(axis=1, keepdims=True)
+        u, v = x - cx, y - cy
+        size = np.maximum(np.ptp(u, axis=1), np.ptp(v, axis=1))[:, None]
+        size[size == 0] = 1.0
+
+        flip = rng.random(n) < self.mirror
+        u[flip] = -u[flip]
+
+        angle = np.radians(rng.uniform(-self.rotation, self.rotation, (n, 1)))
+        cos, sin = np.cos(angle), np.sin(angle)
+        u, v = u * cos - v * sin, u * sin + v * cos
+
+        # Projective divide over hand-size units: the far side shrinks, the near side grows
+        tilt = rng.uniform(-self.perspective, self.perspective, (2, n, 1))
+        factor = rng.uniform(1 - self.scale, 1 + self.scale, (n, 1))
+        factor = factor / (1 + (tilt[0] * u + tilt[1] * v) / size)
+
+        out = np.empty(xyz.shape, dtype=np.float32)
+        out[..., 0] = (cx + u * factor) / self.aspect
+        out[..., 1] = cy + v * factor
+        out[..., 2] = xyz[..., 2] * factor
+        if self.jitter:
+            out[..., :2] += rng.normal(0, self.jitter, (n, xyz.shape[1], 2))
+
+        if handedness is not None:
+            handedness = np.array(handedness, dtype=np.int8)
+            left, right = flip & (handedness == HANDEDNESS_LEFT), flip & (handedness == HANDEDNESS_RIGHT)
+            handedness[left], handedness[right] = HANDEDNESS_RIGHT, HANDEDNESS_LEFT
+        return out, handedness
+
+    def batches(self, landmarks, labels, feature_set=DEFAULT_FEATURES, batch_size=4096):
+        """Yield (features, labels) for one augmented pass over the data, batch_size rows at a time"""
+        for start in range(0, len(landmarks), batch_size):
+            xyz, _ = self(landmarks[start:start + batch_size])
+            yield compute_features(xyz, feature_set), labels[start:start + batch_size]
+
+
+def fit_augmented(model, landmarks, labels, augmenter, copies=1):
+    """Fit model on the original samples plus augmented ones.
+
+    A model with partial_fit and an epoch count (NumpyMLP) gets fresh
+    augmentations every epoch, generated on the fly: each epoch is one pass
+    over the originals and `copies` augmented passes. Other models are fit
+    once on the originals plus `copies` augmented copies. Rows use the
+    model's feature set.
+    """
+    labels = np.asarray(labels)
+    feature_set = feature_set_of(model)
+    original = compute_features(landmarks, feature_set)
+
+    def training_set():
+        X, y = [original], [labels]
+        for _ in range(copies):
+            for features, batch_labels in augmenter.batches(landmarks, labels, feature_set):
+                X.append(features)
+                y.append(batch_labels)
+        return np.concatenate(X), np.concatenate(y)
+
+    if hasattr(model, 'partial_fit') and hasattr(model, 'epochs'):
+        classes = np.unique(labels)
+        for _ in range(model.epochs):
+            model.partial_fit(*training_set(), classes=classes)
+        return model
+    return model.fit(*training_set())
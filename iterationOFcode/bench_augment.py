@@ -0,0 +1,56 @@
+"""Throughput of augment.Augmenter in samples/sec, with and without featurizing.
+
+    python bench_augment.py [--store ./landmarks] [--batch-sizes 64 1024 16384]
+
+Uses the landmark store when there is one, random hands otherwise. "features"
+is augment + minshift_features, i.e. what fit_augmented feeds the model.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from augment import Augmenter
+from featurizer import NUM_LANDMARKS, minshift_features
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+
+
+def samples_per_second(fn, landmarks, batch_size, seconds):
+    batches = [landmarks[i:i + batch_size] for i in range(0, len(landmarks) - batch_size + 1, batch_size)]
+    fn(batches[0])
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for batch in batches:
+            fn(batch)
+            done += len(batch)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[64, 1024, 16384])
+    parser.add_argument('--seconds', type=float, default=1.0, help='time spent per measurement')
+    args = parser.parse_args()
+
+    if LandmarkStore.exists(args.store):
+        landmarks = np.asarray(LandmarkStore.open(args.store, mmap_mode=None).landmarks)
+        print(f"{len(landmarks)} hands from {args.store}")
+    else:
+        landmarks = np.random.default_rng(0).random((20000, NUM_LANDMARKS, 3), dtype=np.float32)
+        print(f"No store at {args.store}; {len(landmarks)} random hands")
+    # Enough rows for the biggest batch
+    landmarks = np.resize(landmarks, (max(len(landmarks), max(args.batch_sizes)),) + landmarks.shape[1:])
+
+    augmenter = Augmenter(seed=0)
+    print(f"{'batch':>7s} {'augment':>14s} {'+ features':>14s}")
+    for batch_size in args.batch_sizes:
+        augment = samples_per_second(augmenter, landmarks, batch_size, args.seconds)
+        features = samples_per_second(lambda batch: minshift_features(augmenter(batch)[0]),
+                                      landmarks, batch_size, args.seconds)
+        print(f"{batch_size:7d} {augment:10.0f}/s {features:10.0f}/s")
+
+
+if __name__ == '__main__':
+    main()
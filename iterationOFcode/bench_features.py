@@ -0,0 +1,72 @@
+"""Accuracy vs. per-frame cost of every featurizer feature set.
+
+    python bench_features.py [--store ./landmarks] [--models mlp small_forest]
+                             [--sets minshift wrist_normalized+joint_angles]
+
+Each feature set is trained on the same stratified 80/20 split of the store.
+"test" is accuracy on the held-out 20%; "moved" is accuracy on the same rows
+after augment.Augmenter turns, scales and tilts them (no mirroring), i.e. how
+well a set copes with a hand held differently from the captures. The us
+columns are per frame: Featurizer on one MediaPipe-style hand, and
+predict_proba on its row, as the inference loops call them.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from augment import Augmenter
+from featurizer import FEATURE_SETS, Featurizer, compute_features
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+from model_registry import make_model
+
+
+def time_per_frame(fn, items):
+    fn(items[0])
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--models', nargs='+', default=['mlp', 'small_forest'])
+    parser.add_argument('--sets', nargs='+',
+                        default=list(FEATURE_SETS) + ['wrist_normalized+fingertip_distances+joint_angles'])
+    parser.add_argument('--frames', type=int, default=2000, help='hands timed per measurement')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not LandmarkStore.exists(args.store):
+        raise SystemExit(f"No landmark store at {args.store}; run create_dataset.py first")
+    store = LandmarkStore.open(args.store, mmap_mode=None)
+    labels = store.label_names()
+    train, test = train_test_split(np.arange(len(store)), test_size=0.2, stratify=labels,
+                                   random_state=args.seed)
+    moved, _ = Augmenter(mirror=0.0, jitter=0.0, seed=args.seed)(store.landmarks[test])
+    hands = [SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])
+             for hand in store.landmarks[test[:args.frames]]]
+
+    print(f"{len(train)} train / {len(test)} test samples, {len(store.classes)} classes")
+    print(f"{'feature set':50s} {'n':>4s} {'model':>13s} {'test':>7s} {'moved':>7s} "
+          f"{'features':>9s} {'predict':>9s}")
+    for feature_set in args.sets:
+        data = store.features(feature_set=feature_set)
+        featurizer = Featurizer(feature_set)
+        featurize_s = time_per_frame(featurizer, hands)
+        rows = [featurizer(hand).copy() for hand in hands]
+        for name in args.models:
+            model = make_model(name, feature_set).fit(data[train], labels[train])
+            accuracy = np.mean(model.predict(data[test]) == labels[test])
+            moved_accuracy = np.mean(model.predict(compute_features(moved, feature_set)) == labels[test])
+            predict_s = time_per_frame(model.predict_proba, rows)
+            print(f"{feature_set:50s} {data.shape[1]:4d} {name:>13s} {accuracy:7.1%} {moved_accuracy:7.1%} "
+                  f"{featurize_s * 1e6:7.1f}us {predict_s * 1e6:7.1f}us")
+
+
+if __name__ == '__main__':
+    main()
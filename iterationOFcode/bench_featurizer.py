@@ -0,0 +1,75 @@
+"""Micro-benchmark: per-frame feature extraction, old Python loops vs Featurizer.
+
+    python bench_featurizer.py [--frames 20000]
+
+Uses synthetic landmark objects with the same .x/.y/.z attribute access as
+MediaPipe's protobuf landmarks, so it runs without a camera or MediaPipe.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from featurizer import Featurizer, minshift_features
+
+
+def legacy_features(hand_landmarks):
+    """The loop every inference script used to inline"""
+    data_aux = []
+    x_ = []
+    y_ = []
+    for i in range(len(hand_landmarks.landmark)):
+        x = hand_landmarks.landmark[i].x
+        y = hand_landmarks.landmark[i].y
+        x_.append(x)
+        y_.append(y)
+
+    for i in range(len(hand_landmarks.landmark)):
+        x = hand_landmarks.landmark[i].x
+        y = hand_landmarks.landmark[i].y
+        data_aux.append(x - min(x_))
+        data_aux.append(y - min(y_))
+    return [np.asarray(data_aux)]
+
+
+def fake_hands(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # float32 values, like MediaPipe's NormalizedLandmark fields
+    coords = rng.random((n, 21, 3), dtype=np.float32)
+    return coords, [SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                              for x, y, z in hand])
+                    for hand in coords]
+
+
+def time_per_frame(fn, hands):
+    start = time.perf_counter()
+    for hand in hands:
+        fn(hand)
+    return (time.perf_counter() - start) / len(hands)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    coords, hands = fake_hands(args.frames)
+    featurizer = Featurizer()
+
+    # Inference, training and the old loops must agree bit for bit
+    training = minshift_features(coords)
+    for i, hand in enumerate(hands[:1000]):
+        legacy = legacy_features(hand)[0]
+        assert np.array_equal(legacy, featurizer(hand)[0]), f"inference mismatch at frame {i}"
+        assert np.array_equal(legacy, training[i]), f"training mismatch at frame {i}"
+
+    legacy_s = time_per_frame(legacy_features, hands)
+    new_s = time_per_frame(featurizer, hands)
+    print(f"frames:      {args.frames}")
+    print(f"legacy loop: {legacy_s * 1e6:8.2f} us/frame")
+    print(f"Featurizer:  {new_s * 1e6:8.2f} us/frame  ({legacy_s / new_s:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Per-frame cost of hand_kinematics vs. the per-finger loops it replaced.
+
+    python bench_hand_kinematics.py [--store ./landmarks] [--frames 2000]
+
+"mimic" is mimic_fingers.py's servo stage: angles of one MediaPipe-style
+hand, 5-frame smoothing and servo targets. "mirror" is hand_mirror.py's 2D
+bend to servo values. The legacy rows are the old code copied here; the new
+rows include results_landmarks' copy out of the protobuf-like hand. "batch"
+is Kinematics on a whole (T, 21, 3) array, e.g. a session log. Each row
+also reports the largest difference from the legacy output.
+"""
+import argparse
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+from featurizer import NUM_LANDMARKS
+from filters import MovingAverage
+from hand_kinematics import Kinematics
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+from multi_hand import results_landmarks
+
+TIPS, PIPS, MCPS = [4, 8, 12, 16, 20], [3, 7, 11, 15, 19], [2, 6, 10, 14, 18]
+MIRROR_FINGERS = [[1, 2, 4], [5, 6, 8], [9, 10, 12], [13, 14, 16], [17, 18, 20]]
+
+
+class LegacyMimic:
+    """HandTracker.calculate_finger_angles and map_angle_to_servo before hand_kinematics"""
+
+    def __init__(self):
+        self.angle_buffers = [deque(maxlen=5) for _ in range(5)]
+
+    def __call__(self, results):
+        hand = results.multi_hand_landmarks[0]
+        angles = []
+        for finger in range(5):
+            tip = np.array([hand.landmark[TIPS[finger]].x, hand.landmark[TIPS[finger]].y,
+                            hand.landmark[TIPS[finger]].z])
+            pip = np.array([hand.landmark[PIPS[finger]].x, hand.landmark[PIPS[finger]].y,
+                            hand.landmark[PIPS[finger]].z])
+            mcp = np.array([hand.landmark[MCPS[finger]].x, hand.landmark[MCPS[finger]].y,
+                            hand.landmark[MCPS[finger]].z])
+            v1, v2 = pip - mcp, tip - pip
+            angle = np.degrees(np.arccos(np.clip(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)),
+                                                 -1.0, 1.0)))
+            self.angle_buffers[finger].append(angle)
+            angles.append(sum(self.angle_buffers[finger]) / len(self.angle_buffers[finger]))
+        return [np.interp(angle, [0, 90] if finger == 0 else [0, 110], [375, 150])
+                for finger, angle in enumerate(angles)]
+
+
+def legacy_mirror(results):
+    """hand_mirror.get_finger_positions + map_to_servo_values before hand_kinematics"""
+    hand = results.multi_hand_landmarks[0]
+    servo_values = []
+    for finger in MIRROR_FINGERS:
+        p1, p2, p3 = [hand.landmark[i] for i in finger]
+        v1 = np.array([p1.x - p2.x, p1.y - p2.y])
+        v2 = np.array([p3.x - p2.x, p3.y - p2.y])
+        angle = np.degrees(np.arccos(np.clip(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)),
+                                             -1.0, 1.0)))
+        bend = min(max((180 - angle) / 90, 0), 1)
+        servo_values.append(int(375 - bend * (375 - 150)))
+    return servo_values
+
+
+def new_mimic(kinematics, smoother):
+    def run(results):
+        landmarks, _ = results_landmarks(results)
+        return kinematics.servo_targets(smoother(kinematics.angles(landmarks[0])))
+    return run
+
+
+def new_mirror(kinematics):
+    def run(results):
+        landmarks, _ = results_landmarks(results, 1)
+        return kinematics.servo_targets(kinematics.angles(landmarks[0])).astype(int).tolist()
+    return run
+
+
+def per_frame(fn, frames):
+    """Seconds per frame, and every frame's output"""
+    fn(frames[0])
+    start = time.perf_counter()
+    outputs = [fn(frame) for frame in frames]
+    return (time.perf_counter() - start) / len(frames), np.array(outputs, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--frames', type=int, default=2000)
+    args = parser.parse_args()
+
+    if LandmarkStore.exists(args.store):
+        landmarks = np.asarray(LandmarkStore.open(args.store, mmap_mode=None).landmarks[:args.frames],
+                               dtype=np.float64)
+        print(f"{len(landmarks)} hands from {args.store}")
+    else:
+        landmarks = np.random.default_rng(0).random((args.frames, NUM_LANDMARKS, 3))
+        print(f"No store at {args.store}; {len(landmarks)} random hands")
+    frames = [SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(
+                  landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])])
+              for hand in landmarks]
+
+    mimic, mirror = Kinematics.load('mimic', ranges_file=''), Kinematics.load('mirror', ranges_file='')
+    legacy_mimic_s, legacy_mimic_out = per_frame(LegacyMimic(), frames)
+    mimic_s, mimic_out = per_frame(new_mimic(mimic, MovingAverage(5)), frames)
+    legacy_mirror_s, legacy_mirror_out = per_frame(legacy_mirror, frames)
+    mirror_s, mirror_out = per_frame(new_mirror(mirror), frames)
+
+    start = time.perf_counter()
+    _, batch_out = mirror(landmarks)
+    batch_s = (time.perf_counter() - start) / len(landmarks)
+    batch_out = batch_out.astype(int)
+
+    print(f"{'':16s} {'per frame':>10s} {'speedup':>8s} {'max diff':>9s}")
+    print(f"{'mimic legacy':16s} {legacy_mimic_s * 1e6:8.1f}us")
+    print(f"{'mimic':16s} {mimic_s * 1e6:8.1f}us {legacy_mimic_s / mimic_s:7.1f}x "
+          f"{np.abs(mimic_out - legacy_mimic_out).max():9.2g}")
+    print(f"{'mirror legacy':16s} {legacy_mirror_s * 1e6:8.1f}us")
+    print(f"{'mirror':16s} {mirror_s * 1e6:8.1f}us {legacy_mirror_s / mirror_s:7.1f}x "
+          f"{np.abs(mirror_out - legacy_mirror_out).max():9.2g}")
+    print(f"{'mirror batch':16s} {batch_s * 1e6:8.2f}us {legacy_mirror_s / batch_s:7.1f}x "
+          f"{np.abs(batch_out - legacy_mirror_out).max():9.2g}")
+
+
+if __name__ == '__main__':
+    main()
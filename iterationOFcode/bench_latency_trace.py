@@ -0,0 +1,81 @@
+"""Cost of latency tracing per frame, against a 30 fps frame budget.
+
+    python bench_latency_trace.py [--frames 20000] [--marks 6]
+    python bench_latency_trace.py --replay session.asllog
+
+Times what tracing adds to every frame -- the mark() appends each stage
+makes and LatencyTrace.finish() at display -- on synthetic packets, plus the
+report() the overlay recomputes twice a second. With --replay it also runs
+a session log through landmark/classify stages under a traced Pipeline and
+prints the per-stage table the scripts print at exit.
+"""
+import argparse
+import time
+
+from latency_trace import LatencyTrace
+from pipeline import FramePacket, Pipeline
+from session_log import ReplaySource
+
+FRAME_BUDGET_S = 1 / 30
+MARK_NAMES = ['landmark', 'featurize', 'predict', 'classify', 'servo', 'display', 'debounce', 'angles']
+
+
+def bench_marks(frames, marks):
+    names = MARK_NAMES[:marks]
+    trace = LatencyTrace()
+    packet = FramePacket(0, None)
+    start = time.perf_counter()
+    for i in range(frames):
+        packet.index = i
+        packet.marks = []
+        for name in names:
+            packet.mark(name)
+        trace.finish(packet)
+    per_frame = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    reports = 50
+    for _ in range(reports):
+        trace.report()
+    return per_frame, (time.perf_counter() - start) / reports
+
+
+def run_replay(path):
+    from asl_rules import classify, hand_array
+
+    def landmark(packet):
+        return packet
+
+    def rules(packet):
+        hands = packet.results.multi_hand_landmarks
+        if hands:
+            packet.prediction = classify(hand_array(hands[0]))
+        return packet
+
+    trace = LatencyTrace()
+    pipeline = Pipeline(ReplaySource(path), [('landmark', landmark), ('classify', rules)],
+                        lossless=True, trace=trace)
+    frames = sum(1 for _ in pipeline)
+    print(f"\n{frames} replayed frames")
+    print(trace.summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--marks', type=int, default=6, choices=range(1, len(MARK_NAMES) + 1),
+                        help='marks per frame (a traced Pipeline makes one per stage plus display)')
+    parser.add_argument('--replay', help='session log to run through a traced Pipeline')
+    args = parser.parse_args()
+
+    per_frame, report_s = bench_marks(args.frames, args.marks)
+    print(f"mark x{args.marks} + finish: {per_frame * 1e6:6.2f}us per frame "
+          f"({per_frame / FRAME_BUDGET_S * 100:.3f}% of a 30 fps frame)")
+    print(f"report():         {report_s * 1e6:6.0f}us, at most every 0.5s from the overlay "
+          f"({report_s / 0.5 * 100:.3f}% of wall time)")
+    if args.replay:
+        run_replay(args.replay)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Accuracy, size, load time and per-frame latency of every model_registry model.
+
+    python create_dataset.py --data-dir "data 2"      # once, builds ./landmarks
+    python bench_models.py [--store ./landmarks] [--models mlp logistic]
+
+Each model is trained on the same stratified 80/20 split of the store,
+pickled the way train_clasifier.py writes model.p, loaded back, then timed
+predicting one row at a time, as the inference loops do per frame. Each
+model gets the rows of its own feature set (model_registry.MODEL_FEATURES).
+The np columns repeat load and predict for the export_model copy run by
+numpy_model.py, which is what the inference scripts load when it exists.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+from model_registry import MODELS, export_model, load_model, make_model, save_model
+from numpy_model import NumpyModel
+
+
+def median_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench(name, store, train_rows, test_rows, predict_calls):
+    model = make_model(name)
+    data, labels = store.features(feature_set=model.feature_set), store.label_names()
+    x_train, x_test, y_train, y_test = data[train_rows], data[test_rows], labels[train_rows], labels[test_rows]
+    start = time.perf_counter()
+    model.fit(x_train, y_train)
+    train_s = time.perf_counter() - start
+    accuracy = np.mean(model.predict(x_test) == y_test)
+
+    path = os.path.join(tempfile.mkdtemp(), 'model.p')
+    save_model(model, path, name)
+    size = os.path.getsize(path)
+    load_s = median_time(lambda: load_model(path), 5)
+    model = load_model(path)
+    os.remove(path)
+
+    export_dir = tempfile.mkdtemp()
+    export_model(model, export_dir)
+    np_load_s = median_time(lambda: NumpyModel.load(export_dir), 5)
+    exported = NumpyModel.load(export_dir)
+    assert np.array_equal(exported.predict(x_test), model.predict(x_test))
+
+    rows = [x_test[i:i + 1] for i in range(len(x_test))]
+    timings = []
+    for m in (model, exported):
+        m.predict(rows[0])
+        start = time.perf_counter()
+        for i in range(predict_calls):
+            m.predict(rows[i % len(rows)])
+        timings.append((time.perf_counter() - start) / predict_calls)
+    shutil.rmtree(export_dir)
+    return accuracy, size, train_s, load_s, timings[0], np_load_s, timings[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='landmark store built by create_dataset.py')
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=list(MODELS))
+    parser.add_argument('--predict-calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    if not LandmarkStore.exists(args.store):
+        raise SystemExit(f"No landmark store at {args.store}; run create_dataset.py first")
+    store = LandmarkStore.open(args.store, mmap_mode='r')
+    labels = store.label_names()
+    train_rows, test_rows = train_test_split(np.arange(len(labels)), test_size=0.2, shuffle=True,
+                                             stratify=labels, random_state=0)
+    print(f"{len(labels)} samples, {len(store.classes)} classes\n")
+
+    print(f"{'model':13s} {'accuracy':>8s} {'size':>10s} {'train':>8s} {'load':>9s} {'predict':>10s}"
+          f" {'np load':>9s} {'np predict':>10s}")
+    for name in args.models:
+        accuracy, size, train_s, load_s, predict_s, np_load_s, np_predict_s = bench(
+            name, store, train_rows, test_rows, args.predict_calls)
+        print(f"{name:13s} {accuracy * 100:7.2f}% {size / 1024:8.1f}KB {train_s:7.2f}s "
+              f"{load_s * 1e3:7.2f}ms {predict_s * 1e6:8.1f}us {np_load_s * 1e3:7.2f}ms {np_predict_s * 1e6:8.1f}us")
+
+
+if __name__ == '__main__':
+    main()
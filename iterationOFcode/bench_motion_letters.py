@@ -0,0 +1,148 @@
+"""Per-frame cost and accuracy of motion_letters.MotionRecognizer.
+
+    python bench_motion_letters.py [--clips 200]
+    python bench_motion_letters.py --log session.asllog
+
+Synthetic clips are a stick-figure hand holding the J or Z handshape while
+the tracked fingertip draws the letter, with random size, rotation, speed
+and jitter, between stretches of holding still. Negatives hold I, D and
+other handshapes still or swipe them in a straight line, which must not
+trigger. With --log the first hand of every frame in a recorded session is
+fed through instead and the detections and timings are printed.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from featurizer import NUM_LANDMARKS
+from motion_letters import MOTION_LETTERS, MotionRecognizer, _unit_path, resample
+
+FRAME_BUDGET_S = 1 / 30
+
+
+def stick_hand(pattern, center=(0.4, 0.6), size=0.12):
+    """(21, 3) landmarks whose asl_rules finger states follow `pattern` ('.' = curled)"""
+    hand = np.zeros((NUM_LANDMARKS, 3))
+    thumb_out = pattern[0] == '1'
+    # Thumb out means the tip further from the palm than joint 3 (to the left here)
+    hand[1:5, :2] = [(-0.3, -0.3), (-0.5, -0.5), (-0.7, -0.7), (-0.9 if thumb_out else -0.5, -0.8)]
+    for f in range(4):
+        base = 5 + 4 * f
+        x = -0.3 + 0.2 * f
+        extended = pattern[f + 1] == '1'
+        hand[base:base + 4, :2] = [(x, -1.0), (x, -1.4), (x, -1.6 if extended else -1.2),
+                                   (x, -1.8 if extended else -1.1)]
+    hand[:, :2] = hand[:, :2] * size + center
+    return hand
+
+
+def _rotate(points, angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+def motion_clip(rng, pattern, stroke, tip, frames):
+    """Frames of a hand whose `tip` draws `stroke`, after and before holding still"""
+    hand = stick_hand(pattern, size=rng.uniform(0.08, 0.15))
+    path = resample(_unit_path(stroke), frames) * rng.uniform(1.0, 2.0) * 0.12
+    path = _rotate(path, rng.uniform(-0.25, 0.25))
+    if rng.random() < 0.5:
+        path[:, 0] = -path[:, 0]
+    # Uneven speed along the stroke
+    warp = np.cumsum(rng.uniform(0.5, 1.5, frames))
+    warp = (warp - warp[0]) / (warp[-1] - warp[0]) * (frames - 1)
+    path = np.stack([np.interp(warp, np.arange(frames), path[:, i]) for i in range(2)], axis=1)
+    offset = hand[tip, :2]
+    clip = [hand] * rng.integers(5, 15)
+    for point in path:
+        moved = hand.copy()
+        moved[:, :2] += point - path[0] + offset - hand[tip, :2]
+        clip.append(moved)
+    clip += [clip[-1]] * rng.integers(5, 15)
+    return [frame + rng.normal(0, 0.002, frame.shape) for frame in clip]
+
+
+def synthetic_clips(rng, count):
+    """[(expected letter or None, frames)]"""
+    clips = []
+    for i in range(count):
+        kind = i % 4
+        if kind < 2:
+            letter = 'JZ'[kind]
+            tip, pattern, strokes = MOTION_LETTERS[letter]
+            clips.append((letter, motion_clip(rng, pattern.replace('.', '0'), strokes[0], tip,
+                                              rng.integers(12, 22))))
+        elif kind == 2:
+            pattern = ['00001', '01000', '11111', '01100', '00000'][rng.integers(5)]
+            clips.append((None, [stick_hand(pattern) + rng.normal(0, 0.002, (NUM_LANDMARKS, 3))
+                                 for _ in range(40)]))
+        else:
+            pattern = ['00001', '01000'][rng.integers(2)]
+            swipe = [(0, 0), (rng.uniform(-1, 1), rng.uniform(-1, 1))]
+            clips.append((None, motion_clip(rng, pattern, swipe, 8, rng.integers(12, 22))))
+    return clips
+
+
+def run(recognizer, frames):
+    times, found = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        letter = recognizer.update(frame)
+        times.append(time.perf_counter() - start)
+        if letter:
+            found.append(letter)
+    return times, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=200)
+    parser.add_argument('--log', help='session log to run through the recognizer instead')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    recognizer = MotionRecognizer()
+    # One untimed clip first: the first DTW pass pays NumPy's one-off setup costs
+    run(recognizer, synthetic_clips(np.random.default_rng(args.seed), 1)[0][1])
+    times = []
+    if args.log:
+        from session_log import SessionLog
+        log = SessionLog(args.log)
+        found = []
+        first = dict(zip(*log.first_hands()))
+        for frame in range(len(log)):
+            if frame not in first:
+                recognizer.reset()
+                continue
+            start = time.perf_counter()
+            letter = recognizer.update(np.asarray(first[frame], dtype=np.float64))
+            times.append(time.perf_counter() - start)
+            if letter:
+                found.append((frame, letter))
+        print(f"{len(times)} frames with a hand, detections: {found}")
+    else:
+        hits = {'J': [0, 0], 'Z': [0, 0]}
+        false = negatives = 0
+        for expected, frames in synthetic_clips(np.random.default_rng(args.seed), args.clips):
+            recognizer.reset()
+            clip_times, found = run(recognizer, frames)
+            times += clip_times
+            if expected:
+                hits[expected][0] += found == [expected]
+                hits[expected][1] += 1
+            else:
+                negatives += 1
+                false += bool(found)
+        for letter, (hit, total) in hits.items():
+            print(f"{letter}: {hit}/{total} clips recognised")
+        print(f"false triggers: {false}/{negatives} negative clips")
+
+    times = np.array(times)
+    print(f"update(): mean {times.mean() * 1e6:.1f}us, p99 {np.percentile(times, 99) * 1e6:.1f}us, "
+          f"max {times.max() * 1e6:.1f}us ({times.mean() / FRAME_BUDGET_S * 100:.2f}% of a 30 fps frame)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Per-frame classify cost with one hand vs. two hands, looped vs. batched.
+
+    python bench_multi_hand.py --store ./landmarks [--model-dir ./model]
+
+Frames are MediaPipe-style results holding one or two hands sampled from the
+landmark store. "one hand" is the single-hand classify stage (Featurizer +
+predict_proba); "two, looped" runs it once per hand; "two, batched" is the
+--hands 2 stage: HandTracks ids, one compute_features and one predict_proba
+for both hands. MediaPipe's own cost for a second hand is not included.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from featurizer import Featurizer, compute_features, feature_set_of
+from landmark_store import DEFAULT_STORE_DIR, HANDEDNESS_LEFT, HANDEDNESS_RIGHT, LandmarkStore
+from multi_hand import HandTracks, results_landmarks
+from numpy_model import DEFAULT_EXPORT_DIR, NumpyModel
+from session_log import ReplayResults
+
+
+def make_frames(store, rng, count, hands):
+    frames = []
+    for _ in range(count):
+        rows = rng.choice(len(store), hands)
+        frame = []
+        for side, row in enumerate(rows):
+            xyz = np.array(store.landmarks[row], dtype=np.float64)
+            # Put the hands side by side, drifting a little from frame to frame
+            xyz[:, 0] = xyz[:, 0] * 0.4 + 0.5 * side + rng.normal(0, 0.005)
+            frame.append((xyz, (HANDEDNESS_LEFT, HANDEDNESS_RIGHT)[side], 0.9))
+        frames.append(ReplayResults(frame))
+    return frames
+
+
+def time_per_frame(fn, frames):
+    fn(frames[0])
+    start = time.perf_counter()
+    for results in frames:
+        fn(results)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='landmark store to sample hands from')
+    parser.add_argument('--model-dir', default=DEFAULT_EXPORT_DIR,
+                        help='exported model; an MLP is trained on the store when there is none')
+    parser.add_argument('--frames', type=int, default=2000)
+    args = parser.parse_args()
+
+    if not LandmarkStore.exists(args.store):
+        raise SystemExit(f"No landmark store at {args.store}; run create_dataset.py first")
+    store = LandmarkStore.open(args.store, mmap_mode='r')
+    if NumpyModel.exists(args.model_dir):
+        model = NumpyModel.load(args.model_dir)
+    else:
+        from model_registry import make_model
+        model = make_model('mlp').fit(store.features(), store.label_names())
+
+    rng = np.random.default_rng(0)
+    one = make_frames(store, rng, args.frames, 1)
+    two = make_frames(store, rng, args.frames, 2)
+    featurizer = Featurizer(feature_set_of(model))
+    tracks = HandTracks(2)
+
+    def single(results):
+        return [model.predict_proba(featurizer(hand))[0] for hand in results.multi_hand_landmarks]
+
+    def batched(results):
+        landmarks, handedness = results_landmarks(results)
+        ids = tracks.update(landmarks, handedness)
+        return ids, model.predict_proba(compute_features(landmarks, featurizer.feature_set))
+
+    one_s = time_per_frame(single, one)
+    looped_s = time_per_frame(single, two)
+    batched_s = time_per_frame(batched, two)
+    print(f"one hand:      {one_s * 1e6:7.1f}us per frame")
+    print(f"two, looped:   {looped_s * 1e6:7.1f}us per frame ({looped_s / one_s:.2f}x one hand)")
+    print(f"two, batched:  {batched_s * 1e6:7.1f}us per frame ({batched_s / one_s:.2f}x one hand)")
+
+
+if __name__ == '__main__':
+    main()
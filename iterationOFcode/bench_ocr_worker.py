@@ -0,0 +1,112 @@
+"""Frame-loop latency of asl2.py's TEXT mode: synchronous OCR vs. ocr_worker.OCRWorker.
+
+    python bench_ocr_worker.py [--ocr-ms 300] [--fps 30] [--hold 1.5]
+
+Frames are synthetic camera frames of words held up one after another
+(noise, a pixel or two of shake, some words shown twice), paced at --fps.
+OCR is a stand-in that sleeps --ocr-ms and reads the word by matching the
+frame against the rendered words, so neither Tesseract nor a camera is
+needed. "sync" is the old loop: OCR every frame on the display thread and
+save every hit. "worker" submits every frame to OCRWorker. The report has
+per-frame loop time, OCR calls, files that would be written, and how long
+after a new word appeared the overlay showed it.
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from ocr_worker import OCRWorker
+
+WORDS = ['HELLO', 'WORLD', 'ROBOT', 'HELLO', 'HAND', 'SIGN', 'WORLD']
+
+
+def render(word, width=640, height=480):
+    frame = np.full((height, width, 3), 200, dtype=np.uint8)
+    cv2.putText(frame, word, (60, height // 2 + 20), cv2.FONT_HERSHEY_SIMPLEX, 3, (20, 20, 20), 6)
+    return frame
+
+
+class StandInOCR:
+    """Sleeps like Tesseract would, then returns the letters of the closest rendered word"""
+
+    def __init__(self, words, seconds):
+        self.words = sorted(set(words))
+        self.templates = np.stack([cv2.resize(render(word), (64, 48)) for word in self.words]).astype(np.int16)
+        self.seconds = seconds
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        time.sleep(self.seconds)
+        small = cv2.resize(frame, (64, 48)).astype(np.int16)
+        return list(self.words[int(np.abs(self.templates - small).sum(axis=(1, 2, 3)).argmin())])
+
+
+def camera(words, frames_per_word, seed=0):
+    """(word, frame) for every frame: each word held for frames_per_word frames, with noise and shake"""
+    rng = np.random.default_rng(seed)
+    for word in words:
+        scene = render(word).astype(np.int16)
+        for _ in range(frames_per_word):
+            dx, dy = rng.integers(-2, 3, 2)
+            noisy = np.roll(scene, (dy, dx), axis=(0, 1)) + rng.normal(0, 4, scene.shape)
+            yield word, np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def run(name, process, latest, words, frames_per_word, fps):
+    """Feed the frames at fps, or as fast as process allows, and print the loop's timings"""
+    loop_s, appeared, shown_after = [], {}, {}
+    began = next_frame = time.perf_counter()
+    for index, (word, frame) in enumerate(camera(words, frames_per_word)):
+        start = time.perf_counter()
+        scene = index // frames_per_word
+        appeared.setdefault(scene, start)
+        process(frame)
+        end = time.perf_counter()
+        loop_s.append(end - start)
+        if scene not in shown_after and ''.join(latest() or []) == word:
+            shown_after[scene] = end - appeared[scene]
+        next_frame = max(next_frame + 1.0 / fps, time.perf_counter())
+        time.sleep(max(next_frame - time.perf_counter(), 0))
+    elapsed = time.perf_counter() - began
+    loop_s = np.array(loop_s)
+    shown = np.array(list(shown_after.values()))
+    print(f"{name:7s} loop p50 {np.median(loop_s) * 1e3:6.1f}ms max {loop_s.max() * 1e3:6.1f}ms  "
+          f"{len(loop_s) / elapsed:5.1f} fps  "
+          f"words shown {len(shown)}/{len(words)}, after {np.median(shown) * 1e3 if len(shown) else 0:.0f}ms median")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ocr-ms', type=float, default=300.0, help='time one stand-in OCR call takes')
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--hold', type=float, default=1.5, help='seconds each word is held up')
+    parser.add_argument('--sync-words', type=int, default=2, help='words timed with the slow synchronous loop')
+    args = parser.parse_args()
+    frames_per_word = int(args.hold * args.fps)
+
+    ocr = StandInOCR(WORDS, args.ocr_ms / 1e3)
+    saved = []
+    last = {'letters': None}
+
+    def sync(frame):
+        last['letters'] = ocr(frame)
+        if last['letters']:
+            saved.append(last['letters'])
+
+    run('sync', sync, lambda: last['letters'], WORDS[:args.sync_words], frames_per_word, args.fps)
+    print(f"        {ocr.calls} OCR calls, {len(saved)} files for {args.sync_words} words")
+
+    ocr.calls, saved = 0, []
+    worker = OCRWorker(ocr, on_text=saved.append).start()
+    run('worker', worker.submit, lambda: worker.latest, WORDS, frames_per_word, args.fps)
+    worker.stop()
+    print(f"        {ocr.calls} OCR calls, {len(saved)} files for {len(WORDS)} words: "
+          f"{' '.join(''.join(letters) for letters in saved)}")
+    print(f"        {worker.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Throughput of the camera loop run sequentially vs. as a threaded Pipeline.
+
+    python bench_pipeline.py --video session.mp4 [--model ./model.p]
+    python bench_pipeline.py --replay session.asllog [--model ./model.p]
+
+Both runs read the same video file headless and do the same work per frame:
+cvtColor + MediaPipe Hands, then featurization and (with --model) the
+classifier. The threaded run uses lossless queues so both process every
+frame and the FPS numbers compare like for like. With --replay the hands
+come from a session_log recording instead, so no MediaPipe or camera is
+needed and the numbers cover everything downstream of landmark detection.
+"""
+import argparse
+import pickle
+import time
+
+import cv2
+import mediapipe as mp
+
+from featurizer import Featurizer
+from pipeline import FramePacket, Pipeline, open_source
+
+
+def make_stages(model=None, replay=False):
+    hands = None
+    if not replay:
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1,
+                                         min_detection_confidence=0.5)
+    featurizer = Featurizer()
+
+    def landmark(packet):
+        if not packet.replayed:
+            packet.results = hands.process(cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB))
+        return packet
+
+    def classify(packet):
+        if packet.results.multi_hand_landmarks:
+            features = featurizer(packet.results.multi_hand_landmarks[0])
+            if model is not None:
+                packet.prediction = model.predict(features)[0]
+        return packet
+
+    return [('landmark', landmark), ('classify', classify)]
+
+
+def run_sequential(video, model, replay=None):
+    stages = make_stages(model, bool(replay))
+    cap = open_source(video, replay=replay)
+    frames = 0
+    start = time.perf_counter()
+    while True:
+        if replay:
+            packet = cap.read_packet(frames)
+        else:
+            ok, image = cap.read()
+            packet = FramePacket(frames, image) if ok else None
+        if packet is None:
+            break
+        for _, fn in stages:
+            fn(packet)
+        frames += 1
+    cap.release()
+    return frames, time.perf_counter() - start
+
+
+def run_threaded(video, model, replay=None):
+    cap = open_source(video, replay=replay)
+    pipeline = Pipeline(cap, make_stages(model, bool(replay)), queue_size=2, lossless=True)
+    start = time.perf_counter()
+    frames = sum(1 for _ in pipeline)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    print(pipeline.summary())
+    return frames, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', help='video file to replay')
+    parser.add_argument('--replay', help='session log to replay instead of running MediaPipe')
+    parser.add_argument('--model', default=None, help='pickled model.p to classify with')
+    args = parser.parse_args()
+    if not args.video and not args.replay:
+        parser.error('one of --video or --replay is required')
+
+    model = None
+    if args.model:
+        with open(args.model, 'rb') as f:
+            model = pickle.load(f)['model']
+
+    seq_frames, seq_s = run_sequential(args.video, model, args.replay)
+    thr_frames, thr_s = run_threaded(args.video, model, args.replay)
+    print(f"sequential: {seq_frames} frames in {seq_s:.2f}s = {seq_frames / seq_s:.1f} fps")
+    print(f"threaded:   {thr_frames} frames in {thr_s:.2f}s = {thr_frames / thr_s:.1f} fps "
+          f"({seq_s / seq_frames / (thr_s / thr_frames):.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
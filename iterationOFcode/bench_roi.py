@@ -0,0 +1,74 @@
+"""FPS of full-frame MediaPipe Hands vs. roi.RoiLandmarker on a recorded video.
+
+    python bench_roi.py --video session.mp4 [--size 256] [--margin 0.3]
+
+Both runs use Hands(static_image_mode=True) as the inference scripts do and
+process every frame of the video headless. The full-frame run is the old
+cvtColor + hands.process on the whole frame. Besides FPS it reports how
+often each run found a hand and how far the ROI landmarks are from the
+full-frame ones on frames where both did, in pixels.
+"""
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from multi_hand import results_landmarks
+from roi import RoiLandmarker
+
+
+def make_hands():
+    return mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3)
+
+
+def run(video, process):
+    cap = cv2.VideoCapture(video)
+    landmarks = []
+    frames = 0
+    elapsed = 0.0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        start = time.perf_counter()
+        results = process(frame)
+        elapsed += time.perf_counter() - start
+        found, _ = results_landmarks(results, 1)
+        landmarks.append(found[0] if len(found) else None)
+        frames += 1
+    size = (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return frames, elapsed, landmarks, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--size', type=int, default=256, help='longest side of the processed crop')
+    parser.add_argument('--margin', type=float, default=0.3)
+    args = parser.parse_args()
+
+    hands = make_hands()
+    full = run(args.video, lambda frame: hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+    landmarker = RoiLandmarker(make_hands(), margin=args.margin, size=args.size)
+    roi = run(args.video, landmarker.process)
+
+    for name, (frames, elapsed, landmarks, _) in (('full frame', full), ('roi', roi)):
+        found = sum(lm is not None for lm in landmarks)
+        print(f"{name:10s} {frames / elapsed:6.1f} fps, hand in {found}/{frames} frames")
+    print(landmarker.summary())
+
+    width, height = full[3]
+    both = [(a, b) for a, b in zip(full[2], roi[2]) if a is not None and b is not None]
+    if both:
+        a, b = (np.array(side)[:, :, :2] for side in zip(*both))
+        error = np.sqrt((((a - b) * (width, height)) ** 2).sum(axis=-1))
+        print(f"roi vs full frame landmarks: mean {error.mean():.1f}px, p95 {np.percentile(error, 95):.1f}px "
+              f"over {len(both)} frames")
+    print(f"speedup: {(roi[0] / roi[1]) / (full[0] / full[1]):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
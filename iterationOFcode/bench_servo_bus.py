@@ -0,0 +1,73 @@
+"""I2C traffic per pose update: per-register writes vs. auto-increment block writes.
+
+    python bench_servo_bus.py [--poses 500] [--delay-us 300]
+
+Replays the same stream of five-finger poses (roughly what mimic_fingers.py
+sends: a few fingers move each frame, the rest hold) through a counting
+FakeBus. The legacy path is the old RoboticHand.move_servo, four
+write_byte_data calls per servo; the new path is PCA9685.set_pose. --delay-us
+charges each transaction a fixed bus time (about 300 us for a short write at
+100 kHz) so the latency column reflects the wire, not Python.
+"""
+import argparse
+import random
+import time
+
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, I2C_ADDR, LED0_ON_L, NUM_FINGERS, FakeBus, PCA9685
+
+
+def make_poses(count, seed=0):
+    rng = random.Random(seed)
+    pose = [FINGER_STRAIGHT] * NUM_FINGERS
+    poses = []
+    for _ in range(count):
+        for finger in range(NUM_FINGERS):
+            if rng.random() < 0.4:
+                pose[finger] = rng.randint(FINGER_BENT, FINGER_STRAIGHT)
+        poses.append(list(pose))
+    return poses
+
+
+def legacy_pose(bus, pose):
+    for channel, value in enumerate(pose):
+        reg = LED0_ON_L + 4 * channel
+        bus.write_byte_data(I2C_ADDR, reg, 0)
+        bus.write_byte_data(I2C_ADDR, reg + 1, 0)
+        bus.write_byte_data(I2C_ADDR, reg + 2, value & 0xFF)
+        bus.write_byte_data(I2C_ADDR, reg + 3, value >> 8)
+
+
+def run(poses, delay, batched):
+    bus = FakeBus()
+    controller = PCA9685(bus)
+    bus.transactions = bus.bytes_written = 0
+    bus.transaction_delay = delay
+    start = time.perf_counter()
+    for pose in poses:
+        if batched:
+            controller.set_pose(pose)
+        else:
+            legacy_pose(bus, pose)
+    elapsed = time.perf_counter() - start
+    # Both paths must leave the chip holding the same pose
+    assert [bus.pwm(I2C_ADDR, ch) for ch in range(NUM_FINGERS)] == poses[-1]
+    return bus.transactions / len(poses), bus.bytes_written / len(poses), elapsed / len(poses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--poses', type=int, default=500)
+    parser.add_argument('--delay-us', type=float, default=300.0)
+    args = parser.parse_args()
+
+    poses = make_poses(args.poses)
+    delay = args.delay_us * 1e-6
+    legacy = run(poses, delay, batched=False)
+    batched = run(poses, delay, batched=True)
+    for name, (txn, nbytes, secs) in (('per-register', legacy), ('block write', batched)):
+        print(f"{name:13s} {txn:5.2f} transactions/pose {nbytes:5.1f} bytes/pose {secs * 1e3:6.2f} ms/pose")
+    print(f"{legacy[0] / batched[0]:.1f}x fewer transactions, {legacy[2] / batched[2]:.1f}x lower latency")
+
+
+if __name__ == '__main__':
+    main()
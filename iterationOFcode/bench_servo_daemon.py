@@ -0,0 +1,57 @@
+"""Per-letter actuation cost: persistent servo daemon vs. one process per letter.
+
+    python bench_servo_daemon.py [--letters 200] [--spawns 10]
+
+Runs a ServoDaemon on a FakeBus in this process and times client round trips,
+then times spawning `servo_daemon.py --fake --letter X`, which pays the same
+process start, bus init and calibration parse that ./hand_test paid per letter.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from servo_bus import FakeBus, PCA9685
+from servo_client import ServoClient
+from pose_table import PoseTable
+from servo_daemon import ServoDaemon
+
+LETTERS = 'ABCDEFGHIKLMNOPQRSTUVWXY'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--letters', type=int, default=200)
+    parser.add_argument('--spawns', type=int, default=10)
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), 'servo.sock')
+    daemon = ServoDaemon(PCA9685(FakeBus()), PoseTable(), socket_path)
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+
+    with ServoClient(socket_path) as client:
+        client.ping()
+        start = time.perf_counter()
+        for i in range(args.letters):
+            client.show_letter(LETTERS[i % len(LETTERS)])
+        daemon_s = (time.perf_counter() - start) / args.letters
+    daemon.shutdown()
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servo_daemon.py')
+    start = time.perf_counter()
+    for i in range(args.spawns):
+        subprocess.run([sys.executable, script, '--fake', '--letter', LETTERS[i % len(LETTERS)]],
+                       check=True, stdout=subprocess.DEVNULL)
+    spawn_s = (time.perf_counter() - start) / args.spawns
+
+    print(f"daemon round trip: {daemon_s * 1e3:8.3f} ms/letter")
+    print(f"process per letter: {spawn_s * 1e3:7.1f} ms/letter ({spawn_s / daemon_s:.0f}x slower)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Words per minute of spelling_scheduler vs. the old fixed-delay spell_word, on simulated servos.
+
+    python bench_spelling.py [--text "the quick brown fox"] [--speed 750] [--hold 0.25]
+
+Both schedules drive SimulatedServos through a virtual clock, so nothing
+sleeps. "fixed" is what fixed_inference_classifier.py's spell_word did:
+show a letter, wait --delay seconds (0.5; 1.0 in inference_classifier_withtext),
+2 s per space. For every letter the bench also measures how long the hand
+actually held it legibly (every finger within the scheduler's tolerance), so
+a faster schedule that blurs letters together would show up.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pose_table import load_letter_poses
+from spelling_scheduler import (HOLD, LEGIBLE_WITHIN, SERVO_SPEED, SETTLE, Step, SimulatedServos,
+                                SpellingScheduler, Timeline, VirtualClock)
+
+TEXT = ('the quick brown fox jumps over the lazy dog hello world sign language robot hand '
+        'spelling letters quickly')
+
+
+def fixed_delay_timeline(text, letter_poses, delay, space=2.0):
+    steps = []
+    t = 0.0
+    for char in text.upper():
+        if char.isspace():
+            t += space
+        elif char in letter_poses:
+            steps.append(Step(t, char, letter_poses[char], t))
+            t += delay
+    return Timeline(steps, t, [])
+
+
+def legible_holds(servos, timeline, legible_within, resolution=0.002):
+    """Seconds each step's pose is held legibly before the next step's command"""
+    ends = [step.at for step in timeline.steps[1:]] + [timeline.duration]
+    holds = []
+    for step, end in zip(timeline.steps, ends):
+        times = np.arange(step.at, end, resolution)
+        legible = np.abs(servos.positions(times) - step.pose).max(axis=1) <= legible_within
+        holds.append(legible.sum() * resolution)
+    return np.array(holds)
+
+
+def run(name, scheduler, timeline, words, speed, settle, legible_within):
+    clock = VirtualClock()
+    servos = SimulatedServos(clock, speed, settle)
+    elapsed = scheduler.play(timeline, servos.set_pose, clock=clock, sleep=clock.sleep)
+    holds = legible_holds(servos, timeline, legible_within)
+    print(f"{name:10s} {elapsed:7.2f}s {words / elapsed * 60:6.1f} wpm {len(holds) / elapsed * 60:6.1f} letters/min  "
+          f"held legibly min {holds.min() * 1e3:4.0f}ms, median {np.median(holds) * 1e3:4.0f}ms, "
+          f"never {np.sum(holds == 0)}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--text', default=TEXT)
+    parser.add_argument('--calibration', default='calibration.conf')
+    parser.add_argument('--speed', type=float, default=SERVO_SPEED, help='servo speed in counts per second')
+    parser.add_argument('--settle', type=float, default=SETTLE)
+    parser.add_argument('--hold', type=float, default=HOLD)
+    parser.add_argument('--delay', type=float, default=0.5, help="old spell_word's sleep per letter")
+    args = parser.parse_args()
+
+    poses = load_letter_poses(args.calibration)
+    scheduler = SpellingScheduler(poses, args.speed, args.settle, LEGIBLE_WITHIN, args.hold)
+    words = len(args.text.split())
+
+    start = time.perf_counter()
+    timeline = scheduler.compile_text(args.text, start='_')
+    compile_s = time.perf_counter() - start
+    print(f"{words} words, {len(timeline.steps)} letters; compiled in {compile_s * 1e6:.0f}us")
+
+    fixed = run('fixed', scheduler, fixed_delay_timeline(args.text, poses, args.delay), words,
+                args.speed, args.settle, LEGIBLE_WITHIN)
+    scheduled = run('scheduled', scheduler, timeline, words, args.speed, args.settle, LEGIBLE_WITHIN)
+    print(f"speedup: {fixed / scheduled:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
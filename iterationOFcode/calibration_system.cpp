@@ -64,11 +64,25 @@ private:
         write(i2c_fd, buffer, 2);
     }
 
+    // Needs MODE1 auto-increment (0x20): one write fills consecutive LEDn registers
+    void writeChannels(uint8_t channel, const std::vector<int>& offs) {
+        std::vector<uint8_t> buffer(1 + 4 * offs.size());
+        buffer[0] = 0x06 + 4 * channel;
+        for (size_t i = 0; i < offs.size(); i++) {
+            buffer[1 + 4 * i] = 0;
+            buffer[2 + 4 * i] = 0;
+            buffer[3 + 4 * i] = offs[i] & 0xFF;
+            buffer[4 + 4 * i] = offs[i] >> 8;
+        }
+        write(i2c_fd, buffer.data(), buffer.size());
+    }
+
     void setPWM(uint8_t channel, uint16_t off) {
-        writeRegister(0x06 + 4 * channel, 0);
-        writeRegister(0x07 + 4 * channel, 0);
-        writeRegister(0x08 + 4 * channel, off & 0xFF);
-        writeRegister(0x09 + 4 * channel, off >> 8);
+        writeChannels(channel, {off});
+    }
+
+    void setPose(const std::vector<int>& positions) {
+        writeChannels(0, positions);
     }
 
     void loadExistingCalibration() {
@@ -126,10 +140,7 @@ private:
     }
 
     void resetHand() {
-        for (int i = 0; i < 5; i++) {
-            setPWM(i, FINGER_STRAIGHT);
-            usleep(100000);
-        }
+        setPose(std::vector<int>(5, FINGER_STRAIGHT));
     }
 
 public:
@@ -144,7 +155,7 @@ public:
         }
 
         // Initialize PCA9685
-        writeRegister(0x00, 0x00);  // Mode 1 register
+        writeRegister(0x00, 0x20);  // Mode 1 register, auto-increment on
         usleep(5000);
         
         // Set frequency to 50Hz
@@ -200,10 +211,7 @@ public:
                     break;
                 case 'v':
                     // Show full letter position
-                    for (int i = 0; i < 5; i++) {
-                        setPWM(i, positions[i]);
-                        usleep(100000);
-                    }
+                    setPose(positions);
                     continue;
                 case 'q':
                     saveCalibration();
@@ -0,0 +1,174 @@
+"""Landmark features shared by training and every inference loop.
+
+The default classifier features are the 21 (x, y) landmark coordinates
+shifted so the smallest x and y are zero, interleaved as x0, y0, x1, y1, ...
+This is what create_dataset.py has always produced; keeping the one
+implementation here stops the training and inference copies from drifting
+apart.
+
+FEATURE_SETS holds the other sets, vectorized over (..., 21, 3) landmarks;
+compute_features picks one by name (or several joined with '+'):
+
+    minshift             (42) the above; depends on hand size and angle
+    wrist_normalized     (63) x, y, z relative to the wrist, rotated so the
+                         wrist -> middle MCP line points up and divided by
+                         its length
+    fingertip_distances  (15) the 10 fingertip pairs and 5 fingertip-wrist
+                         distances in 3D, in the same units
+    joint_angles         (15) 3D bend at each finger's three joints, in
+                         degrees (the last is the angle mimic_fingers.py
+                         drives the servos with)
+
+All but minshift ignore where the hand is, how big it is and how it is
+turned in the image plane -- which also means they cannot tell apart
+letters that differ only in orientation (H/U, K/P) on their own.
+train_clasifier.py --features picks the set and records it on the model
+(model.feature_set); inference builds Featurizer(feature_set_of(model)).
+bench_features.py compares their accuracy and per-frame cost.
+"""
+from itertools import chain
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = 2 * NUM_LANDMARKS
+
+
+def minshift_features(landmarks):
+    """Min-shifted (x, y) features for a (..., 21, 3) landmark array -> (..., 42).
+
+    Computed in float64: MediaPipe stores float32 coordinates, so this gives
+    bit-identical results to subtracting Python floats one landmark at a time.
+    """
+    xy = np.asarray(landmarks[..., :2], dtype=np.float64)
+    xy = xy - xy.min(axis=-2, keepdims=True)
+    return xy.reshape(xy.shape[:-2] + (NUM_FEATURES,))
+
+
+WRIST = 0
+MIDDLE_MCP = 9
+FINGERTIPS = (4, 8, 12, 16, 20)
+_TIP_PAIRS = np.array([(a, b) for i, a in enumerate(FINGERTIPS) for b in FINGERTIPS[i + 1:]])
+# Wrist, then each finger's joints base to tip; bends are measured at the middle three
+_FINGER_CHAINS = np.array([[WRIST, 1, 2, 3, 4], [WRIST, 5, 6, 7, 8], [WRIST, 9, 10, 11, 12],
+                           [WRIST, 13, 14, 15, 16], [WRIST, 17, 18, 19, 20]])
+DEFAULT_FEATURES = 'minshift'
+
+
+class _Hands:
+    """(..., 21, 3) landmarks with the intermediates feature sets share, each computed at most once"""
+
+    def __init__(self, landmarks):
+        self.xyz = np.asarray(landmarks, dtype=np.float64)
+        self._frame = None
+
+    @property
+    def frame(self):
+        """Wrist-relative xyz, rotated so wrist -> middle MCP points along -y, in units of its length"""
+        if self._frame is None:
+            rel = self.xyz - self.xyz[..., WRIST:WRIST + 1, :]
+            axis = rel[..., MIDDLE_MCP, :]
+            length = np.sqrt((axis * axis).sum(axis=-1))
+            flat = np.maximum(np.hypot(axis[..., 0], axis[..., 1]), 1e-12)
+            # Rows of a rotation turning the axis' (x, y) onto (0, -1), over the 3D length
+            cos = (-axis[..., 1] / flat / np.maximum(length, 1e-6))[..., None]
+            sin = (axis[..., 0] / flat / np.maximum(length, 1e-6))[..., None]
+            x, y = rel[..., 0], rel[..., 1]
+            frame = np.empty_like(rel)
+            frame[..., 0] = x * cos + y * sin
+            frame[..., 1] = y * cos - x * sin
+            frame[..., 2] = rel[..., 2] / np.maximum(length, 1e-6)[..., None]
+            self._frame = frame
+        return self._frame
+
+
+def _wrist_normalized(hands):
+    return hands.frame.reshape(hands.frame.shape[:-2] + (3 * NUM_LANDMARKS,))
+
+
+def _fingertip_distances(hands):
+    frame = hands.frame
+    tip_pairs = frame[..., _TIP_PAIRS[:, 0], :] - frame[..., _TIP_PAIRS[:, 1], :]
+    tips = frame[..., FINGERTIPS, :]
+    return np.sqrt(np.concatenate([(tip_pairs * tip_pairs).sum(axis=-1), (tips * tips).sum(axis=-1)], axis=-1))
+
+
+def _joint_angles(hands):
+    segments = np.diff(hands.xyz[..., _FINGER_CHAINS, :], axis=-2)
+    v1, v2 = segments[..., :-1, :], segments[..., 1:, :]
+    norms = np.sqrt((v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1))
+    cos = (v1 * v2).sum(axis=-1) / np.maximum(norms, 1e-12)
+    angles = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+    return angles.reshape(angles.shape[:-2] + (15,))
+
+
+FEATURE_SETS = {
+    'minshift': lambda hands: minshift_features(hands.xyz),
+    'wrist_normalized': _wrist_normalized,
+    'fingertip_distances': _fingertip_distances,
+    'joint_angles': _joint_angles,
+}
+
+
+def compute_features(landmarks, feature_set=DEFAULT_FEATURES):
+    """Features of a registered set, or 'a+b' for several concatenated, for (..., 21, 3) landmarks.
+
+    Sets joined with '+' share the wrist-relative frame, so the combination
+    costs one pass over the landmarks rather than one per set.
+    """
+    names = feature_set.split('+')
+    unknown = [name for name in names if name not in FEATURE_SETS]
+    if unknown:
+        raise ValueError(f"Unknown feature set {'+'.join(unknown)!r}, expected one of {', '.join(FEATURE_SETS)}")
+    hands = _Hands(landmarks)
+    if len(names) == 1:
+        return FEATURE_SETS[names[0]](hands)
+    return np.concatenate([FEATURE_SETS[name](hands) for name in names], axis=-1)
+
+
+def feature_set_of(model):
+    """The feature set a model was trained on; models from before feature sets used minshift"""
+    return getattr(model, 'feature_set', DEFAULT_FEATURES)
+
+
+class Featurizer:
+    """Turns one MediaPipe hand into a classifier row using preallocated buffers.
+
+    With the default minshift set the returned (1, 42) array is reused on the
+    next call; copy it if it has to outlive the frame.
+    """
+
+    def __init__(self, feature_set=DEFAULT_FEATURES):
+        compute_features(np.zeros((1, NUM_LANDMARKS, 3)), feature_set)  # fail early on a bad name
+        self.feature_set = feature_set
+        self._flat = np.empty(NUM_LANDMARKS * 3)
+        self.xyz = self._flat.reshape(NUM_LANDMARKS, 3)
+        self.features = np.empty((1, NUM_FEATURES))
+        self._xy = self.features.reshape(NUM_LANDMARKS, 2)
+        self.min_xy = np.empty(2)
+        self.max_xy = np.empty(2)
+
+    def load(self, hand_landmarks):
+        """Copy a MediaPipe landmark list into self.xyz"""
+        self._flat[:] = np.fromiter(
+            chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark),
+            dtype=np.float64, count=NUM_LANDMARKS * 3)
+        return self.xyz
+
+    def __call__(self, hand_landmarks):
+        self.load(hand_landmarks)
+        xy = self.xyz[:, :2]
+        xy.min(axis=0, out=self.min_xy)
+        xy.max(axis=0, out=self.max_xy)
+        if self.feature_set != DEFAULT_FEATURES:
+            return compute_features(self.xyz[None], self.feature_set)
+        np.subtract(xy, self.min_xy, out=self._xy)
+        return self.features
+
+    def bbox(self, width, height, margin=10):
+        """Pixel box around the last hand, as the inference scripts draw it"""
+        x1 = int(self.min_xy[0] * width) - margin
+        y1 = int(self.min_xy[1] * height) - margin
+        x2 = int(self.max_xy[0] * width) - margin
+        y2 = int(self.max_xy[1] * height) - margin
+        return x1, y1, x2, y2
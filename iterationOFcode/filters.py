@@ -0,0 +1,182 @@
+"""Low-latency smoothing for per-finger streams (angles or servo counts).
+
+mimic_fingers.py averaged each finger over a deque of the last 5 angles and
+then each servo over the last 3 counts: a fixed lag of several frames on a
+fast flick that still lets noise through while the hand is held still. Every
+filter here keeps a few (width,) arrays of state, so one update is O(1) and
+covers all five fingers at once:
+
+    average     moving average of the last `window` samples (the old behaviour)
+    ema         exponential moving average, x += alpha * (sample - x)
+    one_euro    One-Euro filter: an EMA whose cutoff rises with the speed of
+                the signal -- heavy smoothing while still, little lag while moving
+    kalman      constant-velocity Kalman filter per finger
+    none        passes samples through
+
+Filters take an optional timestamp in seconds; without one they assume
+`rate` samples a second, which keeps session-log replays repeatable.
+
+    smoother = make_filter('one_euro:min_cutoff=1.0')
+    angles = smoother(kinematics.angles(landmarks), packet.captured_at)
+
+tune_filters.py replays session logs through each filter and reports lag
+against jitter.
+"""
+import numpy as np
+
+from servo_bus import NUM_FINGERS
+
+DEFAULT_FILTER = 'one_euro'
+RATE = 30.0
+
+
+class _Filter:
+    def __init__(self, width=NUM_FINGERS, rate=RATE):
+        self.width = width
+        self.rate = rate
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.t = None
+
+    def _dt(self, t):
+        """Seconds since the previous sample"""
+        dt = 1.0 / self.rate if t is None or self.t is None else max(t - self.t, 1e-6)
+        self.t = t
+        return dt
+
+
+class Passthrough(_Filter):
+    def __call__(self, sample, t=None):
+        return np.asarray(sample, dtype=np.float64)
+
+
+class MovingAverage(_Filter):
+    """Mean of the last `window` samples, as a running sum over a ring buffer"""
+
+    def __init__(self, window=5, width=NUM_FINGERS, rate=RATE):
+        self.buffer = np.zeros((int(window), width))
+        super().__init__(width, rate)
+
+    def reset(self):
+        super().reset()
+        self.buffer[:] = 0.0
+        self.total = np.zeros(self.buffer.shape[1])
+        self.count = 0
+
+    def __call__(self, sample, t=None):
+        sample = np.asarray(sample, dtype=np.float64)
+        slot = self.count % len(self.buffer)
+        self.total = self.total + sample - self.buffer[slot]
+        self.buffer[slot] = sample
+        self.count += 1
+        return self.total / min(self.count, len(self.buffer))
+
+
+class ExponentialFilter(_Filter):
+    def __init__(self, alpha=0.5, width=NUM_FINGERS, rate=RATE):
+        self.alpha = float(alpha)
+        super().__init__(width, rate)
+
+    def __call__(self, sample, t=None):
+        sample = np.asarray(sample, dtype=np.float64)
+        self.x = sample if self.x is None else self.x + self.alpha * (sample - self.x)
+        return self.x
+
+
+def _smoothing(cutoff, dt):
+    """EMA factor of a first-order low-pass at `cutoff` Hz"""
+    return 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+
+
+class OneEuroFilter(_Filter):
+    """Casiez et al., CHI 2012. min_cutoff (Hz) sets the smoothing while still,
+    beta how fast the cutoff rises with speed (per unit/s), d_cutoff the
+    low-pass on the speed estimate."""
+
+    def __init__(self, min_cutoff=0.5, beta=0.05, d_cutoff=1.0, width=NUM_FINGERS, rate=RATE):
+        self.min_cutoff = float(min_cutoff)
+        self.beta = float(beta)
+        self.d_cutoff = float(d_cutoff)
+        super().__init__(width, rate)
+
+    def reset(self):
+        super().reset()
+        self.dx = np.zeros(self.width)
+
+    def __call__(self, sample, t=None):
+        sample = np.asarray(sample, dtype=np.float64)
+        dt = self._dt(t)
+        if self.x is None:
+            self.x = sample
+            return self.x
+        self.dx = self.dx + _smoothing(self.d_cutoff, dt) * ((sample - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        self.x = self.x + _smoothing(cutoff, dt) * (sample - self.x)
+        return self.x
+
+
+class KalmanFilter(_Filter):
+    """Constant-velocity Kalman filter, one independent 2-state filter per channel.
+
+    process_noise: variance of the unmodelled acceleration (units^2/s^3);
+    measurement_noise: variance of a sample (units^2). The 2x2 covariance
+    is kept as three (width,) arrays.
+    """
+
+    def __init__(self, process_noise=20000.0, measurement_noise=4.0, width=NUM_FINGERS, rate=RATE):
+        self.q = float(process_noise)
+        self.r = float(measurement_noise)
+        super().__init__(width, rate)
+
+    def reset(self):
+        super().reset()
+        self.v = np.zeros(self.width)
+        self.p00 = np.full(self.width, self.r)
+        self.p01 = np.zeros(self.width)
+        self.p11 = np.full(self.width, 1e4)
+
+    def __call__(self, sample, t=None):
+        sample = np.asarray(sample, dtype=np.float64)
+        dt = self._dt(t)
+        if self.x is None:
+            self.x = sample
+            return self.x
+        # Predict
+        x = self.x + self.v * dt
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + self.q * dt ** 3 / 3
+        p01 = self.p01 + dt * self.p11 + self.q * dt ** 2 / 2
+        p11 = self.p11 + self.q * dt
+        # Update
+        k0 = p00 / (p00 + self.r)
+        k1 = p01 / (p00 + self.r)
+        error = sample - x
+        self.x = x + k0 * error
+        self.v = self.v + k1 * error
+        self.p00, self.p01, self.p11 = (1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01
+        return self.x
+
+
+FILTERS = {
+    'none': Passthrough,
+    'average': MovingAverage,
+    'ema': ExponentialFilter,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+}
+
+
+def make_filter(spec=DEFAULT_FILTER, width=NUM_FINGERS, rate=RATE):
+    """Filter from a spec: a FILTERS name, optionally with parameters, e.g. 'one_euro:min_cutoff=0.5,beta=0.05'"""
+    name, _, params = spec.partition(':')
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter {name!r}, choose from {', '.join(FILTERS)}")
+    kwargs = {}
+    for param in filter(None, params.split(',')):
+        key, _, value = param.partition('=')
+        kwargs[key.strip()] = float(value)
+    try:
+        return FILTERS[name](width=width, rate=rate, **kwargs)
+    except TypeError as e:
+        raise ValueError(f"Bad parameters in filter spec {spec!r}: {e}") from None
@@ -1,25 +1,46 @@
-import pickle
+import argparse
 import cv2
 import mediapipe as mp
-import numpy as np
-import subprocess
 import time
 import threading
 from queue import Queue
 import sys
 import os
 
+from featurizer import Featurizer, compute_features, feature_set_of
+from landmark_store import DEFAULT_STORE_DIR
+from latency_trace import LatencyTrace, fork
+from letter_decoder import LetterDecoder
+from motion_letters import MotionRecognizer
+from multi_hand import HandTracks, hand_boxes, results_landmarks
+from numpy_model import DEFAULT_EXPORT_DIR, load_classifier
+from online_learning import OnlineTrainer
+from servo_client import ServoClient, ServoError
+from pose_table import PoseTable
+from spelling_scheduler import SpellingScheduler
+from pipeline import Pipeline, open_source
+from roi import RoiLandmarker
+from session_log import SessionRecorder
+
 def clear_console():
     os.system('clear' if os.name == 'posix' else 'cls')
 
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
+# Exported NumPy arrays when present: no scikit-learn import at startup
+model = load_classifier()
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
 hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+# Processes a crop around last frame's hand; the whole frame only when it is lost
+landmarker = RoiLandmarker(hands)
+# Features of the set the model was trained on
+featurizer = Featurizer(feature_set_of(model))
+# J and Z from the fingertip paths; the classifier only sees handshapes
+motion = MotionRecognizer()
+# Slot ids for --hands 2: slot 0 drives the servo hand, slot 1 is display only
+tracks = HandTracks()
 
 # Restored original labels_dict with 25 letters
 labels_dict = {
@@ -29,10 +50,23 @@ labels_dict = {
     18: 'S', 19: 'T', 20: 'U', 21: 'V', 22: 'W', 23: 'X',
     24: 'Y'  # Note: Z typically not included as it requires motion
 }
+# Letter -> model class name, for --learn corrections
+class_names = {letter: str(index) for index, letter in labels_dict.items()}
+
+servo = ServoClient()
+# Same poses and calibration.conf as the daemon, so transition times match the hand
+pose_table = PoseTable()
+speller = SpellingScheduler(pose_table.as_dict())
 
 input_queue = Queue()
 prediction_queue = Queue()
 running = True
+trace = LatencyTrace()
+# --learn: confirmed samples update trainer.model, which the classify stages read every frame
+trainer = None
+
+def current_model():
+    return trainer.model if trainer else model
 
 def print_input_prompt():
     print("\n" + "="*50)
@@ -41,46 +75,38 @@ def print_input_prompt():
     print("="*50)
     return input(">> ")
 
-def run_cpp_program(letter):
+def show_letter(letter):
     try:
         letter = letter.upper()
-        if letter in ['J', 'Z']:
-            print(f"Letter {letter} requires motion and is not supported")
-            return
         if not letter.isalpha():
             print(f"Invalid character: {letter}")
             return
             
         print(f"\nDisplaying letter: {letter}")
-        process = subprocess.Popen(['./hand_test', letter])
-        return process
-    except Exception as e:
-        print(f"Error running C++ program: {e}")
+        pose = servo.show_letter(letter)
+        # Typed text starts from whatever letter the hand holds now
+        speller.current = letter
+        return pose
+    except (OSError, ServoError) as e:
+        print(f"Error talking to servo daemon (is servo_daemon.py running?): {e}")
         return None
 
 def spell_word(word):
     print("\n" + "="*50)
     print(f"NOW SPELLING: {word}")
     print("="*50)
-    
-    for letter in word.upper():
-        if letter.isspace():
-            print("\nPausing for space...")
-            time.sleep(2)
-            continue
-            
-        if letter in ['J', 'Z']:
-            print(f"\nSkipping letter {letter} (requires motion)")
-            continue
-            
-        if not letter.isalpha():
-            print(f"\nSkipping invalid character: {letter}")
-            continue
-            
-        process = run_cpp_program(letter)
-        if process:
-            process.wait()
-        time.sleep(0.5)
+
+    # Pick up calibration.conf edits made while running
+    if pose_table.reload_if_changed():
+        speller.set_poses(pose_table.as_dict())
+    # One timeline for the whole text: each letter starts moving once the last is legible
+    timeline = speller.compile_text(word)
+    for char in timeline.skipped:
+        print(f"\nSkipping invalid character: {char}")
+    try:
+        speller.play(timeline, servo.set_pose, on_letter=lambda letter: print(f"\nDisplaying letter: {letter}"))
+    except (OSError, ServoError) as e:
+        print(f"Error talking to servo daemon (is servo_daemon.py running?): {e}")
 
     print("\nFinished spelling!")
 
@@ -98,30 +124,31 @@ def input_thread():
             running = False
             break
 
-def prediction_thread():
+def prediction_thread(decoder):
     global running
-    last_prediction = None
-    last_prediction_time = time.time()
-    COOLDOWN_TIME = 2
-    current_process = None
     
     while running:
         try:
             if not prediction_queue.empty():
-                predicted_character = prediction_queue.get()
-                current_time = time.time()
-                
-                if (predicted_character != last_prediction and 
-                    current_time - last_prediction_time >= COOLDOWN_TIME):
-                    
-                    if current_process and current_process.poll() is None:
-                        current_process.terminate()
-                        current_process.wait()
+                proba, motion_letter, timeline = prediction_queue.get()
+                if proba is None:
+                    # Hand left the frame: the next sign starts from scratch
+                    decoder.reset()
+                    continue
+
+                # A finished J or Z stroke wins over the handshape it was drawn with
+                predicted_character = decoder.update(proba)
+                if motion_letter is not None:
+                    predicted_character = motion_letter
+                if predicted_character is not None:
+                    forked_at = len(timeline.marks)
+                    timeline.mark('debounce')
                     
                     print(f"\nDetected letter: {predicted_character}")
-                    current_process = run_cpp_program(predicted_character)
-                    last_prediction = predicted_character
-                    last_prediction_time = current_time
+                    show_letter(predicted_character)
+                    timeline.mark('servo')
+                    trace.finish(timeline, forked_at)
+                continue
             
             time.sleep(0.01)
             
@@ -129,80 +156,207 @@ def prediction_thread():
             print(f"Error in prediction thread: {e}")
             continue
 
-def camera_thread():
-    global running
-    cap = cv2.VideoCapture(0)
-    
-    while running:
-        while not input_queue.empty():
-            text = input_queue.get()
-            spell_word(text)
-            
-        data_aux = []
-        x_ = []
-        y_ = []
+recorder = None
 
-        ret, frame = cap.read()
-        if not ret:
-            continue
+def landmark_stage(packet):
+    if not packet.replayed:
+        packet.results = landmarker.process(packet.image)
+    if recorder:
+        recorder.record(packet)
+    return packet
 
-        H, W, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(frame_rgb)
+def classify_stage(packet):
+    if packet.results.multi_hand_landmarks:
+        # Process the first hand only, just like in original code
+        hand_landmarks = packet.results.multi_hand_landmarks[0]  # Take first hand
+        H, W, _ = packet.image.shape
 
-        if results.multi_hand_landmarks:
-            # Process the first hand only, just like in original code
-            hand_landmarks = results.multi_hand_landmarks[0]  # Take first hand
-            
-            mp_drawing.draw_landmarks(
-                frame,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                mp_drawing_styles.get_default_hand_landmarks_style(),
-                mp_drawing_styles.get_default_hand_connections_style())
-
-            # Collect x, y coordinates first
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                x_.append(x)
-                y_.append(y)
-
-            # Then create the data_aux array
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                data_aux.append(x - min(x_))
-                data_aux.append(y - min(y_))
-
-            x1 = int(min(x_) * W) - 10
-            y1 = int(min(y_) * H) - 10
-            x2 = int(max(x_) * W) - 10
-            y2 = int(max(y_) * H) - 10
-
-            prediction = model.predict([np.asarray(data_aux)])
-            predicted_character = labels_dict[int(prediction[0])]
-            
-            # Add prediction to queue
-            prediction_queue.put(predicted_character)
+        features = featurizer(hand_landmarks)
+        packet.bbox = featurizer.bbox(W, H)
+        packet.mark('featurize')
 
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
-            cv2.putText(frame, predicted_character, (x1, y1 - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3, cv2.LINE_AA)
+        classifier = current_model()
+        proba = classifier.predict_proba(features)[0]
+        packet.prediction = labels_dict[int(classifier.classes_[proba.argmax()])]
+        packet.mark('predict')
 
-        cv2.putText(frame, "Press ESC to quit, or type in console", (10, 30), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
-        
-        cv2.imshow('frame', frame)
-        key = cv2.waitKey(1) & 0xFF
-        if key == 27:  # ESC key
-            running = False
-            break
+        motion_letter = motion.update(featurizer.xyz)
+        if motion_letter is not None:
+            packet.prediction = motion_letter
+        packet.mark('motion')
+
+        # Probabilities go to the decoder, with a copy of the timeline for the servo side
+        prediction_queue.put((proba, motion_letter, fork(packet)))
+    else:
+        motion.reset()
+        prediction_queue.put((None, None, None))
+    return packet
+
+def classify_hands_stage(packet):
+    # Every hand in one featurize and one predict_proba call
+    landmarks, handedness = results_landmarks(packet.results, tracks.max_hands)
+    ids = tracks.update(landmarks, handedness)
+    packet.hands = []
+    servo_row = packet.servo_row = ids.index(0) if 0 in ids else None
+    if len(landmarks):
+        H, W, _ = packet.image.shape
+        features = compute_features(landmarks, featurizer.feature_set)
+        boxes = hand_boxes(landmarks, W, H)
+        packet.mark('featurize')
 
-    cap.release()
-    cv2.destroyAllWindows()
+        classifier = current_model()
+        proba = classifier.predict_proba(features)
+        letters = [labels_dict[int(c)] for c in classifier.classes_[proba.argmax(axis=1)]]
+        packet.mark('predict')
+        # A hand no slot was free for (None) is left out until one frees up
+        packet.hands = [(slot, letter, box, hand_landmarks) for slot, letter, box, hand_landmarks
+                        in zip(ids, letters, boxes, packet.results.multi_hand_landmarks) if slot is not None]
+
+    if servo_row is None:
+        motion.reset()
+        prediction_queue.put((None, None, None))
+        return packet
+    motion_letter = motion.update(landmarks[servo_row])
+    packet.prediction = motion_letter or letters[servo_row]
+    packet.mark('motion')
+    prediction_queue.put((proba[servo_row], motion_letter, fork(packet)))
+    return packet
+
+def learn_from_key(packet, key):
+    """Space confirms the letter on screen for the servo hand, a letter key corrects it"""
+    if key == ord(' '):
+        letter = packet.prediction
+    elif ord('a') <= key <= ord('z'):
+        letter = chr(key).upper()
+    else:
+        return
+    landmarks, handedness = results_landmarks(packet.results, tracks.max_hands)
+    # With one hand tracked it is the servo hand; with two, only the hand in slot 0 is
+    row = getattr(packet, 'servo_row', 0)
+    if letter is None or row is None or not len(landmarks):
+        print("\nNo servo hand to learn from")
+        return
+    # The model can only learn classes it was trained with
+    if letter not in class_names or class_names[letter] not in current_model().classes_:
+        print(f"\n{letter} is not one of the model's letters")
+        return
+    trainer.confirm(landmarks[row], class_names[letter], handedness[row])
+    print(f"\nLearning {letter} ({trainer.status()})")
+
+def camera_thread(video=None, headless=False, replay=None, record=None, trace_path=None, max_hands=1):
+    global running, recorder
+    cap = open_source(video, replay=replay)
+    if record:
+        recorder = SessionRecorder(record, int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                   int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    # Capture, MediaPipe and the classifier run on their own threads;
+    # this thread only draws and handles the keyboard. Replays process every frame.
+    classify = classify_hands_stage if max_hands > 1 else classify_stage
+    pipeline = Pipeline(cap, [('landmark', landmark_stage), ('classify', classify)],
+                        lossless=bool(replay), trace=trace)
+
+    # Stop the trainer (which saves what it learned), the recorder and the camera
+    # even when a stage error is re-raised out of the pipeline
+    try:
+        for packet in pipeline:
+            while not input_queue.empty():
+                text = input_queue.get()
+                spell_word(text)
+
+            if not running:
+                break
+            if headless:
+                continue
+
+            frame = packet.image
+            if max_hands > 1:
+                for slot, letter, (x1, y1, x2, y2), hand_landmarks in packet.hands:
+                    mp_drawing.draw_landmarks(
+                        frame,
+                        hand_landmarks,
+                        mp_hands.HAND_CONNECTIONS,
+                        mp_drawing_styles.get_default_hand_landmarks_style(),
+                        mp_drawing_styles.get_default_hand_connections_style())
+                    # Slot 0 is the hand the servo follows
+                    color = (0, 0, 0) if slot == 0 else (255, 0, 0)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 4)
+                    cv2.putText(frame, f"{slot}: {letter}", (x1, y1 - 10),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1.3, color, 3, cv2.LINE_AA)
+            elif packet.prediction is not None:
+                mp_drawing.draw_landmarks(
+                    frame,
+                    packet.results.multi_hand_landmarks[0],
+                    mp_hands.HAND_CONNECTIONS,
+                    mp_drawing_styles.get_default_hand_landmarks_style(),
+                    mp_drawing_styles.get_default_hand_connections_style())
+
+                x1, y1, x2, y2 = packet.bbox
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
+                cv2.putText(frame, packet.prediction, (x1, y1 - 10), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3, cv2.LINE_AA)
+
+            cv2.putText(frame, "Press ESC to quit, or type in console", (10, 30), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
+            pipeline.draw_fps(frame, (10, 60))
+            if trainer:
+                cv2.putText(frame, "SPACE confirms, a-z corrects: " + trainer.status(), (10, 120),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2, cv2.LINE_AA)
+            trace.draw(frame, (10, 150))
+        
+            cv2.imshow('frame', frame)
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:  # ESC key
+                running = False
+                break
+            if trainer and key != 255:
+                learn_from_key(packet, key)
+    finally:
+        pipeline.stop()
+        print(pipeline.summary())
+        print(landmarker.summary())
+        print(trace.summary())
+        if trainer:
+            trainer.stop()
+            print(trainer.status())
+        if trace_path:
+            trace.write(trace_path)
+        if recorder:
+            recorder.close()
+        cap.release()
+        cv2.destroyAllWindows()
 
 def main():
+    parser = argparse.ArgumentParser(description='Sign language interpreter')
+    parser.add_argument('--video', help='read frames from a video file instead of the camera')
+    parser.add_argument('--headless', action='store_true', help='no window, print stage FPS at the end')
+    parser.add_argument('--replay', help='feed landmarks from a session log instead of running MediaPipe')
+    parser.add_argument('--record', help='write the landmarks of this session to a log')
+    parser.add_argument('--trace', help='write per-stage latency percentiles to this .json or .csv at exit')
+    parser.add_argument('--window', type=int, default=6, help='frames of probabilities the decoder averages')
+    parser.add_argument('--threshold', type=float, default=0.7, help='mean probability needed to show a letter')
+    parser.add_argument('--dwell', type=int, default=3, help='frames a letter must lead before it is shown')
+    parser.add_argument('--hands', type=int, default=1, choices=[1, 2],
+                        help='track two hands: the first one seen drives the servo, the other is labelled on screen')
+    parser.add_argument('--full-frame', action='store_true',
+                        help='run MediaPipe on every whole frame instead of a crop around the hand')
+    parser.add_argument('--learn', action='store_true',
+                        help='SPACE confirms the shown letter, a letter key corrects it; the model is '
+                             'updated in the background and the samples are added to the landmark store')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='landmark store --learn appends to')
+    args = parser.parse_args()
+    global hands, landmarker, trainer
+    if args.hands > 1:
+        hands = mp_hands.Hands(static_image_mode=True, max_num_hands=args.hands, min_detection_confidence=0.3)
+    # A crop around one hand would hide a second one coming into view
+    landmarker = RoiLandmarker(hands, crop=not args.full_frame and args.hands == 1)
+    # Tune these offline with: python letter_decoder.py --store ./landmarks
+    decoder = LetterDecoder.for_model(model, labels_dict, window=args.window,
+                                      threshold=args.threshold, dwell=args.dwell)
+    if args.learn:
+        # Re-exported every few samples, so the next start loads what was learned
+        trainer = OnlineTrainer(model, store_path=args.store, export_dir=DEFAULT_EXPORT_DIR).start()
+
     print("\nStarting Sign Language Interpreter")
     print("You can:")
     print("1. Show hand signs to the camera")
@@ -212,7 +366,7 @@ def main():
     print("\nInitializing camera...")
     
     input_thread_ = threading.Thread(target=input_thread)
-    prediction_thread_ = threading.Thread(target=prediction_thread)
+    prediction_thread_ = threading.Thread(target=prediction_thread, args=(decoder,))
     
     input_thread_.daemon = True
     prediction_thread_.daemon = True
@@ -220,7 +374,7 @@ def main():
     input_thread_.start()
     prediction_thread_.start()
 
-    camera_thread()
+    camera_thread(args.video, args.headless, args.replay, args.record, args.trace, args.hands)
 
     global running
     running = False
@@ -1,10 +1,17 @@
-import pickle
+import os
+import sys
+
 import cv2
 import mediapipe as mp
-import numpy as np
 
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from featurizer import Featurizer, feature_set_of
+from numpy_model import load_classifier
+from roi import RoiLandmarker
+
+# Exported NumPy arrays when present: no scikit-learn import at startup
+model = load_classifier()
 
 cap = cv2.VideoCapture(0)  # Changed to 0 for primary webcam
 
@@ -13,6 +20,9 @@ mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
 hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+# Processes a crop around last frame's hand; the whole frame only when it is lost
+landmarker = RoiLandmarker(hands)
+featurizer = Featurizer(feature_set_of(model))
 
 # Updated labels_dict to include all 24 letters
 labels_dict = {
@@ -24,18 +34,12 @@ labels_dict = {
 }
 
 while True:
-    data_aux = []
-    x_ = []
-    y_ = []
-
     ret, frame = cap.read()
     if not ret:
         continue
 
     H, W, _ = frame.shape
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    results = hands.process(frame_rgb)
+    results = landmarker.process(frame)
     if results.multi_hand_landmarks:
         for hand_landmarks in results.multi_hand_landmarks:
             mp_drawing.draw_landmarks(
@@ -45,24 +49,11 @@ while True:
                 mp_drawing_styles.get_default_hand_landmarks_style(),
                 mp_drawing_styles.get_default_hand_connections_style())
 
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                x_.append(x)
-                y_.append(y)
-
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                data_aux.append(x - min(x_))
-                data_aux.append(y - min(y_))
-
-        x1 = int(min(x_) * W) - 10
-        y1 = int(min(y_) * H) - 10
-        x2 = int(max(x_) * W) - 10
-        y2 = int(max(y_) * H) - 10
+        # The classifier was trained on a single hand
+        features = featurizer(results.multi_hand_landmarks[0])
+        x1, y1, x2, y2 = featurizer.bbox(W, H)
 
-        prediction = model.predict([np.asarray(data_aux)])
+        prediction = model.predict(features)
         predicted_character = labels_dict[int(prediction[0])]
 
         cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
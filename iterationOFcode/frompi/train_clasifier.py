@@ -1,21 +1,50 @@
-import pickle
+import argparse
+import os
+import sys
+
+import numpy as np
 
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
-import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from augment import Augmenter, fit_augmented
+from featurizer import FEATURE_SETS
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+from model_registry import DEFAULT_MODEL, MODELS, export_model, make_model, save_model
+from numpy_model import DEFAULT_EXPORT_DIR
+
+
+parser = argparse.ArgumentParser(description='Train the sign classifier and write model.p')
+parser.add_argument('--model', default=DEFAULT_MODEL, choices=list(MODELS),
+                    help='classifier to train (compare them with bench_models.py)')
+parser.add_argument('--features',
+                    help=f"feature set to train on: one of {', '.join(FEATURE_SETS)} or several joined "
+                         "with '+' (compare them with bench_features.py); default: the model's own")
+parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+parser.add_argument('--output', default='model.p')
+parser.add_argument('--export', default=DEFAULT_EXPORT_DIR,
+                    help='directory for the NumPy-only copy the inference scripts load')
+parser.add_argument('--augment', type=int, default=0, metavar='COPIES',
+                    help='also train on this many rotated/scaled/mirrored copies of each sample '
+                         '(regenerated every epoch for the mlp)')
+args = parser.parse_args()
 
-data_dict = pickle.load(open('./data.pickle', 'rb'))
+store = LandmarkStore.open(args.store, mmap_mode='r')
 
-data = np.asarray(data_dict['data'])
-labels = np.asarray(data_dict['labels'])
+model = make_model(args.model, args.features)
 
-x_train, x_test, y_train, y_test = train_test_split(data, labels, test_size=0.2, shuffle=True, stratify=labels)
+data = store.features(feature_set=model.feature_set)
+labels = store.label_names()
 
-model = RandomForestClassifier()
+train_rows, test_rows = train_test_split(np.arange(len(labels)), test_size=0.2, shuffle=True, stratify=labels)
+x_train, x_test, y_train, y_test = data[train_rows], data[test_rows], labels[train_rows], labels[test_rows]
 
-model.fit(x_train, y_train)
+if args.augment:
+    fit_augmented(model, store.landmarks[train_rows], y_train, Augmenter(), args.augment)
+else:
+    model.fit(x_train, y_train)
 
 y_predict = model.predict(x_test)
 
@@ -23,6 +52,5 @@ score = accuracy_score(y_predict, y_test)
 
 print('{}% of samples were classified correctly !'.format(score * 100))
 
-f = open('model.p', 'wb')
-pickle.dump({'model': model}, f)
-f.close()
\ No newline at end of file
+save_model(model, args.output, args.model)
+export_model(model, args.export)
@@ -0,0 +1,101 @@
+"""Finger bend angles and servo targets for whole hands in a few vectorized ops.
+
+mimic_fingers.py and hand_mirror.py used to build three small np.arrays per
+finger from protobuf attributes, take five dot products in a Python loop and
+call np.interp once per finger. Kinematics works on a (21, 3) landmark array
+(or a (T, 21, 3) batch, e.g. a session log): it gathers the three joints of
+all five fingers with one fancy index, and returns the (..., 5) bend angles
+in degrees -- 0 for a straight finger -- and the (..., 5) servo targets
+between each finger's calibrated straight and bent counts.
+
+    kinematics = Kinematics.load('mimic')
+    landmarks, _ = results_landmarks(results)
+    angles = kinematics.angles(landmarks[0])
+    robot.move_servos(kinematics.servo_targets(angles))
+
+Two joint layouts match the two scripts: 'mimic' bends at MCP-PIP-TIP in
+3D, 'mirror' at CMC/MCP-MCP/PIP-TIP in the image plane. finger_ranges.conf
+overrides the per-finger ranges, one line per finger:
+
+    mimic,thumb,0,90,375,150   # mode,finger,straight angle,bent angle,straight servo,bent servo
+
+bench_hand_kinematics.py compares the per-frame cost with the old loops.
+"""
+import os
+
+import numpy as np
+
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, NUM_FINGERS
+
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+
+RANGES_FILE = 'finger_ranges.conf'
+
+# Per mode: (5, 3) landmark indices of each finger's (base, joint, tip) and the dimensions used
+JOINTS = {
+    'mimic': (np.array([[2, 3, 4], [6, 7, 8], [10, 11, 12], [14, 15, 16], [18, 19, 20]]), 3),
+    'mirror': (np.array([[1, 2, 4], [5, 6, 8], [9, 10, 12], [13, 14, 16], [17, 18, 20]]), 2),
+}
+
+# Per mode: (5, 4) straight angle, bent angle, straight servo, bent servo for each finger
+DEFAULT_RANGES = {
+    'mimic': np.array([[0, 90, FINGER_STRAIGHT, FINGER_BENT]]
+                      + [[0, 110, FINGER_STRAIGHT, FINGER_BENT]] * 4, dtype=np.float64),
+    'mirror': np.array([[0, 90, FINGER_STRAIGHT, FINGER_BENT]] * NUM_FINGERS, dtype=np.float64),
+}
+
+
+def load_ranges(mode, ranges_file=RANGES_FILE):
+    """(5, 4) ranges for mode: defaults overridden by any valid lines of ranges_file"""
+    ranges = DEFAULT_RANGES[mode].copy()
+    if not os.path.exists(ranges_file):
+        return ranges
+    with open(ranges_file) as f:
+        for line in f:
+            fields = [field.strip() for field in line.split('#')[0].split(',')]
+            if len(fields) != 6 or fields[0] != mode or fields[1] not in FINGER_NAMES:
+                continue
+            try:
+                values = [float(field) for field in fields[2:]]
+            except ValueError:
+                print(f"Ignoring invalid line in {ranges_file}: {line.strip()}")
+                continue
+            if values[0] == values[1]:
+                print(f"Ignoring empty angle range in {ranges_file}: {line.strip()}")
+                continue
+            ranges[FINGER_NAMES.index(fields[1])] = values
+    return ranges
+
+
+class Kinematics:
+    def __init__(self, joints, dims, ranges):
+        """joints: (5, 3) landmark indices per finger; dims: 2 (image plane) or 3;
+        ranges: (5, 4) straight angle, bent angle, straight servo, bent servo"""
+        self.joints = np.asarray(joints)
+        self.dims = dims
+        ranges = np.asarray(ranges, dtype=np.float64)
+        self.angle_from, self.angle_span = ranges[:, 0], ranges[:, 1] - ranges[:, 0]
+        self.servo_from, self.servo_span = ranges[:, 2], ranges[:, 3] - ranges[:, 2]
+
+    @classmethod
+    def load(cls, mode, ranges_file=RANGES_FILE):
+        joints, dims = JOINTS[mode]
+        return cls(joints, dims, load_ranges(mode, ranges_file))
+
+    def angles(self, landmarks):
+        """(..., 5) degrees each finger bends at its middle joint, 0 when straight"""
+        points = np.asarray(landmarks, dtype=np.float64)[..., self.joints, :self.dims]
+        v1 = points[..., 1, :] - points[..., 0, :]
+        v2 = points[..., 2, :] - points[..., 1, :]
+        norms = np.sqrt((v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1))
+        cos = (v1 * v2).sum(axis=-1) / np.maximum(norms, 1e-12)
+        return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+    def servo_targets(self, angles):
+        """(..., 5) servo counts for the angles, clamped to each finger's range"""
+        t = np.clip((angles - self.angle_from) / self.angle_span, 0.0, 1.0)
+        return self.servo_from + t * self.servo_span
+
+    def __call__(self, landmarks):
+        angles = self.angles(landmarks)
+        return angles, self.servo_targets(angles)
@@ -1,12 +1,18 @@
+import argparse
 import cv2
 import mediapipe as mp
-import numpy as np
-import subprocess
 import time
 import threading
 from queue import Queue
 import sys
 
+from hand_kinematics import Kinematics
+from latency_trace import LatencyTrace
+from multi_hand import results_landmarks
+from pipeline import Pipeline, open_source
+from servo_client import ServoClient, ServoError
+from session_log import SessionRecorder
+
 # Initialize MediaPipe
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
@@ -20,117 +26,99 @@ hands = mp_hands.Hands(
     min_tracking_confidence=0.5
 )
 
-def calculate_finger_bend(finger_points):
-    """Calculate how bent a finger is from 0 (straight) to 1 (fully bent)"""
-    # Get the three points that make up the finger
-    root, middle, tip = finger_points
-    
-    # Calculate angles between the finger segments
-    angle = calculate_angle(root, middle, tip)
-    
-    # Normalize angle to a 0-1 range where:
-    # 180 degrees (straight) = 0
-    # ~90 degrees (bent) = 1
-    bend_value = (180 - angle) / 90
-    return min(max(bend_value, 0), 1)  # Clamp between 0 and 1
-
-def calculate_angle(p1, p2, p3):
-    """Calculate angle between three points"""
-    v1 = np.array([p1.x - p2.x, p1.y - p2.y])
-    v2 = np.array([p3.x - p2.x, p3.y - p2.y])
-    
-    cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-    angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-    return np.degrees(angle)
-
-def get_finger_positions(hand_landmarks):
-    """Get normalized bend values for each finger"""
-    # Finger landmark indices
-    fingers = {
-        'thumb': [1, 2, 4],     # CMC, MCP, TIP
-        'index': [5, 6, 8],     # MCP, PIP, TIP
-        'middle': [9, 10, 12],  # MCP, PIP, TIP
-        'ring': [13, 14, 16],   # MCP, PIP, TIP
-        'pinky': [17, 18, 20]   # MCP, PIP, TIP
-    }
-    
-    bend_values = []
-    for finger in fingers.values():
-        points = [hand_landmarks.landmark[i] for i in finger]
-        bend = calculate_finger_bend(points)
-        bend_values.append(bend)
-    
-    return bend_values
-
-def map_to_servo_values(bend_values):
-    """Map bend values (0-1) to servo values"""
-    # Convert each bend value to a servo position
-    servo_positions = []
-    for bend in bend_values:
-        # Map 0-1 to servo range (375-150)
-        servo_val = int(375 - (bend * (375-150)))
-        servo_positions.append(servo_val)
-    return servo_positions
-
-def run_cpp_program(servo_values):
-    """Send servo values to C++ program"""
+# Finger bends in the image plane, finger_ranges.conf overrides the 375-150 servo ranges
+kinematics = Kinematics.load('mirror')
+
+servo = ServoClient()
+
+def send_servo_values(servo_values):
+    """Send servo values to the servo daemon"""
     try:
-        # Convert values to strings
-        value_str = ','.join(map(str, servo_values))
-        subprocess.run(['./hand_mirror', value_str], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error running C++ program: {e}")
+        servo.set_pose(servo_values)
+    except (OSError, ServoError) as e:
+        print(f"Error talking to servo daemon (is servo_daemon.py running?): {e}")
 
 def main():
-    cap = cv2.VideoCapture(0)
-    last_servo_update = time.time()
+    parser = argparse.ArgumentParser(description='Mirror your hand on the robotic hand')
+    parser.add_argument('--video', help='read frames from a video file instead of the camera')
+    parser.add_argument('--headless', action='store_true', help='no window, print stage FPS at the end')
+    parser.add_argument('--replay', help='feed landmarks from a session log instead of running MediaPipe')
+    parser.add_argument('--record', help='write the landmarks of this session to a log')
+    parser.add_argument('--trace', help='write per-stage latency percentiles to this .json or .csv at exit')
+    args = parser.parse_args()
+
+    cap = open_source(args.video, replay=args.replay)
+    recorder = SessionRecorder(args.record, int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                               int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) if args.record else None
+    last_servo_update = 0.0
     UPDATE_INTERVAL = 0.1  # Update servos every 100ms
     
     print("Starting hand mirroring program...")
     print("Press ESC to quit")
-    
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
+
+    def landmark(packet):
+        if not packet.replayed:
+            # Convert image and process
+            image = cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB)
+            image.flags.writeable = False
+            packet.results = hands.process(image)
+        if recorder:
+            recorder.record(packet)
+        return packet
+
+    def mirror(packet):
+        nonlocal last_servo_update
+        if packet.results.multi_hand_landmarks:
+            # Get finger positions and update servos if enough time has passed
+            current_time = time.time()
+            if current_time - last_servo_update >= UPDATE_INTERVAL:
+                landmarks, _ = results_landmarks(packet.results, 1)
+                angles = kinematics.angles(landmarks[0])
+                packet.prediction = kinematics.servo_targets(angles).astype(int).tolist()
+                packet.mark('bend')
+                send_servo_values(packet.prediction)
+                last_servo_update = current_time
+        return packet
+
+    # Replays process every frame so runs are repeatable
+    trace = LatencyTrace()
+    pipeline = Pipeline(cap, [('landmark', landmark), ('servo', mirror)], lossless=bool(args.replay),
+                        trace=trace)
+
+    for packet in pipeline:
+        if args.headless:
             continue
+        image = packet.image
+
+        for hand_landmarks in packet.results.multi_hand_landmarks or []:
+            # Draw hand landmarks
+            mp_drawing.draw_landmarks(
+                image,
+                hand_landmarks,
+                mp_hands.HAND_CONNECTIONS,
+                mp_drawing_styles.get_default_hand_landmarks_style(),
+                mp_drawing_styles.get_default_hand_connections_style()
+            )
 
-        # Convert image and process
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-        results = hands.process(image)
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks
-                mp_drawing.draw_landmarks(
-                    image,
-                    hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style()
-                )
-
-                # Get finger positions and update servos if enough time has passed
-                current_time = time.time()
-                if current_time - last_servo_update >= UPDATE_INTERVAL:
-                    bend_values = get_finger_positions(hand_landmarks)
-                    servo_values = map_to_servo_values(bend_values)
-                    
-                    # Display values on image
-                    cv2.putText(image, f"Servo values: {servo_values}", 
-                              (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                              1, (0, 255, 0), 2)
-                    
-                    run_cpp_program(servo_values)
-                    last_servo_update = current_time
+        if packet.prediction is not None:
+            # Display values on image
+            cv2.putText(image, f"Servo values: {packet.prediction}", 
+                      (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                      1, (0, 255, 0), 2)
+        trace.draw(image, (10, 60))
 
         # Show image
         cv2.imshow('Hand Tracking', image)
         if cv2.waitKey(5) & 0xFF == 27:  # ESC key
             break
 
+    pipeline.stop()
+    print(pipeline.summary())
+    print(trace.summary())
+    if args.trace:
+        trace.write(args.trace)
+    if recorder:
+        recorder.close()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -1,25 +1,36 @@
-import pickle
 import cv2
 import mediapipe as mp
-import numpy as np
-import subprocess
 import time
 import threading
 from queue import Queue
 import sys
 import os
 
+from featurizer import Featurizer, feature_set_of
+from letter_decoder import LetterDecoder
+from motion_letters import MotionRecognizer
+from numpy_model import load_classifier
+from roi import RoiLandmarker
+from servo_client import ServoClient, ServoError
+from pose_table import PoseTable
+from spelling_scheduler import SpellingScheduler
+
 def clear_console():
     os.system('clear' if os.name == 'posix' else 'cls')
 
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
+# Exported NumPy arrays when present: no scikit-learn import at startup
+model = load_classifier()
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
 hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+# Processes a crop around last frame's hand; the whole frame only when it is lost
+landmarker = RoiLandmarker(hands)
+featurizer = Featurizer(feature_set_of(model))
+# J and Z from the fingertip paths; the classifier only sees handshapes
+motion = MotionRecognizer()
 
 # Updated labels_dict to match your C++ implementation
 labels_dict = {
@@ -29,6 +40,11 @@ labels_dict = {
     18: 'T', 19: 'U', 20: 'V', 21: 'W', 22: 'X', 23: 'Y'
 }
 
+servo = ServoClient()
+# Same poses and calibration.conf as the daemon, so transition times match the hand
+pose_table = PoseTable()
+speller = SpellingScheduler(pose_table.as_dict())
+
 input_queue = Queue()
 running = True
 
@@ -39,42 +55,36 @@ def print_input_prompt():
     print("="*50)
     return input(">> ")
 
-def run_cpp_program(letter):
+def show_letter(letter):
     try:
         letter = letter.upper()
-        if letter in ['J', 'Z']:
-            print(f"Letter {letter} requires motion and is not supported")
-            return
         if not letter.isalpha():
             print(f"Invalid character: {letter}")
             return
             
         print(f"\nDisplaying letter: {letter}")
-        subprocess.run(['./hand_test', letter], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error running C++ program: {e}")
+        servo.show_letter(letter)
+        # Typed text starts from whatever letter the hand holds now
+        speller.current = letter
+    except (OSError, ServoError) as e:
+        print(f"Error talking to servo daemon (is servo_daemon.py running?): {e}")
 
 def spell_word(word):
     print("\n" + "="*50)
     print(f"NOW SPELLING: {word}")
     print("="*50)
-    
-    for letter in word.upper():
-        if letter.isspace():
-            print("\nPausing for space...")
-            time.sleep(2)
-            continue
-            
-        if letter in ['J', 'Z']:
-            print(f"\nSkipping letter {letter} (requires motion)")
-            continue
-            
-        if not letter.isalpha():
-            print(f"\nSkipping invalid character: {letter}")
-            continue
-            
-        run_cpp_program(letter)
-        time.sleep(1)  # Wait between letters
+
+    # Pick up calibration.conf edits made while running
+    if pose_table.reload_if_changed():
+        speller.set_poses(pose_table.as_dict())
+    # One timeline for the whole text: each letter starts moving once the last is legible
+    timeline = speller.compile_text(word)
+    for char in timeline.skipped:
+        print(f"\nSkipping invalid character: {char}")
+    try:
+        speller.play(timeline, servo.set_pose, on_letter=lambda letter: print(f"\nDisplaying letter: {letter}"))
+    except (OSError, ServoError) as e:
+        print(f"Error talking to servo daemon (is servo_daemon.py running?): {e}")
 
     print("\nFinished spelling!")
 
@@ -98,10 +108,8 @@ def camera_thread():
     global running
     cap = cv2.VideoCapture(0)
     
-    # Initialize these variables at the start of the thread
-    last_prediction = None
-    last_prediction_time = time.time()
-    COOLDOWN_TIME = 2  # Seconds between predictions
+    # Averages class probabilities over the last frames; see letter_decoder.py
+    decoder = LetterDecoder.for_model(model, labels_dict)
     
     while running:
         # Check for text input
@@ -110,18 +118,13 @@ def camera_thread():
             spell_word(text)
             
         # Regular camera detection
-        data_aux = []
-        x_ = []
-        y_ = []
-
         ret, frame = cap.read()
         if not ret:
             continue
 
         H, W, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        results = hands.process(frame_rgb)
+        results = landmarker.process(frame)
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 mp_drawing.draw_landmarks(
@@ -131,39 +134,28 @@ def camera_thread():
                     mp_drawing_styles.get_default_hand_landmarks_style(),
                     mp_drawing_styles.get_default_hand_connections_style())
 
-                for i in range(len(hand_landmarks.landmark)):
-                    x = hand_landmarks.landmark[i].x
-                    y = hand_landmarks.landmark[i].y
-                    x_.append(x)
-                    y_.append(y)
-
-                for i in range(len(hand_landmarks.landmark)):
-                    x = hand_landmarks.landmark[i].x
-                    y = hand_landmarks.landmark[i].y
-                    data_aux.append(x - min(x_))
-                    data_aux.append(y - min(y_))
+            # The classifier was trained on a single hand
+            features = featurizer(results.multi_hand_landmarks[0])
+            x1, y1, x2, y2 = featurizer.bbox(W, H)
 
-            x1 = int(min(x_) * W) - 10
-            y1 = int(min(y_) * H) - 10
-            x2 = int(max(x_) * W) - 10
-            y2 = int(max(y_) * H) - 10
+            proba = model.predict_proba(features)[0]
+            predicted_character = decoder.labels[proba.argmax()]
 
-            prediction = model.predict([np.asarray(data_aux)])
-            predicted_character = labels_dict[int(prediction[0])]
-
-            current_time = time.time()
-            
-            # Only trigger the C++ program if it's a new prediction and enough time has passed
-            if (predicted_character != last_prediction and 
-                current_time - last_prediction_time >= COOLDOWN_TIME):
-                print(f"\nDetected letter: {predicted_character}")
-                run_cpp_program(predicted_character)
-                last_prediction = predicted_character
-                last_prediction_time = current_time
+            # Only move the hand once the decoder commits to a letter, or a J / Z stroke ends
+            committed = decoder.update(proba)
+            motion_letter = motion.update(featurizer.xyz)
+            if motion_letter is not None:
+                committed = predicted_character = motion_letter
+            if committed is not None:
+                print(f"\nDetected letter: {committed}")
+                show_letter(committed)
 
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
             cv2.putText(frame, predicted_character, (x1, y1 - 10), 
                         cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3, cv2.LINE_AA)
+        else:
+            decoder.reset()
+            motion.reset()
 
         cv2.putText(frame, "Press ESC to quit, or type in console", (10, 30), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
@@ -0,0 +1,191 @@
+"""Parallel, resumable hand landmark extraction for the letter image dataset.
+
+Images live under DATA_DIR/<class>/<image>.jpg. Every class directory is a
+shard: a pool of worker processes each owns its own MediaPipe Hands instance
+and works through whole shards. A manifest records (mtime, size) for every
+image seen so re-runs only decode new or changed images and merge them into
+the existing landmark store.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from landmark_store import (DEFAULT_STORE_DIR, HANDEDNESS_CODES, HANDEDNESS_UNKNOWN,
+                            NUM_LANDMARKS, LandmarkStore)
+
+MANIFEST_FILE = 'data_manifest.json'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# One Hands instance per worker process, created by _init_worker
+_hands = None
+
+
+def _init_worker(min_detection_confidence):
+    global _hands
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(static_image_mode=True,
+                                      min_detection_confidence=min_detection_confidence)
+
+
+def _extract_image(img_file):
+    import cv2
+    img = cv2.imread(img_file)
+    if img is None:
+        return None
+
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return _hands.process(img_rgb)
+
+
+def results_to_sample(results):
+    """(landmarks, handedness, score) of a single detected hand, or None"""
+    if not results.multi_hand_landmarks or len(results.multi_hand_landmarks) != 1:
+        return None
+    xyz = np.array([(lm.x, lm.y, lm.z) for lm in results.multi_hand_landmarks[0].landmark],
+                   dtype=np.float32)
+    if xyz.shape != (NUM_LANDMARKS, 3):
+        return None
+
+    handedness, score = HANDEDNESS_UNKNOWN, 1.0
+    if results.multi_handedness:
+        classification = results.multi_handedness[0].classification[0]
+        handedness = HANDEDNESS_CODES.get(classification.label, HANDEDNESS_UNKNOWN)
+        score = classification.score
+    return xyz, handedness, score
+
+
+def extract_shard(data_dir, label, img_names):
+    """Extract landmarks for a list of images from one class directory.
+
+    Returns a list of (relative path, label, sample or None) tuples where
+    sample is (landmarks, handedness, score). None marks an image that could
+    not be used so it is not retried on every run.
+    """
+    results = []
+    for img_name in img_names:
+        rel_path = os.path.join(label, img_name)
+        detection = _extract_image(os.path.join(data_dir, rel_path))
+        sample = None
+        if detection is None:
+            print(f"Failed to load image: {rel_path}")
+        else:
+            sample = results_to_sample(detection)
+            if sample is None:
+                n_hands = len(detection.multi_hand_landmarks or [])
+                print(f"Skipping {rel_path}: expected one hand, found {n_hands}")
+        results.append((rel_path, label, sample))
+    return results
+
+
+def scan_images(data_dir):
+    """Map relative image path -> [mtime, size] for every image under data_dir"""
+    images = {}
+    for label in sorted(os.listdir(data_dir)):
+        dir_path = os.path.join(data_dir, label)
+        if not os.path.isdir(dir_path):
+            continue
+        for img_name in sorted(os.listdir(dir_path)):
+            if not img_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            st = os.stat(os.path.join(dir_path, img_name))
+            images[os.path.join(label, img_name)] = [st.st_mtime, st.st_size]
+    return images
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_existing(store_dir):
+    """Load previous results as {relative path: (label, sample)}"""
+    if not LandmarkStore.exists(store_dir):
+        return {}
+    store = LandmarkStore.open(store_dir, mmap_mode=None)
+    existing = {}
+    for source, label, xyz, handedness, score in store.iter_samples():
+        if source in existing:
+            # Merging would keep only one of them and silently drop the rest
+            raise ValueError(f"{store_dir} has more than one sample from source {source!r}")
+        existing[source] = (label, (xyz, handedness, score))
+    return existing
+
+
+def build_dataset(data_dir='./data', store_dir=DEFAULT_STORE_DIR, manifest_path=None,
+                  workers=None, full=False, min_detection_confidence=0.3):
+    """Extract landmarks for new or changed images and merge them into store_dir"""
+    if manifest_path is None:
+        manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    workers = workers or os.cpu_count() or 1
+
+    images = scan_images(data_dir)
+    manifest = load_manifest(manifest_path)
+    existing = load_existing(store_dir)
+    if full:
+        # Drop what came from images; samples captured live (take_letter_pics_100.py
+        # --landmarks, online learning) have no image to re-extract and are kept
+        existing = {path: sample for path, sample in existing.items()
+                    if path not in manifest and path not in images}
+        manifest = {}
+    if not existing:
+        manifest = {}
+
+    stale = [path for path, stat in images.items() if manifest.get(path) != stat]
+    removed = [path for path in manifest if path not in images]
+    print(f"{len(images)} images: {len(stale)} new or changed, "
+          f"{len(removed)} removed, {len(images) - len(stale)} up to date")
+
+    for path in removed + stale:
+        existing.pop(path, None)
+        manifest.pop(path, None)
+
+    # Shard by class directory
+    shards = {}
+    for path in stale:
+        label, img_name = os.path.split(path)
+        shards.setdefault(label, []).append(img_name)
+
+    def merge(shard_results):
+        for rel_path, label, sample in shard_results:
+            manifest[rel_path] = images[rel_path]
+            if sample is not None:
+                existing[rel_path] = (label, sample)
+        print(f"Processed directory: {shard_results[0][1]} ({len(shard_results)} images)")
+
+    if shards:
+        if workers == 1 or len(shards) == 1:
+            _init_worker(min_detection_confidence)
+            for label, img_names in shards.items():
+                merge(extract_shard(data_dir, label, img_names))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards)),
+                                     initializer=_init_worker,
+                                     initargs=(min_detection_confidence,)) as pool:
+                futures = [pool.submit(extract_shard, data_dir, label, img_names)
+                           for label, img_names in shards.items()]
+                for future in as_completed(futures):
+                    merge(future.result())
+
+    store = LandmarkStore.from_samples((path, label) + sample
+                                       for path, (label, sample) in sorted(existing.items()))
+
+    print(f"Landmarks shape: {store.landmarks.shape}")
+    print(f"Total processed images: {len(store)}")
+    print(f"Number of classes: {len(store.classes)}")
+
+    store.save(store_dir)
+    save_manifest(manifest, manifest_path)
+
+    print(f"Data saved to {store_dir}/")
+    return store
@@ -0,0 +1,131 @@
+"""Columnar on-disk store for hand landmark samples.
+
+A store is a directory of plain .npy files, one per column, so every column
+can be opened with mmap_mode and sliced without reading the whole dataset:
+
+    landmarks.npy   (N, 21, 3) float32  MediaPipe x, y, z per landmark
+    labels.npy      (N,) int32          index into classes.npy
+    classes.npy     (C,) str            class names (the data directory names)
+    source.npy      (N,) str            image path or capture id of each sample
+    handedness.npy  (N,) int8           HANDEDNESS_LEFT / HANDEDNESS_RIGHT / HANDEDNESS_UNKNOWN
+    score.npy       (N,) float32        MediaPipe handedness/detection score
+"""
+import os
+
+import numpy as np
+
+from featurizer import DEFAULT_FEATURES, NUM_LANDMARKS, compute_features
+
+DEFAULT_STORE_DIR = 'landmarks'
+
+HANDEDNESS_UNKNOWN = -1
+HANDEDNESS_LEFT = 0
+HANDEDNESS_RIGHT = 1
+HANDEDNESS_CODES = {'Left': HANDEDNESS_LEFT, 'Right': HANDEDNESS_RIGHT}
+
+COLUMNS = ('landmarks', 'labels', 'source', 'handedness', 'score')
+
+
+class LandmarkStore:
+    def __init__(self, landmarks, labels, classes, source=None, handedness=None, score=None):
+        n = len(landmarks)
+        self.landmarks = landmarks
+        self.labels = labels
+        self.classes = np.asarray(classes, dtype=str)
+        self.source = source if source is not None else np.full(n, '', dtype=str)
+        self.handedness = (handedness if handedness is not None
+                           else np.full(n, HANDEDNESS_UNKNOWN, dtype=np.int8))
+        self.score = score if score is not None else np.ones(n, dtype=np.float32)
+
+    @classmethod
+    def from_samples(cls, samples):
+        """Build a store from (source, class name, landmarks, handedness, score) tuples"""
+        samples = list(samples)
+        classes = sorted({s[1] for s in samples})
+        class_index = {name: i for i, name in enumerate(classes)}
+        n = len(samples)
+
+        landmarks = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+        labels = np.empty(n, dtype=np.int32)
+        handedness = np.empty(n, dtype=np.int8)
+        score = np.empty(n, dtype=np.float32)
+        for i, (_, label, xyz, hand, hand_score) in enumerate(samples):
+            landmarks[i] = xyz
+            labels[i] = class_index[label]
+            handedness[i] = hand
+            score[i] = hand_score
+        source = np.array([s[0] for s in samples], dtype=str)
+        return cls(landmarks, labels, classes, source, handedness, score)
+
+    @classmethod
+    def empty(cls):
+        """Store with no samples and no classes, to append to"""
+        return cls(np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32), np.empty(0, dtype=np.int32), [])
+
+    @classmethod
+    def open(cls, path=DEFAULT_STORE_DIR, mmap_mode='r'):
+        """Open a saved store; with mmap_mode set, columns are paged in on access"""
+        columns = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                   for name in COLUMNS}
+        classes = np.load(os.path.join(path, 'classes.npy'))
+        return cls(columns['landmarks'], columns['labels'], classes, columns['source'],
+                   columns['handedness'], columns['score'])
+
+    @staticmethod
+    def exists(path=DEFAULT_STORE_DIR):
+        return os.path.exists(os.path.join(path, 'landmarks.npy'))
+
+    def save(self, path=DEFAULT_STORE_DIR):
+        """Write every column; each file is replaced atomically so open readers keep working"""
+        os.makedirs(path, exist_ok=True)
+        arrays = {name: getattr(self, name) for name in COLUMNS}
+        arrays['classes'] = self.classes
+        for name, array in arrays.items():
+            tmp_path = os.path.join(path, name + '.tmp.npy')
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, os.path.join(path, name + '.npy'))
+
+    def append(self, landmarks, class_names, source=None, handedness=None, score=None):
+        """New store with (n, 21, 3) samples of the given class names added at the end.
+
+        Classes seen for the first time are added to classes (kept sorted, as
+        from_samples builds them) and existing labels are renumbered to match.
+        """
+        n = len(landmarks)
+        class_names = np.asarray(class_names, dtype=str)
+        classes = np.array(sorted(set(self.classes.tolist()) | set(class_names.tolist())), dtype=str)
+        remap = np.searchsorted(classes, self.classes).astype(np.int32)
+        labels = np.concatenate([remap[np.asarray(self.labels)],
+                                 np.searchsorted(classes, class_names).astype(np.int32)])
+        if source is None:
+            source = np.full(n, '', dtype=str)
+        if handedness is None:
+            handedness = np.full(n, HANDEDNESS_UNKNOWN, dtype=np.int8)
+        if score is None:
+            score = np.ones(n, dtype=np.float32)
+        return LandmarkStore(
+            np.concatenate([self.landmarks, np.asarray(landmarks, dtype=np.float32)]), labels, classes,
+            np.concatenate([self.source, np.asarray(source, dtype=str)]),
+            np.concatenate([self.handedness, np.asarray(handedness, dtype=np.int8)]),
+            np.concatenate([self.score, np.asarray(score, dtype=np.float32)]))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def subset(self, index):
+        """New store over the selected rows (a slice stays a view of the mapped file)"""
+        return LandmarkStore(self.landmarks[index], self.labels[index], self.classes,
+                             self.source[index], self.handedness[index], self.score[index])
+
+    def label_names(self, index=slice(None)):
+        """Class names of the selected samples, as the old data.pickle 'labels' held them"""
+        return self.classes[self.labels[index]]
+
+    def iter_samples(self):
+        for i in range(len(self)):
+            yield (str(self.source[i]), str(self.classes[self.labels[i]]), self.landmarks[i],
+                   int(self.handedness[i]), float(self.score[i]))
+
+    def features(self, index=slice(None), feature_set=DEFAULT_FEATURES):
+        """Classifier features of the selected samples, shape (n, 42) for the default set"""
+        return compute_features(self.landmarks[index], feature_set)
@@ -0,0 +1,128 @@
+"""Per-frame latency tracing from camera capture to servo command.
+
+Every FramePacket carries its capture time and a list of (name, time) marks;
+Pipeline marks the end of each stage and the scripts add finer marks such as
+'featurize', 'predict', 'debounce' and 'servo'. LatencyTrace.finish() folds a
+packet's marks into fixed-size ring buffers, one per mark name, holding
+
+    span   time since the previous mark (or capture), i.e. that step's cost
+           including any queue wait in front of it
+    since  time since capture, i.e. the end-to-end latency at that point
+
+A mark is one list append and finish is a few array stores per mark, so it
+is cheap enough to leave on (bench_latency_trace.py measures it). report()
+gives p50/p95/p99 per mark in milliseconds; write() saves it as .json or
+.csv and draw() overlays it on a frame. finish and report hold a lock, so
+the display and prediction threads can share one trace.
+"""
+import csv
+import json
+import threading
+import time
+
+import cv2
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class Timeline:
+    """Capture time plus marks, for work that leaves its FramePacket behind"""
+
+    def __init__(self, captured_at, marks=None):
+        self.captured_at = captured_at
+        self.marks = marks if marks is not None else []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+
+def fork(packet):
+    """Copy of a packet's timeline that another thread can keep marking"""
+    return Timeline(packet.captured_at, list(packet.marks))
+
+
+class LatencyTrace:
+    def __init__(self, capacity=2048, refresh=0.5):
+        self.capacity = capacity
+        self.refresh = refresh
+        self.frames = 0
+        self._span = {}
+        self._since = {}
+        self._count = {}
+        self._report = {}
+        self._report_at = 0.0
+        self._lock = threading.Lock()
+
+    def finish(self, timeline, first=0):
+        """Record a finished packet or Timeline, from its marks[first] onwards.
+
+        first lets a forked Timeline add only the marks made after the fork
+        when the packet itself is finished elsewhere.
+        """
+        start = prev = timeline.captured_at
+        if first:
+            prev = timeline.marks[first - 1][1]
+        with self._lock:
+            for name, at in timeline.marks[first:]:
+                n = self._count.get(name)
+                if n is None:
+                    n = 0
+                    self._span[name] = np.full(self.capacity, np.nan)
+                    self._since[name] = np.full(self.capacity, np.nan)
+                i = n % self.capacity
+                self._span[name][i] = at - prev
+                self._since[name][i] = at - start
+                self._count[name] = n + 1
+                prev = at
+            self.frames += 1
+
+    def report(self):
+        """{mark: {'count', 'span_p50', ..., 'since_p99'}} in milliseconds, in first-seen order"""
+        report = {}
+        with self._lock:
+            for name, n in self._count.items():
+                filled = min(n, self.capacity)
+                row = {'count': n}
+                for kind, rings in (('span', self._span), ('since', self._since)):
+                    values = np.percentile(rings[name][:filled], PERCENTILES) * 1e3
+                    for p, value in zip(PERCENTILES, values):
+                        row[f'{kind}_p{p}'] = round(float(value), 3)
+                report[name] = row
+        return report
+
+    def cached_report(self):
+        """report(), recomputed at most every `refresh` seconds (for per-frame overlays)"""
+        now = time.perf_counter()
+        if now - self._report_at >= self.refresh:
+            self._report = self.report()
+            self._report_at = now
+        return self._report
+
+    def write(self, path):
+        report = self.report()
+        if path.endswith('.csv'):
+            fields = ['stage'] + list(next(iter(report.values()), {}).keys())
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for name, row in report.items():
+                    writer.writerow({'stage': name, **row})
+        else:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def summary(self):
+        lines = [f"{'stage':<10} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'since capture p50/p95':>22}"]
+        for name, row in self.report().items():
+            lines.append(f"{name:<10} {row['count']:>7} {row['span_p50']:>6.2f}ms {row['span_p95']:>6.2f}ms "
+                         f"{row['span_p99']:>6.2f}ms {row['since_p50']:>10.2f} / {row['since_p95']:.2f}ms")
+        return '\n'.join(lines)
+
+    def draw(self, image, origin=(10, 20)):
+        """Overlay since-capture p50/p95 per mark in the image corner"""
+        x, y = origin
+        for name, row in self.cached_report().items():
+            cv2.putText(image, f"{name}: {row['since_p50']:.0f}/{row['since_p95']:.0f} ms", (x, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+            y += 18
@@ -0,0 +1,232 @@
+"""Streaming letter decoder: class probabilities in, debounced letters out.
+
+Replaces the "new letter and 2 s since the last one" rule in the inference
+loops. Each frame's predict_proba row goes into a ring buffer of the last
+`window` frames and a letter is committed when
+
+    - its mean probability over the buffer is at least `threshold`, and
+    - it has been the buffer's top class for `dwell` consecutive frames, and
+    - it is not the letter already being held.
+
+A committed letter is held until its mean probability falls below
+`release`, so a steady hand fires once and a single noisy frame fires
+nothing. reset() (no hand in frame) clears the buffer and the hold, so the
+same letter can be signed again after the hand drops.
+
+Offline evaluation against ground truth, sweeping decoder settings and
+comparing them with the old cooldown rule:
+
+    python letter_decoder.py --store ./landmarks           # synthetic sessions from labelled samples
+    python letter_decoder.py --log s.asllog --truth s.csv  # a recorded session
+
+A truth CSV has rows `first_frame,class` (class as in model.classes_, i.e.
+the data directory names); each label holds until the next row and an
+empty class means no sign.
+"""
+import argparse
+import csv
+import itertools
+
+import numpy as np
+
+
+class LetterDecoder:
+    def __init__(self, labels, window=6, threshold=0.7, dwell=3, release=0.3):
+        self.labels = list(labels)
+        self.window = window
+        self.threshold = threshold
+        self.dwell = dwell
+        self.release = release
+        self._buffer = np.zeros((window, len(self.labels)))
+        self._sum = np.zeros(len(self.labels))
+        self.reset()
+
+    @classmethod
+    def for_model(cls, model, labels_dict=None, **settings):
+        """Decoder over model.predict_proba columns, named through labels_dict[int(class)] if given"""
+        labels = model.classes_
+        if labels_dict is not None:
+            labels = [labels_dict[int(c)] for c in labels]
+        return cls(labels, **settings)
+
+    def reset(self):
+        self._buffer[:] = 0
+        self._sum[:] = 0
+        self._filled = 0
+        self._position = 0
+        self.candidate = None
+        self._streak = 0
+        self.held = None
+
+    @property
+    def confidence(self):
+        """Mean probability of the current candidate over the buffer"""
+        if self.candidate is None:
+            return 0.0
+        return float(self._sum[self.candidate] / self._filled)
+
+    def update(self, proba):
+        """Add one (C,) probability row; returns the label committed on this frame, or None"""
+        row = self._buffer[self._position]
+        self._sum -= row
+        row[:] = proba
+        self._sum += row
+        self._position = (self._position + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+
+        mean = self._sum / self._filled
+        top = int(mean.argmax())
+        self._streak = self._streak + 1 if top == self.candidate else 1
+        self.candidate = top
+
+        if self.held is not None and mean[self.held] < self.release:
+            self.held = None
+        if top != self.held and self._streak >= self.dwell and mean[top] >= self.threshold:
+            self.held = top
+            return self.labels[top]
+        return None
+
+
+def decode(decoder, probas):
+    """[(frame, label)] committed over a sequence of proba rows, None rows meaning no hand"""
+    commits = []
+    for frame, proba in enumerate(probas):
+        if proba is None:
+            decoder.reset()
+            continue
+        label = decoder.update(proba)
+        if label is not None:
+            commits.append((frame, label))
+    return commits
+
+
+def cooldown_commits(labels, probas, fps, cooldown=2.0):
+    """The old rule: fire when the argmax letter changes and `cooldown` s have passed"""
+    commits = []
+    last, last_time = None, 0.0
+    for frame, proba in enumerate(probas):
+        if proba is None:
+            continue
+        label = labels[int(np.argmax(proba))]
+        now = frame / fps
+        if label != last and now - last_time >= cooldown:
+            commits.append((frame, label))
+            last, last_time = label, now
+    return commits
+
+
+def score(commits, truth, fps):
+    """Latency-to-commit and false triggers of `commits` against per-frame truth labels.
+
+    Every run of one non-None truth label is a sign; its latency is the time
+    from the run's first frame to the first commit of that label inside it.
+    A commit whose label differs from the truth on its frame is a false
+    trigger; a second commit of the right label within one sign is a repeat.
+    """
+    by_frame = dict(commits)
+    latencies, missed, repeats, signs = [], 0, 0, 0
+    for label, run in itertools.groupby(enumerate(truth), key=lambda item: item[1]):
+        if label is None:
+            continue
+        frames = [frame for frame, _ in run]
+        signs += 1
+        hits = [frame for frame in frames if by_frame.get(frame) == label]
+        if hits:
+            latencies.append((hits[0] - frames[0]) / fps)
+            repeats += len(hits) - 1
+        else:
+            missed += 1
+    false = sum(1 for frame, label in commits if truth[frame] != label)
+    minutes = len(truth) / fps / 60
+    latencies = np.array(latencies) * 1e3 if latencies else np.full(1, np.nan)
+    return {'signs': signs, 'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)), 'missed': missed,
+            'false': false, 'false_per_min': false / minutes if minutes else 0.0, 'repeats': repeats}
+
+
+def synthetic_session(store, rng, signs=200, hold=(15, 45), gap=(0, 10)):
+    """Per-frame (landmarks or None, truth) from store samples: each sign held for a random
+    number of frames, each frame a different sample of that class, with hand-less gaps"""
+    by_class = [np.flatnonzero(store.labels == c) for c in range(len(store.classes))]
+    rows, truth = [], []
+    for _ in range(signs):
+        c = rng.integers(len(store.classes))
+        n = rng.integers(*hold)
+        rows.extend(rng.choice(by_class[c], n))
+        truth.extend([str(store.classes[c])] * n)
+        g = rng.integers(*gap)
+        rows.extend([None] * g)
+        truth.extend([None] * g)
+    return rows, truth
+
+
+def session_probas(model, features, present):
+    """Per-frame proba rows, None where `present` is False"""
+    probas = iter(model.predict_proba(features)) if len(features) else iter(())
+    return [next(probas) if p else None for p in present]
+
+
+def read_truth(path, frames):
+    truth = [None] * frames
+    with open(path, newline='') as f:
+        rows = sorted((int(first), label.strip() or None) for first, label in csv.reader(f))
+    for (first, label), (end, _) in zip(rows, rows[1:] + [(frames, None)]):
+        truth[first:end] = [label] * (end - first)
+    return truth
+
+
+def main():
+    from featurizer import compute_features, feature_set_of
+    from numpy_model import load_classifier
+
+    parser = argparse.ArgumentParser(description='Latency-to-commit vs. false triggers of decoder settings')
+    parser.add_argument('--store', help='landmark store to build synthetic sessions from')
+    parser.add_argument('--log', help='recorded session log (needs --truth)')
+    parser.add_argument('--truth', help='CSV of first_frame,class for --log')
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--signs', type=int, default=200, help='signs per synthetic session')
+    parser.add_argument('--noise', type=float, default=0.01,
+                        help='std of Gaussian jitter added to synthetic landmarks, as a shaky live hand')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_classifier()
+    labels = [str(c) for c in model.classes_]
+    if args.log:
+        from session_log import SessionLog
+        if not args.truth:
+            parser.error('--log needs --truth')
+        log = SessionLog(args.log)
+        frames, landmarks = log.first_hands()
+        present = np.zeros(len(log), dtype=bool)
+        present[frames] = True
+        probas = session_probas(model, compute_features(landmarks, feature_set_of(model)), present)
+        truth = read_truth(args.truth, len(log))
+    elif args.store:
+        from landmark_store import LandmarkStore
+        store = LandmarkStore.open(args.store, mmap_mode='r')
+        rng = np.random.default_rng(args.seed)
+        rows, truth = synthetic_session(store, rng, args.signs)
+        present = np.array([r is not None for r in rows])
+        landmarks = store.landmarks[np.array([r for r in rows if r is not None], dtype=np.int64)]
+        landmarks = landmarks + rng.normal(0, args.noise, landmarks.shape)
+        probas = session_probas(model, compute_features(landmarks, feature_set_of(model)), present)
+    else:
+        parser.error('one of --store or --log is required')
+
+    print(f"{len(truth)} frames at {args.fps:g} fps\n")
+    print(f"{'decoder':34s} {'signs':>5s} {'p50':>7s} {'p95':>7s} {'missed':>6s} {'false':>5s} {'false/min':>9s} {'repeats':>7s}")
+
+    def show(name, result):
+        print(f"{name:34s} {result['signs']:5d} {result['latency_p50_ms']:5.0f}ms {result['latency_p95_ms']:5.0f}ms "
+              f"{result['missed']:6d} {result['false']:5d} {result['false_per_min']:9.2f} {result['repeats']:7d}")
+
+    show('cooldown 2s (old rule)', score(cooldown_commits(labels, probas, args.fps), truth, args.fps))
+    for window, threshold, dwell in itertools.product((4, 6, 10), (0.6, 0.8), (2, 4)):
+        decoder = LetterDecoder(labels, window=window, threshold=threshold, dwell=dwell)
+        show(f"window={window} threshold={threshold} dwell={dwell}",
+             score(decode(decoder, probas), truth, args.fps))
+
+
+if __name__ == '__main__':
+    main()
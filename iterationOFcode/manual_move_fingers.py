@@ -1,71 +1,42 @@
-import smbus
 import time
 import sys
+import argparse
 import termios
 import tty
-import threading
 from pynput import keyboard
 
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, PCA9685, ServoWriter, open_bus
+
 class RoboticHand:
-    def __init__(self):
-        # PCA9685 setup
-        self.bus = smbus.SMBus(1)
-        self.I2C_ADDR = 0x40
+    def __init__(self, fake=False, rate=50, max_step=25):
+        # PCA9685 setup; only the writer thread touches the bus
+        self.writer = ServoWriter(PCA9685(open_bus(fake)), rate=rate, max_step=max_step)
         
         # Servo positions
-        self.STRAIGHT = 375
-        self.BENT = 150
-        
-        # Initialize controller
-        self.init_controller()
+        self.STRAIGHT = FINGER_STRAIGHT
+        self.BENT = FINGER_BENT
         
-        # Track positions and active keys
+        # Target positions and active keys
         self.positions = [self.STRAIGHT] * 5
         self.pressed_keys = set()
         
         # Movement step
         self.step = 10
-        
-        # Threading lock for I2C access
-        self.lock = threading.Lock()
-
-    def init_controller(self):
-        """Initialize the PCA9685"""
-        with self.lock:
-            self.bus.write_byte_data(self.I2C_ADDR, 0x00, 0x00)
-            time.sleep(0.05)
-            
-            prescale = int(25000000.0 / 4096.0 / 50.0 - 1)
-            old_mode = self.bus.read_byte_data(self.I2C_ADDR, 0x00)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x00, (old_mode & 0x7F) | 0x10)
-            self.bus.write_byte_data(self.I2C_ADDR, 0xFE, prescale)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x00, old_mode)
-            time.sleep(0.05)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x00, old_mode | 0x80)
 
-    def move_servo(self, channel, value):
-        """Move a servo to a position"""
-        value = max(self.BENT, min(self.STRAIGHT, value))
-        channel = 4 * channel
-        
-        with self.lock:
-            self.bus.write_byte_data(self.I2C_ADDR, 0x06 + channel, 0)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x07 + channel, 0)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x08 + channel, value & 0xFF)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x09 + channel, value >> 8)
+    def move_servos(self, positions):
+        """Hand the writer a new target pose; returns immediately"""
+        self.writer.set_target([max(self.BENT, min(self.STRAIGHT, p)) for p in positions])
 
     def reset_all(self):
-        """Reset all fingers to straight position"""
-        for i in range(5):
-            self.positions[i] = self.STRAIGHT
-            self.move_servo(i, self.STRAIGHT)
-            time.sleep(0.1)
+        """Reset all fingers to straight position on the writer's next tick"""
+        self.positions = [self.STRAIGHT] * 5
+        self.writer.set_target(self.positions, snap=True)
 
     def on_press(self, key):
         """Handle key press events"""
         try:
             # Convert key to string if it's a character
-            k = key.char if hasattr(key, 'char') else str(key)
+            k = key.char if hasattr(key, 'char') else key.name
             self.pressed_keys.add(k)
         except AttributeError:
             pass
@@ -74,7 +45,7 @@ class RoboticHand:
         """Handle key release events"""
         try:
             # Remove released key from set
-            k = key.char if hasattr(key, 'char') else str(key)
+            k = key.char if hasattr(key, 'char') else key.name
             self.pressed_keys.discard(k)
         except AttributeError:
             pass
@@ -96,7 +67,15 @@ def print_instructions():
     print("\nYou can press multiple keys simultaneously!")
 
 def main():
-    hand = RoboticHand()
+    parser = argparse.ArgumentParser(description='Drive the robotic hand from the keyboard')
+    parser.add_argument('--rate', type=float, default=50, help='servo writes per second')
+    parser.add_argument('--max-step', type=int, default=25,
+                        help='largest move per finger per write (0 = jump straight to target)')
+    parser.add_argument('--fake-bus', action='store_true', help='use an in-memory servo bus instead of /dev/i2c-1')
+    args = parser.parse_args()
+
+    hand = RoboticHand(args.fake_bus, args.rate, args.max_step or None)
+    hand.writer.start()
     print_instructions()
 
     # Start keyboard listener
@@ -108,20 +87,27 @@ def main():
     # Main control loop
     try:
         while listener.is_alive():
+            positions = list(hand.positions)
+            reset = False
             # Process all currently pressed keys
             for key in hand.pressed_keys.copy():  # Use copy to avoid modification during iteration
-                if key in 'qwert':  # Up movements
+                if key in ('q', 'w', 'e', 'r', 't'):  # Up movements
                     finger = {'q': 0, 'w': 1, 'e': 2, 'r': 3, 't': 4}[key]
-                    hand.positions[finger] = min(hand.STRAIGHT, hand.positions[finger] + hand.step)
-                    hand.move_servo(finger, hand.positions[finger])
+                    positions[finger] = min(hand.STRAIGHT, positions[finger] + hand.step)
                 
-                elif key in 'asdfg':  # Down movements
+                elif key in ('a', 's', 'd', 'f', 'g'):  # Down movements
                     finger = {'a': 0, 's': 1, 'd': 2, 'f': 3, 'g': 4}[key]
-                    hand.positions[finger] = max(hand.BENT, hand.positions[finger] - hand.step)
-                    hand.move_servo(finger, hand.positions[finger])
+                    positions[finger] = max(hand.BENT, positions[finger] - hand.step)
                 
                 elif key == 'space':
-                    hand.reset_all()
+                    reset = True
+
+            # Never blocks on I2C: the writer thread coalesces targets
+            if reset:
+                hand.reset_all()
+            elif positions != hand.positions:
+                hand.positions = positions
+                hand.move_servos(positions)
 
             time.sleep(0.01)  # Small delay to prevent CPU overuse
 
@@ -129,8 +115,8 @@ def main():
         print(f"Error: {e}")
     finally:
         # Clean up
-        hand.reset_all()
         listener.stop()
+        hand.writer.stop(pose=[hand.STRAIGHT] * 5)
 
 if __name__ == "__main__":
     try:
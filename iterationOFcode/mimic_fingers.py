@@ -6,141 +6,168 @@
 
 # ------------------------------------------------------------
 
+import argparse
 import cv2
 import mediapipe as mp
-import numpy as np
-import smbus
-import time
+import sys
+import threading
 from math import atan2, degrees
-from collections import deque
+
+from filters import DEFAULT_FILTER, FILTERS, make_filter
+from hand_kinematics import Kinematics
+from latency_trace import LatencyTrace
+from multi_hand import HandTracks, results_landmarks
+from pipeline import Pipeline, open_source
+from session_log import SessionRecorder
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, I2C_ADDR, PCA9685, open_bus
 
 class RoboticHand:
-    def __init__(self):
-        self.bus = smbus.SMBus(1)
-        self.I2C_ADDR = 0x40
+    def __init__(self, fake=False, address=I2C_ADDR):
+        self.controller = PCA9685(open_bus(fake), address)
         
         # Servo range
-        self.STRAIGHT = 375
-        self.BENT = 150
-        
-        # Smoothing buffers for each finger
-        self.position_buffers = [deque(maxlen=3) for _ in range(5)]
-        for buffer in self.position_buffers:
-            buffer.extend([self.STRAIGHT] * 3)
+        self.STRAIGHT = FINGER_STRAIGHT
+        self.BENT = FINGER_BENT
         
-        self.init_controller()
+        # Angles are smoothed upstream by HandTracker's filters
         self.positions = [self.STRAIGHT] * 5
 
-    def init_controller(self):
-        self.bus.write_byte_data(self.I2C_ADDR, 0x00, 0x00)
-        time.sleep(0.05)
-        prescale = int(25000000.0 / 4096.0 / 50.0 - 1)
-        old_mode = self.bus.read_byte_data(self.I2C_ADDR, 0x00)
-        self.bus.write_byte_data(self.I2C_ADDR, 0x00, (old_mode & 0x7F) | 0x10)
-        self.bus.write_byte_data(self.I2C_ADDR, 0xFE, prescale)
-        self.bus.write_byte_data(self.I2C_ADDR, 0x00, old_mode)
-        time.sleep(0.05)
-        self.bus.write_byte_data(self.I2C_ADDR, 0x00, old_mode | 0x80)
-
-    def smooth_position(self, finger, new_position):
-        """Apply smoothing to servo movements"""
-        self.position_buffers[finger].append(new_position)
-        return int(sum(self.position_buffers[finger]) / len(self.position_buffers[finger]))
-
-    def move_servo(self, channel, value):
-        """Move servo with smoothing"""
-        value = self.smooth_position(channel, value)
-        value = max(self.BENT, min(self.STRAIGHT, value))
+    def move_servos(self, values):
+        """Move all five fingers, in one bus transaction"""
+        for channel, value in enumerate(values):
+            value = max(self.BENT, min(self.STRAIGHT, int(value)))
+            if abs(self.positions[channel] - value) > 2:  # Only move if change is significant
+                self.positions[channel] = value
+        # Unchanged fingers are skipped by the controller
+        self.controller.set_pose(self.positions)
+
+    def reset(self):
+        self.positions = [self.STRAIGHT] * 5
+        self.controller.set_pose(self.positions)
+
+class FingerAngles:
+    def __init__(self, max_hands=1, filter_spec=DEFAULT_FILTER):
+        # Per-finger joint angles and servo ranges, finger_ranges.conf overrides the defaults
+        self.kinematics = Kinematics.load('mimic')
         
-        if abs(self.positions[channel] - value) > 2:  # Only move if change is significant
-            self.positions[channel] = value
-            channel = 4 * channel
-            self.bus.write_byte_data(self.I2C_ADDR, 0x06 + channel, 0)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x07 + channel, 0)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x08 + channel, value & 0xFF)
-            self.bus.write_byte_data(self.I2C_ADDR, 0x09 + channel, value >> 8)
-
-class HandTracker:
-    def __init__(self):
+        # Angle smoothing, one filter per tracked hand
+        self.smoothers = [make_filter(filter_spec) for _ in range(max_hands)]
+
+    def calculate_finger_angles(self, landmarks, slot=0, t=None):
+        """(5,) finger angles of a (21, 3) landmark array, smoothed over the frames of hand `slot`"""
+        return self.smoothers[slot](self.kinematics.angles(landmarks), t)
+
+    def servo_targets(self, angles):
+        """(5,) servo positions for the finger angles"""
+        return self.kinematics.servo_targets(angles)
+
+    def reset(self):
+        """Forget the smoothed angles, so the next frame is not pulled toward the old pose"""
+        for smoother in self.smoothers:
+            smoother.reset()
+
+class HandTracker(FingerAngles):
+    def __init__(self, max_hands=1, filter_spec=DEFAULT_FILTER):
+        super().__init__(max_hands, filter_spec)
         self.mp_hands = mp.solutions.hands
         # Increased confidence thresholds for better accuracy
         self.hands = self.mp_hands.Hands(
-            max_num_hands=1,  # Track only one hand
+            max_num_hands=max_hands,  # One per robotic hand
             model_complexity=1,  # Higher complexity for better accuracy
             min_detection_confidence=0.8,  # Increased from 0.7
             min_tracking_confidence=0.6    # Increased from 0.5
         )
         self.mp_draw = mp.solutions.drawing_utils
-        
-        # Landmark indices
-        self.FINGER_TIPS = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky tips
-        self.FINGER_PIPS = [3, 7, 11, 15, 19]  # Second joints
-        self.FINGER_MCPS = [2, 6, 10, 14, 18]  # Base joints
-        
-        # Angle smoothing buffers
-        self.angle_buffers = [deque(maxlen=5) for _ in range(5)]
-        self.prev_angles = [0] * 5
 
-    def calculate_finger_angles(self, hand_landmarks):
-        """Calculate precise finger angles"""
-        angles = []
-        
-        for finger in range(5):
-            # Get joint positions
-            tip = np.array([
-                hand_landmarks.landmark[self.FINGER_TIPS[finger]].x,
-                hand_landmarks.landmark[self.FINGER_TIPS[finger]].y,
-                hand_landmarks.landmark[self.FINGER_TIPS[finger]].z
-            ])
-            pip = np.array([
-                hand_landmarks.landmark[self.FINGER_PIPS[finger]].x,
-                hand_landmarks.landmark[self.FINGER_PIPS[finger]].y,
-                hand_landmarks.landmark[self.FINGER_PIPS[finger]].z
-            ])
-            mcp = np.array([
-                hand_landmarks.landmark[self.FINGER_MCPS[finger]].x,
-                hand_landmarks.landmark[self.FINGER_MCPS[finger]].y,
-                hand_landmarks.landmark[self.FINGER_MCPS[finger]].z
-            ])
-            
-            # Calculate vectors using 3D coordinates
-            v1 = pip - mcp
-            v2 = tip - pip
-            
-            # Calculate angle between vectors
-            angle = np.arccos(np.clip(np.dot(v1, v2) / 
-                            (np.linalg.norm(v1) * np.linalg.norm(v2)), -1.0, 1.0))
-            angle = np.degrees(angle)
-            
-            # Apply smoothing
-            self.angle_buffers[finger].append(angle)
-            smoothed_angle = sum(self.angle_buffers[finger]) / len(self.angle_buffers[finger])
-            
-            angles.append(smoothed_angle)
+def frame_time(packet):
+    # Replays assume a steady frame rate so filtered runs are repeatable
+    return None if packet.replayed else packet.captured_at
+
+def mimic_main_hand(tracker, robot, packet):
+    """One-hand servo stage: put the hand closest to the camera on robot"""
+    landmarks, _ = results_landmarks(packet.results)
+    if len(landmarks):
+        # Get the hand closest to the camera (largest in frame)
+        main = int(landmarks[:, :, 2].sum(axis=1).argmax())
+        packet.main_hand = packet.results.multi_hand_landmarks[main]
         
-        return angles
-
-    def map_angle_to_servo(self, angle, finger):
-        """Map angles to servo positions with improved precision"""
-        # Customized mapping for each finger
-        if finger == 0:  # Thumb
-            return np.interp(angle, [0, 90], [375, 150])
-        else:  # Other fingers
-            return np.interp(angle, [0, 110], [375, 150])
+        # Calculate and apply finger positions
+        packet.prediction = tracker.calculate_finger_angles(landmarks[main], t=frame_time(packet))
+        packet.mark('angles')
+        robot.move_servos(tracker.servo_targets(packet.prediction))
+    return packet
 
 def main():
-    cap = cv2.VideoCapture(0)
+    parser = argparse.ArgumentParser(description='Mirror your hand on the robotic hand')
+    parser.add_argument('--video', help='read frames from a video file instead of the camera')
+    parser.add_argument('--headless', action='store_true', help='no window, print stage FPS at the end')
+    parser.add_argument('--fake-bus', action='store_true', help='use an in-memory servo bus instead of /dev/i2c-1')
+    parser.add_argument('--replay', help='feed landmarks from a session log instead of running MediaPipe')
+    parser.add_argument('--record', help='write the landmarks of this session to a log')
+    parser.add_argument('--trace', help='write per-stage latency percentiles to this .json or .csv at exit')
+    parser.add_argument('--hands', type=int, default=1, choices=[1, 2],
+                        help='mirror two hands, the second on a PCA9685 at --second-address')
+    parser.add_argument('--second-address', type=lambda v: int(v, 0), default=0x41,
+                        help='I2C address of the second hand\'s servo board')
+    parser.add_argument('--filter', default=DEFAULT_FILTER,
+                        help=f"angle smoothing: {', '.join(FILTERS)}, with optional parameters, "
+                             "e.g. one_euro:min_cutoff=1.0,beta=0.02 or average:window=5")
+    args = parser.parse_args()
+
+    cap = open_source(args.video, replay=args.replay)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     cap.set(cv2.CAP_PROP_FPS, 30)
+    recorder = SessionRecorder(args.record, int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                               int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) if args.record else None
     
-    tracker = HandTracker()
-    robot = RoboticHand()
-    
-    # Variables for FPS calculation
-    fps_start_time = time.time()
-    fps_frame_count = 0
-    fps = 0
+    tracker = HandTracker(args.hands, args.filter)
+    robot = RoboticHand(args.fake_bus)
+    robots = [robot] + [RoboticHand(args.fake_bus, args.second_address)] * (args.hands > 1)
+    # Keeps each hand on the same robotic hand while MediaPipe reorders them
+    tracks = HandTracks(args.hands)
+    reset_requested = threading.Event()
+
+    def landmark(packet):
+        # Process image
+        packet.image = cv2.flip(packet.image, 1)
+        if not packet.replayed:
+            image_rgb = cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB)
+            packet.results = tracker.hands.process(image_rgb)
+        if recorder:
+            recorder.record(packet)
+        return packet
+
+    def servo(packet):
+        # The servo thread owns the I2C bus, so resets are applied here too
+        if reset_requested.is_set():
+            reset_requested.clear()
+            for r in robots:
+                r.reset()
+            tracker.reset()
+
+        if args.hands > 1:
+            return mirror_hands(packet)
+        return mimic_main_hand(tracker, robot, packet)
+
+    def mirror_hands(packet):
+        landmarks, handedness = results_landmarks(packet.results, args.hands)
+        packet.hands = []
+        for slot, hand, xyz in zip(tracks.update(landmarks, handedness),
+                                   packet.results.multi_hand_landmarks or [], landmarks):
+            if slot is None:
+                continue
+            angles = tracker.calculate_finger_angles(xyz, slot, t=frame_time(packet))
+            robots[slot].move_servos(tracker.servo_targets(angles))
+            packet.hands.append(hand)
+            if slot == 0:
+                packet.main_hand, packet.prediction = hand, angles
+        return packet
+
+    # Replays process every frame so runs are repeatable
+    trace = LatencyTrace()
+    pipeline = Pipeline(cap, [('landmark', landmark), ('servo', servo)], lossless=bool(args.replay),
+                        trace=trace)
     
     print("\nHand Tracking Started")
     print("=====================")
@@ -151,49 +178,31 @@ def main():
     print("- Press 'r' to reset hand position")
     print("=====================\n")
 
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
+    for packet in pipeline:
+        if args.headless:
             continue
-
-        # FPS calculation
-        fps_frame_count += 1
-        if fps_frame_count >= 30:
-            fps = fps_frame_count / (time.time() - fps_start_time)
-            fps_start_time = time.time()
-            fps_frame_count = 0
-
-        # Process image
-        image = cv2.flip(image, 1)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = tracker.hands.process(image_rgb)
+        image = packet.image
 
         # Clear background for better visualization
         overlay = image.copy()
         cv2.rectangle(overlay, (0, 0), (200, 180), (0, 0, 0), -1)
         cv2.addWeighted(overlay, 0.6, image, 0.4, 0, image)
 
-        if results.multi_hand_landmarks:
-            # Get the hand closest to the camera (largest in frame)
-            main_hand = max(results.multi_hand_landmarks, 
-                          key=lambda x: sum(lm.z for lm in x.landmark))
-            
+        for hand in getattr(packet, 'hands', []):
+            if hand is not getattr(packet, 'main_hand', None):
+                tracker.mp_draw.draw_landmarks(image, hand, tracker.mp_hands.HAND_CONNECTIONS)
+
+        if packet.prediction is not None:
             # Draw landmarks
             tracker.mp_draw.draw_landmarks(
-                image, main_hand, tracker.mp_hands.HAND_CONNECTIONS,
+                image, packet.main_hand, tracker.mp_hands.HAND_CONNECTIONS,
                 tracker.mp_draw.DrawingSpec(color=(0,255,0), thickness=2, circle_radius=2),
                 tracker.mp_draw.DrawingSpec(color=(0,0,255), thickness=2)
             )
             
-            # Calculate and apply finger positions
-            angles = tracker.calculate_finger_angles(main_hand)
-            
-            for finger, angle in enumerate(angles):
-                servo_pos = tracker.map_angle_to_servo(angle, finger)
-                robot.move_servo(finger, servo_pos)
-                
-                # Display finger angles
-                finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+            # Display finger angles
+            finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+            for finger, angle in enumerate(packet.prediction):
                 cv2.putText(
                     image,
                     f"{finger_names[finger]}: {int(angle)}°",
@@ -207,13 +216,14 @@ def main():
         # Display FPS
         cv2.putText(
             image,
-            f"FPS: {int(fps)}",
+            f"FPS: {int(pipeline.meters['display'].fps)}",
             (10, 170),
             cv2.FONT_HERSHEY_SIMPLEX,
             0.6,
             (255, 255, 255),
             2
         )
+        trace.draw(image, (220, 20))
 
         cv2.imshow('Hand Tracking', image)
         
@@ -222,9 +232,15 @@ def main():
             break
         elif key == ord('r'):
             # Reset hand position
-            for i in range(5):
-                robot.move_servo(i, robot.STRAIGHT)
-
+            reset_requested.set()
+
+    pipeline.stop()
+    print(pipeline.summary())
+    print(trace.summary())
+    if args.trace:
+        trace.write(args.trace)
+    if recorder:
+        recorder.close()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -0,0 +1,242 @@
+"""Classifiers that can sit behind model.p, selected by name.
+
+Every model takes the rows Featurizer produces -- (N, 42) min-shifted
+coordinates unless it was trained on another featurizer feature set, which
+train_clasifier.py records as model.feature_set -- and has the sklearn
+predict / predict_proba / classes_ interface, so the inference scripts load
+any of them the same way:
+
+    forest          RandomForestClassifier() as train_clasifier.py always used
+    small_forest    30 trees, depth <= 12: a fraction of the size and latency
+    logistic        StandardScaler + LogisticRegression, on the
+                    wrist_normalized+fingertip_distances feature set unless
+                    told otherwise: a linear model cannot undo hand position
+                    and size itself
+    mlp             NumpyMLP: one hidden layer, predicted with two matmuls
+                    (also partial_fit, which online_learning.py uses)
+
+bench_models.py compares them on accuracy, size, load time and latency.
+export_model writes any of them as flat arrays for numpy_model.py, which
+predicts without importing scikit-learn.
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from featurizer import DEFAULT_FEATURES, feature_set_of
+from numpy_model import DEFAULT_EXPORT_DIR
+
+
+class NumpyMLP:
+    """One-hidden-layer ReLU network trained with Adam, NumPy only.
+
+    After fit the input standardization is folded into the first layer and the
+    weights are stored as float32, so predict is two small matmuls with no
+    sklearn validation overhead.
+    """
+
+    def __init__(self, hidden=64, epochs=200, batch_size=64, learning_rate=1e-2,
+                 weight_decay=1e-4, seed=0):
+        self.hidden = hidden
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.seed = seed
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_, y = np.unique(y, return_inverse=True)
+        self._rng = np.random.default_rng(self.seed)
+        self._init(X)
+        self._train(X, y, self.epochs)
+        return self
+
+    def partial_fit(self, X, y, classes=None):
+        """A few Adam steps over one batch, continuing from the current weights.
+
+        As in scikit-learn, the first call on an unfitted model needs `classes`.
+        The input scaling is taken from that first batch and kept.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if not hasattr(self, '_params'):
+            if classes is None and not hasattr(self, 'classes_'):
+                raise ValueError("classes must be passed on the first call to partial_fit")
+            if classes is not None:
+                self.classes_ = np.asarray(classes)
+            self._rng = np.random.default_rng(self.seed)
+            self._init(X)
+        index = {c: i for i, c in enumerate(self.classes_.tolist())}
+        unknown = set(np.asarray(y).tolist()) - set(index)
+        if unknown:
+            raise ValueError(f"partial_fit got classes {sorted(unknown)} not in classes_")
+        self._train(X, np.array([index[c] for c in np.asarray(y).tolist()]), 1)
+        return self
+
+    def _init(self, X):
+        d, c = X.shape[1], len(self.classes_)
+        self._mean = X.mean(axis=0)
+        self._scale = X.std(axis=0)
+        self._scale[self._scale == 0] = 1.0
+        rng = self._rng
+        self._params = [rng.normal(0, np.sqrt(2.0 / d), (d, self.hidden)), np.zeros(self.hidden),
+                        rng.normal(0, np.sqrt(1.0 / self.hidden), (self.hidden, c)), np.zeros(c)]
+        self._m = [np.zeros_like(p) for p in self._params]
+        self._v = [np.zeros_like(p) for p in self._params]
+        self._step = 0
+
+    def _train(self, X, y, epochs):
+        n = len(X)
+        Xs = (X - self._mean) / self._scale
+        onehot = np.eye(len(self.classes_))[y]
+        params, m, v = self._params, self._m, self._v
+        beta1, beta2 = 0.9, 0.999
+
+        for _ in range(epochs):
+            order = self._rng.permutation(n)
+            for start in range(0, n, self.batch_size):
+                idx = order[start:start + self.batch_size]
+                W1, b1, W2, b2 = params
+                h = np.maximum(Xs[idx] @ W1 + b1, 0)
+                logits = h @ W2 + b2
+                p = np.exp(logits - logits.max(axis=1, keepdims=True))
+                p /= p.sum(axis=1, keepdims=True)
+
+                dlogits = (p - onehot[idx]) / len(idx)
+                dh = (dlogits @ W2.T) * (h > 0)
+                grads = [Xs[idx].T @ dh + self.weight_decay * W1, dh.sum(axis=0),
+                         h.T @ dlogits + self.weight_decay * W2, dlogits.sum(axis=0)]
+
+                self._step += 1
+                for i, g in enumerate(grads):
+                    m[i] = beta1 * m[i] + (1 - beta1) * g
+                    v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                    m_hat = m[i] / (1 - beta1 ** self._step)
+                    v_hat = v[i] / (1 - beta2 ** self._step)
+                    params[i] -= self.learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+
+        W1, b1, W2, b2 = params
+        # (x - mean) / scale @ W1 + b1 == x @ (W1 / scale) + (b1 - (mean / scale) @ W1)
+        self.W1 = (W1 / self._scale[:, None]).astype(np.float32)
+        self.b1 = (b1 - (self._mean / self._scale) @ W1).astype(np.float32)
+        self.W2 = W2.astype(np.float32)
+        self.b2 = b2.astype(np.float32)
+
+    def decision_function(self, X):
+        h = np.asarray(X, dtype=np.float32) @ self.W1
+        h += self.b1
+        np.maximum(h, 0, out=h)
+        logits = h @ self.W2
+        logits += self.b2
+        return logits
+
+    def predict_proba(self, X):
+        logits = self.decision_function(X)
+        p = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.decision_function(X).argmax(axis=1)]
+
+
+MODELS = {
+    'forest': lambda: RandomForestClassifier(),
+    'small_forest': lambda: RandomForestClassifier(n_estimators=30, max_depth=12, n_jobs=1, random_state=0),
+    'logistic': lambda: make_pipeline(StandardScaler(), LogisticRegression(C=10.0, max_iter=2000)),
+    'mlp': lambda: NumpyMLP(),
+}
+
+# Feature set a model trains on when none is given; the rest use DEFAULT_FEATURES
+MODEL_FEATURES = {
+    'logistic': 'wrist_normalized+fingertip_distances',
+}
+
+DEFAULT_MODEL = 'mlp'
+
+
+def make_model(name=DEFAULT_MODEL, feature_set=None):
+    """Unfitted model for rows of the given featurizer feature set, by default the model's own"""
+    if name not in MODELS:
+        raise ValueError(f"Unknown model {name!r}, expected one of {', '.join(MODELS)}")
+    model = MODELS[name]()
+    model.feature_set = feature_set or MODEL_FEATURES.get(name, DEFAULT_FEATURES)
+    return model
+
+
+def save_model(model, path='model.p', name=None):
+    with open(path, 'wb') as f:
+        pickle.dump({'model': model, 'name': name}, f)
+
+
+def load_model(path='model.p'):
+    with open(path, 'rb') as f:
+        return pickle.load(f)['model']
+
+
+def _forest_arrays(forest):
+    """Concatenate every tree's node arrays; child ids are offset to stay global"""
+    n_classes = len(forest.classes_)
+    parts = {name: [] for name in ('left', 'right', 'feature', 'threshold', 'value')}
+    roots = []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        roots.append(offset)
+        leaf = tree.children_left < 0
+        parts['left'].append(np.where(leaf, -1, tree.children_left + offset))
+        parts['right'].append(np.where(leaf, -1, tree.children_right + offset))
+        parts['feature'].append(np.where(leaf, 0, tree.feature))
+        parts['threshold'].append(tree.threshold)
+        value = tree.value.reshape(tree.node_count, n_classes)
+        parts['value'].append(value / value.sum(axis=1, keepdims=True))
+        offset += tree.node_count
+    arrays = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+    arrays['left'] = arrays['left'].astype(np.int32)
+    arrays['right'] = arrays['right'].astype(np.int32)
+    arrays['feature'] = arrays['feature'].astype(np.int32)
+    arrays['value'] = arrays['value'].astype(np.float32)
+    arrays['roots'] = np.array(roots, dtype=np.int32)
+    return arrays
+
+
+def export_arrays(model):
+    """(kind, classes, arrays) describing a fitted registry model"""
+    if isinstance(model, NumpyMLP):
+        return 'mlp', model.classes_, {'W1': model.W1, 'b1': model.b1, 'W2': model.W2, 'b2': model.b2}
+    if isinstance(model, RandomForestClassifier):
+        return 'forest', model.classes_, _forest_arrays(model)
+    if hasattr(model, 'steps'):
+        scaler, linear = (step for _, step in model.steps)
+        # ((x - mean) / scale) @ coef.T + b == x @ (coef / scale).T + (b - (mean / scale) @ coef.T)
+        coef = linear.coef_ / scaler.scale_
+        intercept = linear.intercept_ - coef @ scaler.mean_
+        if len(linear.classes_) == 2:
+            # Binary LogisticRegression keeps one row; softmax over (-z/2, z/2) matches its sigmoid
+            coef = np.vstack([-coef, coef]) / 2
+            intercept = np.concatenate([-intercept, intercept]) / 2
+        return 'linear', linear.classes_, {'coef': coef.T.copy(), 'intercept': intercept}
+    raise ValueError(f"Don't know how to export {type(model).__name__}")
+
+
+def export_model(model, path=DEFAULT_EXPORT_DIR):
+    """Write a fitted model as .npy arrays + meta.json for numpy_model.NumpyModel"""
+    kind, classes, arrays = export_arrays(model)
+    os.makedirs(path, exist_ok=True)
+    # meta.json goes last and is removed first, so a half-written export is never loaded
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for name in os.listdir(path):
+        if name.endswith('.npy'):
+            os.remove(os.path.join(path, name))
+    arrays['classes'] = np.asarray(classes, dtype=str)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(array))
+    with open(meta_path, 'w') as f:
+        json.dump({'kind': kind, 'features': feature_set_of(model)}, f)
@@ -0,0 +1,151 @@
+"""J and Z from fingertip trajectories, matched with DTW against letter templates.
+
+J is the I handshape with the pinky tip drawing a hook, Z the index finger
+drawing a Z; the static classifiers can only see the handshape. A
+MotionRecognizer keeps the last `window` frames of every tracked fingertip
+in a ring buffer and, on frames where a letter's handshape has been held
+for most of the window and its fingertip has travelled far enough, resamples
+that path to `points` evenly spaced points and compares it with the
+letter's templates by dynamic time warping:
+
+    motion = MotionRecognizer()
+    letter = motion.update(hand_array(hand_landmarks)) or classify(...)
+    motion.reset()                         # when the hand leaves the frame
+
+Paths are taken relative to their first point and scaled to a unit box, so
+templates are in arbitrary units; y grows downwards as in image coordinates.
+Each template is also matched mirrored, for either hand and flipped or
+unflipped frames. bench_motion_letters.py measures the per-frame cost and
+the hit / false-trigger rates.
+"""
+import math
+from itertools import accumulate
+
+import numpy as np
+
+from asl_rules import finger_states
+from featurizer import MIDDLE_MCP, WRIST
+
+# letter: (fingertip landmark, handshape over (thumb, index, middle, ring, pinky) as in asl_rules, strokes)
+MOTION_LETTERS = {
+    'J': (20, '.0001', [[(0, 0), (0, 0.7), (-0.15, 0.95), (-0.45, 1.0), (-0.7, 0.8)]]),
+    'Z': (8, '.1000', [[(0, 0), (1, 0), (0, 1), (1, 1)]]),
+}
+
+# Share of the alignment cost that comes from the direction of travel
+DIRECTION_WEIGHT = 0.5
+
+
+def _unit_path(points):
+    """Shift a (n, 2) path to start at the origin and scale its larger side to 1"""
+    points = np.asarray(points, dtype=np.float64)
+    points = points - points[0]
+    extent = np.ptp(points, axis=0).max()
+    return points / extent if extent > 0 else points
+
+
+def resample(path, points):
+    """(points, 2) positions evenly spaced along the arc length of a (n, 2) path"""
+    steps = np.sqrt((np.diff(path, axis=0) ** 2).sum(axis=1))
+    arc = np.concatenate([[0.0], np.cumsum(steps)])
+    if arc[-1] == 0:
+        return np.repeat(path[:1], points, axis=0)
+    at = np.linspace(0.0, arc[-1], points)
+    return np.stack([np.interp(at, arc, path[:, 0]), np.interp(at, arc, path[:, 1])], axis=1)
+
+
+def _directions(paths):
+    """Unit direction of travel at each point of (..., n, 2) paths"""
+    steps = np.diff(paths, axis=-2)
+    steps = np.concatenate([steps, steps[..., -1:, :]], axis=-2)
+    norms = np.sqrt((steps ** 2).sum(axis=-1, keepdims=True))
+    return steps / np.where(norms > 0, norms, 1.0)
+
+
+def _point_costs(path, directions, templates, template_directions):
+    """(templates, n, m) alignment costs: distance between points plus, weighted by
+    DIRECTION_WEIGHT, between directions of travel, so a straight swipe does not
+    pass for a stroke that turns"""
+    position = np.sqrt(((path[None, :, None, :] - templates[:, None, :, :]) ** 2).sum(axis=-1))
+    direction = np.sqrt(((directions[None, :, None, :] - template_directions[:, None, :, :]) ** 2).sum(axis=-1))
+    return position + DIRECTION_WEIGHT * direction
+
+
+def dtw_distance(cost):
+    """Mean step cost of the cheapest monotonic alignment through an (n, m) cost matrix"""
+    n, m = cost.shape
+    rows = cost.tolist()
+    prev = list(accumulate(rows[0]))
+    for i in range(1, n):
+        row = rows[i]
+        cur = [prev[0] + row[0]]
+        for j in range(1, m):
+            cur.append(row[j] + min(prev[j - 1], prev[j], cur[j - 1]))
+        prev = cur
+    return prev[-1] / (n + m)
+
+
+class MotionRecognizer:
+    def __init__(self, window=24, points=12, threshold=0.18, min_travel=0.6, min_pose=0.6):
+        """window in frames (~0.8 s at 30 fps); min_travel in hand lengths (wrist to middle knuckle);
+        min_pose is the share of the window the letter's handshape must be held"""
+        self.window = window
+        self.points = points
+        self.threshold = threshold
+        self.min_travel = min_travel
+        self.min_pose = min_pose
+        self.letters = list(MOTION_LETTERS)
+        self.tips = np.array([MOTION_LETTERS[letter][0] for letter in self.letters])
+        care = [[c != '.' for c in MOTION_LETTERS[letter][1]] for letter in self.letters]
+        want = [[c == '1' for c in MOTION_LETTERS[letter][1]] for letter in self.letters]
+        self._care, self._want = np.array(care), np.array(want)
+        # (letters, templates, points, 2): every stroke resampled once, plain and mirrored
+        templates = []
+        for letter in self.letters:
+            strokes = [resample(_unit_path(s), points) for s in MOTION_LETTERS[letter][2]]
+            templates.append(strokes + [s * (-1, 1) for s in strokes])
+        self.templates = np.array(templates)
+        self.directions = _directions(self.templates)
+        self._tips = np.zeros((window, len(self.letters), 2))
+        self._pose = np.zeros((window, len(self.letters)), dtype=bool)
+        self._scale = np.zeros(window)
+        self.reset()
+
+    def reset(self):
+        self._filled = 0
+        self._position = 0
+        self._pose[:] = False
+        self.distances = {}
+
+    def update(self, landmarks):
+        """Add one (21, 3) hand; returns 'J' or 'Z' on the frame the motion completes, else None"""
+        i = self._position
+        self._tips[i] = landmarks[self.tips, :2]
+        self._pose[i] = ((finger_states(landmarks) == self._want) | ~self._care).all(axis=1)
+        self._scale[i] = math.hypot(landmarks[MIDDLE_MCP, 0] - landmarks[WRIST, 0],
+                                    landmarks[MIDDLE_MCP, 1] - landmarks[WRIST, 1])
+        self._position = (i + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        if self._filled < self.window:
+            return None
+
+        self.distances = {}
+        held = self._pose.mean(axis=0) >= self.min_pose
+        if not held.any():
+            return None
+        order = np.roll(np.arange(self.window), -self._position)
+        scale = float(np.median(self._scale)) or 1.0
+        for k in np.flatnonzero(held):
+            path = self._tips[order, k]
+            steps = np.sqrt((np.diff(path, axis=0) ** 2).sum(axis=1))
+            if steps.sum() / scale < self.min_travel:
+                continue
+            path = resample(_unit_path(path), self.points)
+            cost = _point_costs(path, _directions(path), self.templates[k], self.directions[k])
+            distance = min(dtw_distance(c) for c in cost)
+            self.distances[self.letters[k]] = distance
+            if distance <= self.threshold:
+                # Start over so one stroke is reported once
+                self.reset()
+                return self.letters[k]
+        return None
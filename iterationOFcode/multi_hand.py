@@ -0,0 +1,107 @@
+"""Two-hand mode: stable per-hand IDs across frames and one classifier call per frame.
+
+MediaPipe lists the hands it finds in no particular order, so "hand 0" can
+swap between frames. HandTracks gives each visible hand a slot id in
+range(max_hands) and keeps it while the hand stays near where it was, so a
+slot can be routed to its own output -- a second servo hand, or its own
+label on the display:
+
+    tracks = HandTracks(max_hands=2)
+    landmarks, handedness = results_landmarks(results)   # (H, 21, 3), (H,)
+    ids = tracks.update(landmarks, handedness)           # slot per row
+    proba = model.predict_proba(minshift_features(landmarks))  # all hands at once
+"""
+import math
+from itertools import chain
+
+import numpy as np
+
+from featurizer import MIDDLE_MCP, NUM_LANDMARKS, WRIST
+from landmark_store import HANDEDNESS_CODES, HANDEDNESS_UNKNOWN
+
+MAX_HANDS = 2
+
+
+def results_landmarks(results, max_hands=MAX_HANDS):
+    """(H, 21, 3) landmarks and (H,) handedness codes of the hands in a Hands.process result"""
+    hands = (getattr(results, 'multi_hand_landmarks', None) or [])[:max_hands]
+    if not hands:
+        return np.empty((0, NUM_LANDMARKS, 3)), np.empty(0, dtype=np.int8)
+    handedness = np.full(len(hands), HANDEDNESS_UNKNOWN, dtype=np.int8)
+    for i, entry in enumerate((getattr(results, 'multi_handedness', None) or [])[:len(hands)]):
+        handedness[i] = HANDEDNESS_CODES.get(entry.classification[0].label, HANDEDNESS_UNKNOWN)
+    xyz = np.fromiter(chain.from_iterable((lm.x, lm.y, lm.z) for hand in hands for lm in hand.landmark),
+                      dtype=np.float64, count=len(hands) * NUM_LANDMARKS * 3)
+    return xyz.reshape(len(hands), NUM_LANDMARKS, 3), handedness
+
+
+def hand_boxes(landmarks, width, height, margin=10):
+    """(H, 4) int pixel boxes x1, y1, x2, y2 around each hand"""
+    xy = landmarks[:, :, :2]
+    low = xy.min(axis=1) * (width, height) - margin
+    high = xy.max(axis=1) * (width, height) + margin
+    return np.concatenate([low, high], axis=1).astype(int)
+
+
+class HandTracks:
+    def __init__(self, max_hands=MAX_HANDS, max_distance=0.25, max_missing=5, handedness_penalty=0.1):
+        """max_distance: how far (in image widths) a palm may move between frames and keep its id;
+        max_missing: frames a slot is kept for a hand that has disappeared"""
+        self.max_hands = max_hands
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.handedness_penalty = handedness_penalty
+        # Per slot: last palm centre, handedness code, frames since last seen (None = free)
+        self.centers = [(0.0, 0.0)] * max_hands
+        self.handedness = [HANDEDNESS_UNKNOWN] * max_hands
+        self.missing = [None] * max_hands
+
+    def reset(self):
+        self.missing = [None] * self.max_hands
+
+    def update(self, landmarks, handedness=None):
+        """Slot id for each of the (H, 21, 3) hands, matching slots to the nearest palms"""
+        # Plain floats: with two hands NumPy's per-call overhead would dominate
+        centers = ((landmarks[:, WRIST, :2] + landmarks[:, MIDDLE_MCP, :2]) / 2).tolist()
+        handedness = [HANDEDNESS_UNKNOWN] * len(centers) if handedness is None else handedness.tolist()
+        live = [slot for slot in range(self.max_hands) if self.missing[slot] is not None]
+
+        def cost(row, slot):
+            (x, y), (sx, sy) = centers[row], self.centers[slot]
+            penalty = 0.0
+            if HANDEDNESS_UNKNOWN not in (handedness[row], self.handedness[slot]) and \
+                    handedness[row] != self.handedness[slot]:
+                penalty = self.handedness_penalty
+            return math.hypot(x - sx, y - sy) + penalty
+
+        # Closest pairs first; a hand too far from every slot starts a new one
+        pairs = sorted((cost(row, slot), row, slot) for row in range(len(centers)) for slot in live)
+        best = {}
+        for distance, row, slot in pairs:
+            if distance <= self.max_distance and row not in best and slot not in best.values():
+                best[row] = slot
+
+        ids = []
+        for row in range(len(centers)):
+            slot = best.get(row)
+            if slot is None:
+                # New hand: lowest free slot, else the longest-missing unmatched one
+                free = [s for s in range(self.max_hands) if self.missing[s] is None and s not in ids]
+                stale = sorted((s for s in live if s not in best.values() and s not in ids),
+                               key=lambda s: -self.missing[s])
+                candidates = free + stale
+                if not candidates:
+                    ids.append(None)
+                    continue
+                slot = candidates[0]
+            ids.append(slot)
+            self.centers[slot] = centers[row]
+            self.handedness[slot] = handedness[row]
+            self.missing[slot] = 0
+
+        for slot in live:
+            if slot not in ids:
+                self.missing[slot] += 1
+                if self.missing[slot] > self.max_missing:
+                    self.missing[slot] = None
+        return ids
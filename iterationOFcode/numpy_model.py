@@ -0,0 +1,103 @@
+"""Pure-NumPy runtime for classifiers exported by model_registry.export_model.
+
+An exported model is a directory of .npy arrays plus meta.json; loading it
+imports nothing but NumPy, so the inference scripts start without pulling in
+scikit-learn and scipy, and the arrays are memory-mapped rather than read.
+
+    meta.json       {"kind": "forest" | "linear" | "mlp",
+                     "features": featurizer feature set the model expects, "minshift" if absent}
+    classes.npy     (C,) str
+
+    forest: left.npy, right.npy (node ids, -1 at leaves), feature.npy,
+            threshold.npy, value.npy (nodes, C) leaf class probabilities,
+            roots.npy (T,) first node of each tree
+    linear: coef.npy (F, C), intercept.npy (C,)
+    mlp:    W1.npy, b1.npy, W2.npy, b2.npy
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+
+from featurizer import DEFAULT_FEATURES
+
+DEFAULT_EXPORT_DIR = 'model'
+
+
+def _softmax(logits):
+    p = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return p / p.sum(axis=1, keepdims=True)
+
+
+class NumpyModel:
+    def __init__(self, kind, arrays, classes, feature_set=DEFAULT_FEATURES):
+        self.kind = kind
+        self.arrays = arrays
+        self.classes_ = classes
+        self.feature_set = feature_set
+
+    @classmethod
+    def load(cls, path=DEFAULT_EXPORT_DIR, mmap_mode='r'):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('transform'):
+            # Logistic models used to carry their own shape_features step; they now train on a feature set
+            raise ValueError(f"{path} was exported with the {meta['transform']!r} transform, which is gone; "
+                             "retrain with train_clasifier.py --model logistic")
+        arrays = {}
+        for name in os.listdir(path):
+            if name.endswith('.npy') and name != 'classes.npy':
+                # Plain ndarray views of the maps: np.memmap adds per-operation overhead
+                arrays[name[:-4]] = np.asarray(np.load(os.path.join(path, name), mmap_mode=mmap_mode))
+        classes = np.load(os.path.join(path, 'classes.npy'))
+        return cls(meta['kind'], arrays, classes, meta.get('features', DEFAULT_FEATURES))
+
+    @staticmethod
+    def exists(path=DEFAULT_EXPORT_DIR):
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    def _forest_proba(self, X):
+        a = self.arrays
+        # Split thresholds are float32 values; compare in float32 as sklearn does
+        X = X.astype(np.float32)
+        left, right, feature, threshold = a['left'], a['right'], a['feature'], a['threshold']
+        # Walk every (sample, tree) pair down one level per iteration
+        nodes = np.broadcast_to(a['roots'], (len(X), len(a['roots']))).copy()
+        rows = np.arange(len(X))[:, None]
+        while True:
+            inner = left[nodes] >= 0
+            if not inner.any():
+                break
+            go_left = X[rows, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(inner, np.where(go_left, left[nodes], right[nodes]), nodes)
+        return a['value'][nodes].mean(axis=1)
+
+    def _scores(self, X):
+        """Class probabilities for forests, logits for linear and MLP models"""
+        a = self.arrays
+        if self.kind == 'forest':
+            return self._forest_proba(np.asarray(X))
+        if self.kind == 'linear':
+            return np.asarray(X, dtype=np.float64) @ a['coef'] + a['intercept']
+        if self.kind == 'mlp':
+            h = np.asarray(X, dtype=np.float32) @ a['W1']
+            h += a['b1']
+            np.maximum(h, 0, out=h)
+            return h @ a['W2'] + a['b2']
+        raise ValueError(f"Unknown exported model kind {self.kind!r}")
+
+    def predict_proba(self, X):
+        scores = self._scores(X)
+        return scores if self.kind == 'forest' else _softmax(scores)
+
+    def predict(self, X):
+        return self.classes_[self._scores(X).argmax(axis=1)]
+
+
+def load_classifier(export_dir=DEFAULT_EXPORT_DIR, pickle_path='./model.p'):
+    """The exported model if there is one, else the pickled model.p (needs sklearn)"""
+    if NumpyModel.exists(export_dir):
+        return NumpyModel.load(export_dir)
+    with open(pickle_path, 'rb') as f:
+        return pickle.load(f)['model']
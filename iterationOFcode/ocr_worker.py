@@ -0,0 +1,156 @@
+"""Background OCR for asl2.py's TEXT mode, run only when the scene changes.
+
+asl2.py used to threshold, blur and run pytesseract on every camera frame on
+the display thread, freezing the window for hundreds of milliseconds per
+frame and saving a new timestamped file for every hit. OCRWorker instead:
+
+    - shrinks each submitted frame to a 32x24 grayscale thumbnail (about
+      0.3 ms) and drops it when at most `threshold` of the thumbnail's
+      pixels changed since the last frame sent on: nothing changed,
+    - answers a changed scene it has already read from an LRU cache of
+      thumbnails,
+    - otherwise hands the frame to a background thread through a one-slot
+      LatestQueue, so a newer frame replaces one still waiting,
+    - calls on_text only when the text read differs from the last text
+      passed to it, so holding a page up saves it once.
+
+The OCR function is a parameter: tesseract_ocr by default, or any
+frame -> letters-or-None callable, e.g. a stand-in for testing without
+Tesseract.
+
+    worker = OCRWorker(on_text=lambda letters: detector.save_to_file(letters, 'text')).start()
+    worker.submit(frame)          # every frame; returns at once
+    letters = worker.latest       # last text read, for the overlay
+
+bench_ocr_worker.py compares frame-loop latency with the synchronous loop.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from pipeline import LatestQueue
+
+THUMBNAIL_SIZE = (32, 24)
+# A pixel changed when it moved by more than PIXEL_THRESHOLD gray levels; the scene
+# changed when more than CHANGE_THRESHOLD of the pixels did (2 of 32x24)
+PIXEL_THRESHOLD = 64
+CHANGE_THRESHOLD = 0.0025
+
+
+def frame_signature(frame, size=THUMBNAIL_SIZE):
+    """Grayscale thumbnail of frame, the cheap stand-in for it when looking for changes"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def signature_distance(a, b, pixel_threshold=PIXEL_THRESHOLD):
+    """Fraction of thumbnail pixels that changed by more than pixel_threshold,
+    after taking out an overall brightness shift (auto exposure)"""
+    diff = a.astype(np.int16) - b
+    diff -= int(np.median(diff))
+    return np.count_nonzero(np.abs(diff) > pixel_threshold) / diff.size
+
+
+def tesseract_ocr(frame):
+    """Letters pytesseract reads in frame (Otsu threshold, median blur, --psm 11), or None"""
+    import pytesseract
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    gray = cv2.medianBlur(gray, 3)
+    text = pytesseract.image_to_string(gray, config='--psm 11')
+    letters = list(text.upper().replace(' ', '').replace('\n', ''))
+    return letters or None
+
+
+class OCRWorker:
+    def __init__(self, ocr=tesseract_ocr, on_text=None, threshold=CHANGE_THRESHOLD, cache_size=64):
+        """ocr: frame -> list of letters or None; on_text(letters) is called, from the
+        worker thread or from submit on a cache hit, whenever a read differs from
+        the previous one passed to it"""
+        self.ocr = ocr
+        self.on_text = on_text
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.latest = None
+        self.last_signature = None
+        self.last_text = None
+        self.frames = self.unchanged = self.cache_hits = self.reads = self.errors = 0
+        self.last_read_s = 0.0
+        self.queue = LatestQueue(1)
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='ocr', daemon=True)
+        self.thread.start()
+        return self
+
+    def _cached(self, signature):
+        """(True, letters) for a cached scene within threshold, most recently used first, else (False, None)"""
+        with self.lock:
+            for key, (cached, letters) in reversed(self.cache.items()):
+                if signature_distance(signature, cached) <= self.threshold:
+                    self.cache.move_to_end(key)
+                    return True, letters
+        return False, None
+
+    def submit(self, frame):
+        """Offer a frame; returns 'unchanged', 'cached' or 'queued'"""
+        self.frames += 1
+        signature = frame_signature(frame)
+        last = self.last_signature
+        if last is not None and signature_distance(signature, last) <= self.threshold:
+            self.unchanged += 1
+            return 'unchanged'
+        self.last_signature = signature
+        hit, letters = self._cached(signature)
+        if hit:
+            self.cache_hits += 1
+            self._publish(letters)
+            return 'cached'
+        self.queue.put((signature, frame.copy()))
+        return 'queued'
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            signature, frame = item
+            start = time.perf_counter()
+            try:
+                letters = self.ocr(frame)
+            except Exception as e:
+                print(f"OCR failed: {e}")
+                self.errors += 1
+                continue
+            self.last_read_s = time.perf_counter() - start
+            self.reads += 1
+            with self.lock:
+                self.cache[signature.tobytes()] = (signature, letters)
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            self._publish(letters)
+
+    def _publish(self, letters):
+        with self.lock:
+            self.latest = letters
+            changed = bool(letters) and letters != self.last_text
+            if changed:
+                self.last_text = letters
+        if changed and self.on_text is not None:
+            self.on_text(letters)
+
+    def stop(self):
+        self.queue.close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def summary(self):
+        return (f"OCR: {self.frames} frames, {self.unchanged} unchanged, {self.cache_hits} cached, "
+                f"{self.reads} read (last {self.last_read_s * 1e3:.0f}ms), {self.errors} failed")
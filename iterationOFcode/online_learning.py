@@ -0,0 +1,172 @@
+"""Learn from confirmed live predictions while the inference loop keeps running.
+
+The operator confirms the letter on screen, or types the right one. Each
+confirmation is one labelled landmark sample. OnlineTrainer queues it, and
+a background thread:
+
+    - updates a copy of the model with partial_fit on the new samples plus
+      `replay` random samples from the landmark store, so the model does not
+      drift towards the last few letters shown,
+    - swaps the copy in: the loop reads trainer.model on every frame, so the
+      next frame already uses it,
+    - appends the samples to the landmark store on disk and, every
+      `save_every` samples, re-exports the model for the next start.
+
+    trainer = OnlineTrainer(model, store_path='landmarks')
+    trainer.start()
+    proba = trainer.model.predict_proba(features)     # in the loop
+    trainer.confirm(xyz, class_name)                  # on a keypress
+
+A model without partial_fit (a forest, or an exported NumPy copy) is
+replaced by a NumpyMLP trained on the store on the background thread; the
+loop keeps using the old model until that is done.
+"""
+import copy
+import queue
+import threading
+import time
+
+import numpy as np
+
+from featurizer import compute_features, feature_set_of
+from landmark_store import DEFAULT_STORE_DIR, HANDEDNESS_UNKNOWN, LandmarkStore
+
+
+class OnlineTrainer:
+    def __init__(self, model, store_path=DEFAULT_STORE_DIR, export_dir=None, replay=64, passes=3,
+                 save_every=10, seed=0):
+        self.model = model
+        self.store_path = store_path
+        self.export_dir = export_dir
+        self.replay = replay
+        self.passes = passes
+        self.save_every = save_every
+        self.rng = np.random.default_rng(seed)
+        # Store sources are live:<session>/<n>, n counting up for the whole run, so no two
+        # confirmations share one (landmark_extraction keys the store by source)
+        now = time.time()
+        self.session = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'.{int(now * 1000) % 1000:03d}'
+        self.stored = 0
+        self.store = None
+        self.samples = queue.Queue()
+        self.updates = 0
+        self.errors = 0
+        self.confirmed = 0
+        self.unsaved = 0
+        self.last_update_s = 0.0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def confirm(self, landmarks, class_name, handedness=HANDEDNESS_UNKNOWN, score=1.0):
+        """Queue one (21, 3) hand as an example of class_name (a model.classes_ entry)"""
+        self.samples.put((np.array(landmarks, dtype=np.float32), str(class_name), handedness, score))
+        self.confirmed += 1
+
+    def _load(self):
+        if LandmarkStore.exists(self.store_path):
+            self.store = LandmarkStore.open(self.store_path, mmap_mode=None)
+        else:
+            self.store = LandmarkStore.empty()
+        if not hasattr(self.model, 'partial_fit'):
+            from model_registry import make_model
+            if not len(self.store):
+                print(f"Model has no partial_fit and there is no landmark store at {self.store_path}; "
+                      "not learning")
+                return False
+            print("Model has no partial_fit; training an MLP on the landmark store first...")
+            # Same classes_ in the same order, so the loop's decoder columns still line up
+            rows = np.flatnonzero(np.isin(self.store.label_names(), self.model.classes_))
+            feature_set = feature_set_of(self.model)
+            mlp = make_model('mlp', feature_set).fit(self.store.features(rows, feature_set),
+                                                     self.store.label_names(rows))
+            if not np.array_equal(mlp.classes_, self.model.classes_):
+                print("The landmark store lacks some of the model's classes; not learning")
+                return False
+            self.model = mlp
+        return True
+
+    def _drain(self):
+        batch = [self.samples.get()]
+        while not self.samples.empty():
+            batch.append(self.samples.get())
+        return batch
+
+    def _run(self):
+        if not self._load():
+            self.running = False
+            return
+        while self.running:
+            batch = self._drain()
+            stopping = None in batch
+            batch = [sample for sample in batch if sample is not None]
+            if not batch:
+                break
+            try:
+                self._learn(batch)
+            except Exception as e:
+                # Keep the thread alive: the next confirmations may well be fine
+                print(f"\nOnline learning failed on {len(batch)} samples: {e!r}")
+                self.errors += 1
+            if stopping:
+                break
+
+    def _learn(self, batch):
+        landmarks, class_names, handedness, score = (list(column) for column in zip(*batch))
+        start = time.perf_counter()
+        self._update(np.stack(landmarks), np.array(class_names))
+        self.last_update_s = time.perf_counter() - start
+
+        sources = [f'live:{self.session}/{n}' for n in range(self.stored, self.stored + len(batch))]
+        self.store = self.store.append(landmarks, class_names, sources, handedness, score)
+        self.stored += len(batch)
+        self.unsaved += len(batch)
+        if self.unsaved >= self.save_every:
+            self.save()
+
+    def _update(self, landmarks, class_names):
+        model = copy.deepcopy(self.model)
+        classes = model.classes_
+        known = np.isin(class_names, classes)
+        if not known.all():
+            print(f"Ignoring samples of classes the model does not have: {sorted(set(class_names[~known].tolist()))}")
+        feature_set = feature_set_of(model)
+        X, y = compute_features(landmarks[known], feature_set), class_names[known]
+        if not len(X):
+            return
+        # Only stored rows of the model's classes: partial_fit rejects any other label
+        replayable = np.flatnonzero(np.isin(self.store.label_names(), classes))
+        for _ in range(self.passes):
+            replay = self.rng.choice(replayable, min(self.replay, len(replayable)), replace=False)
+            model.partial_fit(np.concatenate([X, self.store.features(replay, feature_set)]),
+                              np.concatenate([y, self.store.label_names(replay)]), classes=classes)
+        # One reference assignment: the loop sees the old model or the new one, never half of each
+        self.model = model
+        self.updates += 1
+
+    def save(self):
+        """Write the grown store and, with export_dir, the updated model"""
+        if self.store is None:
+            return
+        self.store.save(self.store_path)
+        if self.export_dir:
+            from model_registry import export_model
+            export_model(self.model, self.export_dir)
+        self.unsaved = 0
+
+    def stop(self):
+        self.running = False
+        self.samples.put(None)
+        if self.thread is not None:
+            self.thread.join(timeout=30)
+        if self.unsaved:
+            self.save()
+
+    def status(self):
+        return (f"learned {self.confirmed} samples, {self.updates} updates, "
+                f"last {self.last_update_s * 1e3:.0f}ms" + (f", {self.errors} failed" if self.errors else ""))
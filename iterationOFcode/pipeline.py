@@ -0,0 +1,245 @@
+"""Threaded capture -> landmark -> classify -> display pipeline for the camera loops.
+
+Each stage runs on its own thread and hands frames to the next one through a
+LatestQueue, a small bounded queue that drops its oldest item when full. A
+slow stage therefore always picks up the freshest frame instead of working
+through a backlog, and camera I/O overlaps with MediaPipe and the classifier
+instead of adding to them. Display stays on the calling thread because
+cv2.imshow has to run there on most platforms.
+
+    pipeline = Pipeline(open_source(args.video), [('landmark', landmark), ('classify', classify)])
+    for packet in pipeline:
+        ...draw packet.image, cv2.imshow...
+    print(pipeline.summary())
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item instead of blocking the producer.
+
+    With lossless=True it blocks like a normal queue instead, which is what a
+    benchmark over a video file wants when every frame should be processed.
+    """
+
+    def __init__(self, maxsize=1, lossless=False):
+        self.maxsize = maxsize
+        self.lossless = lossless
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if self.lossless:
+                self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+            if self.closed:
+                return
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Next item, or None on timeout or once the queue is closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FpsMeter:
+    """Rolling frames-per-second over roughly `window` seconds"""
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.fps = 0.0
+        self.total = 0
+        self._count = 0
+        self._start = time.perf_counter()
+
+    def tick(self):
+        self.total += 1
+        self._count += 1
+        now = time.perf_counter()
+        elapsed = now - self._start
+        if elapsed >= self.window:
+            self.fps = self._count / elapsed
+            self._count = 0
+            self._start = now
+
+
+class FramePacket:
+    """One camera frame and whatever the stages attach to it on the way through"""
+
+    def __init__(self, index, image):
+        self.index = index
+        self.image = image
+        self.captured_at = time.perf_counter()
+        self.results = None
+        self.prediction = None
+        # Set by session_log.ReplaySource: results were logged, skip MediaPipe
+        self.replayed = False
+        # (name, perf_counter) per finished step, for latency_trace
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+
+def open_source(video=None, camera=0, replay=None, speed=0.0):
+    """cv2.VideoCapture on a video file when one is given, otherwise on a camera.
+
+    With replay, a session_log.ReplaySource over that log instead (paired
+    with the video's frames, if a video is also given).
+    """
+    if replay:
+        from session_log import ReplaySource
+        return ReplaySource(replay, video, speed)
+    return cv2.VideoCapture(video if video else camera)
+
+
+class Pipeline:
+    """Runs capture and each (name, fn) stage on its own thread.
+
+    A stage fn takes a FramePacket and returns it (or None to drop the frame).
+    Iterating the pipeline yields finished packets on the calling thread, which
+    is where display and keyboard handling belong.
+    """
+
+    def __init__(self, source, stages, queue_size=1, lossless=False, end_on_failure=None, trace=None):
+        self.source = source
+        # Optional latency_trace.LatencyTrace, fed every packet that reaches display
+        self.trace = trace
+        self.stages = list(stages)
+        # Reading a file can fail only at the end; a camera read can fail transiently
+        is_file = source.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        self.end_on_failure = is_file if end_on_failure is None else end_on_failure
+        self.queues = [LatestQueue(queue_size, lossless) for _ in range(len(self.stages) + 1)]
+        self.meters = {name: FpsMeter() for name in ['capture'] + [n for n, _ in self.stages] + ['display']}
+        self.error = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._started_at = None
+        self._stopped_at = None
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._threads = [threading.Thread(target=self._capture, name='capture', daemon=True)]
+        for i, (name, fn) in enumerate(self.stages):
+            self._threads.append(threading.Thread(
+                target=self._run_stage, args=(name, fn, self.queues[i], self.queues[i + 1]),
+                name=name, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        if self._stopped_at is None:
+            self._stopped_at = time.perf_counter()
+        self._stop.set()
+        for q in self.queues:
+            q.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1)
+
+    def __iter__(self):
+        if not self._threads:
+            self.start()
+        meter = self.meters['display']
+        try:
+            while True:
+                packet = self.queues[-1].get()
+                if packet is None:
+                    break
+                meter.tick()
+                packet.mark('display')
+                if self.trace is not None:
+                    self.trace.finish(packet)
+                yield packet
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise self.error
+
+    def _capture(self):
+        meter = self.meters['capture']
+        # Replay sources hand over whole packets, landmarks included
+        read_packet = getattr(self.source, 'read_packet', None)
+        index = 0
+        backoff = 0.0
+        while not self._stop.is_set():
+            if read_packet is not None:
+                packet = read_packet(index)
+            else:
+                ok, image = self.source.read()
+                packet = FramePacket(index, image) if ok else None
+            if packet is None:
+                if self.end_on_failure:
+                    break
+                # A camera that keeps failing (unplugged) is retried less and less often, up to 0.5 s
+                backoff = min(max(backoff * 2, 0.01), 0.5)
+                self._stop.wait(backoff)
+                continue
+            backoff = 0.0
+            meter.tick()
+            self.queues[0].put(packet)
+            index += 1
+        self.queues[0].close()
+
+    def _run_stage(self, name, fn, inbox, outbox):
+        meter = self.meters[name]
+        while True:
+            packet = inbox.get()
+            if packet is None:
+                break
+            try:
+                packet = fn(packet)
+            except Exception as e:
+                self.error = e
+                self._stop.set()
+                break
+            meter.tick()
+            if packet is not None:
+                packet.mark(name)
+                outbox.put(packet)
+        outbox.close()
+
+    def fps(self):
+        """Current per-stage FPS, in pipeline order"""
+        return {name: meter.fps for name, meter in self.meters.items()}
+
+    def summary(self):
+        now = self._stopped_at or time.perf_counter()
+        elapsed = now - (self._started_at or now)
+        # 'dropped' counts frames a stage produced that the next stage never saw
+        lines = [f"{'stage':<10} {'frames':>7} {'avg fps':>8} {'dropped':>8}"]
+        for i, (name, meter) in enumerate(self.meters.items()):
+            dropped = self.queues[i].dropped if i < len(self.queues) else 0
+            avg = meter.total / elapsed if elapsed > 0 else 0.0
+            lines.append(f"{name:<10} {meter.total:>7} {avg:>8.1f} {dropped:>8}")
+        return '\n'.join(lines)
+
+    def draw_fps(self, image, origin=(10, 20)):
+        """Overlay the per-stage FPS in the image corner"""
+        x, y = origin
+        for name, fps in self.fps().items():
+            cv2.putText(image, f"{name}: {fps:.1f} fps", (x, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+            y += 18
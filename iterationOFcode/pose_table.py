@@ -0,0 +1,142 @@
+"""Letter poses for the servo hand: defaults, calibration.conf overrides and hot reload.
+
+Each C++ program used to hardcode its own letter table and re-parse
+calibration.conf with std::stoi every time ./hand_test started. PoseTable
+parses the file once into a read-only (26, 5) uint16 array, row
+ord(letter) - ord('A'), so a lookup is one index. It re-checks the file's
+mtime at most every `check_interval` seconds and, when it changed, parses
+it into a new array and swaps it in with a single assignment -- a reader
+sees the old table or the new one, never a mix -- so recalibrating a
+letter takes effect without restarting the daemon or the inference loop:
+
+    table = PoseTable('calibration.conf')
+    table.pose('A')        # -> (263, 150, 150, 150, 150)
+    table.as_dict()        # {'A': (...), ...} for SpellingScheduler
+
+calibration.conf lines are LETTER,thumb,index,middle,ring,pinky in PWM
+off-counts; invalid lines are reported and the default kept.
+"""
+import os
+import time
+
+import numpy as np
+
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, NUM_FINGERS
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+CALIBRATION_FILE = 'calibration.conf'
+
+FINGER_HALF_BENT = 263
+FINGER_MOSTLY_BENT = 190
+
+_S, _B, _H, _M = FINGER_STRAIGHT, FINGER_BENT, FINGER_HALF_BENT, FINGER_MOSTLY_BENT
+
+# Format: (thumb, index, middle, ring, pinky), as in hardcoded_sign_language_hand.cpp
+DEFAULT_LETTER_POSES = {
+    'A': (_H, _B, _B, _B, _B),
+    'B': (_B, _S, _S, _S, _S),
+    'C': (_H, _H, _H, _H, _H),
+    'D': (_H, _S, _B, _B, _B),
+    'E': (_H, _M, _M, _M, _M),
+    'F': (_S, _B, _S, _S, _S),
+    'G': (_S, _S, _B, _B, _B),
+    'H': (_S, _S, _S, _B, _B),
+    'I': (_H, _B, _B, _B, _S),
+    'J': (_H, _B, _B, _B, _S),  # Handshape only: J is I drawn with the pinky
+    'K': (_S, _S, _S, _B, _B),
+    'L': (_S, _S, _B, _B, _B),
+    'M': (_B, _B, _B, _B, _B),
+    'N': (_B, _B, _B, _B, _B),
+    'O': (_H, _M, _M, _M, _M),
+    'P': (_S, _S, _B, _B, _B),
+    'Q': (_S, _S, _B, _B, _B),
+    'R': (_H, _S, _S, _B, _B),
+    'S': (_H, _B, _B, _B, _B),
+    'T': (_B, _B, _B, _B, _B),
+    'U': (_H, _S, _S, _B, _B),
+    'V': (_B, _S, _S, _B, _B),
+    'W': (_B, _S, _S, _S, _B),
+    'X': (_H, _H, _B, _B, _B),
+    'Y': (_S, _B, _B, _B, _S),
+    'Z': (_H, _S, _B, _B, _B),  # Handshape only: Z is drawn with the index finger
+}
+
+
+def load_letter_poses(calibration_file=CALIBRATION_FILE):
+    """Default poses overridden by any valid lines of calibration.conf (A,263,150,150,150,150)"""
+    poses = dict(DEFAULT_LETTER_POSES)
+    if not os.path.exists(calibration_file):
+        print("No calibration file found, using default positions")
+        return poses
+
+    calibrated = 0
+    with open(calibration_file) as f:
+        for line in f:
+            fields = line.strip().split(',')
+            letter = fields[0].upper()
+            if letter not in poses or len(fields) != NUM_FINGERS + 1:
+                continue
+            try:
+                positions = tuple(int(v) for v in fields[1:])
+            except ValueError:
+                print(f"Warning: Invalid calibration data format for letter {letter}, using default position")
+                continue
+            if all(FINGER_BENT <= p <= FINGER_STRAIGHT for p in positions):
+                poses[letter] = positions
+                calibrated += 1
+            else:
+                print(f"Warning: Invalid position value for letter {letter}, using default position")
+    print(f"Loaded {calibrated} calibrated letter positions")
+    return poses
+
+
+class PoseTable:
+    def __init__(self, calibration_file=CALIBRATION_FILE, check_interval=1.0):
+        self.calibration_file = calibration_file
+        self.check_interval = check_interval
+        self.version = 0
+        self._checked = time.monotonic()
+        self._mtime = self._file_mtime()
+        self.poses = self._load()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.calibration_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        poses = load_letter_poses(self.calibration_file)
+        table = np.array([poses[letter] for letter in LETTERS], dtype=np.uint16)
+        table.flags.writeable = False
+        return table
+
+    def reload_if_changed(self):
+        """Re-read calibration.conf if its mtime changed; True when the table was replaced"""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        mtime = self._file_mtime()
+        if mtime == self._mtime:
+            return False
+        # Note the mtime first: an edit landing during the parse triggers another reload
+        self._mtime = mtime
+        print(f"{self.calibration_file} changed, reloading letter poses")
+        self.poses = self._load()
+        self.version += 1
+        return True
+
+    def pose(self, letter):
+        """(thumb, index, middle, ring, pinky) for a letter, or None if it is not A-Z"""
+        self.reload_if_changed()
+        row = ord(letter.upper()) - ord('A') if len(letter) == 1 else -1
+        if not 0 <= row < len(LETTERS):
+            return None
+        return tuple(self.poses[row].tolist())
+
+    def as_dict(self):
+        self.reload_if_changed()
+        poses = self.poses
+        return {letter: tuple(row) for letter, row in zip(LETTERS, poses.tolist())}
@@ -0,0 +1,99 @@
+"""Run MediaPipe Hands on a crop around last frame's hand instead of the whole frame.
+
+The inference scripts build Hands(static_image_mode=True), so every frame
+pays for palm detection over the full camera image. RoiLandmarker keeps the
+box around the hands it found last frame, grown by `margin` and squared
+up, and on the next frame converts and processes only that crop,
+downscaled so its longer side is at most `size` pixels. Landmarks are
+mapped back into full-frame normalized coordinates, so featurization,
+drawing and session logs see exactly what a full-frame call would give.
+When the crop comes back empty -- the hand moved out of it or left -- the
+same frame is processed whole (downscaled to `full_width`) and tracking
+starts again from there:
+
+    landmarker = RoiLandmarker(hands)
+    results = landmarker.process(frame_bgr)   # instead of hands.process(rgb)
+
+The crop moves between frames, so MediaPipe's own tracking cannot follow
+it; keep static_image_mode=True with this class. bench_roi.py compares it
+with full-frame processing on a video.
+"""
+import cv2
+
+
+class RoiLandmarker:
+    def __init__(self, hands, margin=0.3, size=256, full_width=640, min_side=0.15, crop=True):
+        """margin: share of the hand box added on every side; min_side: smallest crop, as a
+        share of the frame's shorter side, so a small or edge-on hand still has context;
+        crop=False processes every frame whole, for comparison or multi-hand use"""
+        self.hands = hands
+        self.crop = crop
+        self.margin = margin
+        self.size = size
+        self.full_width = full_width
+        self.min_side = min_side
+        self.box = None
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0
+
+    def reset(self):
+        self.box = None
+
+    def _process(self, image):
+        return self.hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    def _downscale(self, image, longest):
+        h, w = image.shape[:2]
+        if max(h, w) <= longest:
+            return image
+        scale = longest / max(h, w)
+        return cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))),
+                          interpolation=cv2.INTER_AREA)
+
+    def _next_box(self, results, width, height):
+        """Square pixel box x1, y1, x2, y2 around all hands plus margin, clamped to the frame"""
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        x1, x2 = min(xs) * width, max(xs) * width
+        y1, y2 = min(ys) * height, max(ys) * height
+        side = max(x2 - x1, y2 - y1) * (1 + 2 * self.margin)
+        side = min(max(side, self.min_side * min(width, height)), width, height)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        left = int(min(max(cx - side / 2, 0), width - side))
+        top = int(min(max(cy - side / 2, 0), height - side))
+        return left, top, left + int(side), top + int(side)
+
+    def process(self, image):
+        """Hands.process results for a BGR frame, in full-frame coordinates"""
+        height, width = image.shape[:2]
+        if self.box is not None:
+            x1, y1, x2, y2 = self.box
+            results = self._process(self._downscale(image[y1:y2, x1:x2], self.size))
+            if results.multi_hand_landmarks:
+                # Crop-normalized -> frame-normalized; z shares x's scale
+                sx, sy = (x2 - x1) / width, (y2 - y1) / height
+                ox, oy = x1 / width, y1 / height
+                for hand in results.multi_hand_landmarks:
+                    for lm in hand.landmark:
+                        lm.x = lm.x * sx + ox
+                        lm.y = lm.y * sy + oy
+                        lm.z = lm.z * sx
+                self.box = self._next_box(results, width, height)
+                self.roi_frames += 1
+                return results
+            self.lost += 1
+
+        # No box yet or the hand left it: look at the whole frame
+        results = self._process(self._downscale(image, self.full_width))
+        if self.crop and results.multi_hand_landmarks:
+            self.box = self._next_box(results, width, height)
+        else:
+            self.box = None
+        self.full_frames += 1
+        return results
+
+    def summary(self):
+        total = self.roi_frames + self.full_frames
+        return (f"roi {self.roi_frames}/{total} frames, full frame {self.full_frames} "
+                f"({self.lost} after losing the hand)")
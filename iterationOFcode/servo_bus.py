@@ -0,0 +1,214 @@
+"""PCA9685 servo driver shared by the Python hand controllers.
+
+PCA9685 wraps anything with the smbus.SMBus byte and i2c block interface. It
+turns on the chip's register auto-increment (MODE1 AI) so one block write
+covers the four LEDn registers of a channel, or a whole run of channels, and
+it caches the last value per channel so unchanged fingers cost nothing. A
+five-finger pose is one I2C transaction instead of twenty.
+
+ServoWriter puts a controller behind its own thread that writes only the
+latest target pose at a fixed rate, so input and vision loops never block on
+the bus.
+
+FakeBus is an in-memory stand-in with the same interface that counts
+transactions, so the servo code can run, be tested and be benchmarked on a
+laptop without /dev/i2c-1.
+"""
+import threading
+import time
+
+I2C_ADDR = 0x40
+
+# PCA9685 registers
+MODE1 = 0x00
+PRESCALE = 0xFE
+LED0_ON_L = 0x06
+
+MODE1_RESTART = 0x80
+MODE1_AI = 0x20
+MODE1_SLEEP = 0x10
+
+# smbus block transfers carry at most 32 data bytes, i.e. 8 channels
+MAX_BLOCK_CHANNELS = 8
+
+# Servo positions (PWM off-counts at 50 Hz)
+FINGER_STRAIGHT = 375
+FINGER_BENT = 150
+NUM_FINGERS = 5
+
+
+class FakeBus:
+    """In-memory SMBus stand-in: a 256-byte register file per address.
+
+    Counts transactions and payload bytes; transaction_delay simulates the time
+    one I2C transaction takes on the wire.
+    """
+
+    def __init__(self, transaction_delay=0.0):
+        self.transaction_delay = transaction_delay
+        self.registers = {}
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def _regs(self, addr):
+        return self.registers.setdefault(addr, bytearray(256))
+
+    def _transaction(self):
+        self.transactions += 1
+        if self.transaction_delay:
+            time.sleep(self.transaction_delay)
+
+    def write_byte_data(self, addr, reg, value):
+        self._transaction()
+        self.bytes_written += 1
+        self._regs(addr)[reg] = value & 0xFF
+
+    def write_i2c_block_data(self, addr, reg, values):
+        if len(values) > 32:
+            raise ValueError('smbus block transfers are limited to 32 bytes')
+        self._transaction()
+        self.bytes_written += len(values)
+        regs = self._regs(addr)
+        # Only consecutive with MODE1 auto-increment on, as on the real chip
+        step = 1 if regs[MODE1] & MODE1_AI else 0
+        for i, value in enumerate(values):
+            regs[reg + i * step] = value & 0xFF
+
+    def read_byte_data(self, addr, reg):
+        self._transaction()
+        return self._regs(addr)[reg]
+
+    def pwm(self, addr, channel):
+        """Off-count currently held in a channel's LEDn_OFF registers"""
+        regs = self._regs(addr)
+        reg = LED0_ON_L + 4 * channel
+        return regs[reg + 2] | (regs[reg + 3] << 8)
+
+    def close(self):
+        pass
+
+
+def open_bus(fake=False, bus_number=1):
+    if fake:
+        return FakeBus()
+    import smbus
+    return smbus.SMBus(bus_number)
+
+
+class PCA9685:
+    def __init__(self, bus, address=I2C_ADDR, freq=50, channels=16):
+        self.bus = bus
+        self.address = address
+        # Last off-count written per channel; None until first written
+        self.values = [None] * channels
+        self.init_controller(freq)
+
+    def init_controller(self, freq=50):
+        self.bus.write_byte_data(self.address, MODE1, MODE1_AI)
+        time.sleep(0.05)
+        prescale = int(25000000.0 / 4096.0 / freq - 1)
+        old_mode = self.bus.read_byte_data(self.address, MODE1)
+        self.bus.write_byte_data(self.address, MODE1, (old_mode & 0x7F) | MODE1_SLEEP)
+        self.bus.write_byte_data(self.address, PRESCALE, prescale)
+        self.bus.write_byte_data(self.address, MODE1, old_mode)
+        time.sleep(0.05)
+        self.bus.write_byte_data(self.address, MODE1, old_mode | MODE1_RESTART | MODE1_AI)
+        self.values = [None] * len(self.values)
+
+    def _write_channels(self, first, values):
+        """One block transfer over the LEDn registers of consecutive channels"""
+        block = []
+        for value in values:
+            block += [0, 0, value & 0xFF, value >> 8]
+        self.bus.write_i2c_block_data(self.address, LED0_ON_L + 4 * first, block)
+        self.values[first:first + len(values)] = values
+
+    def set_pwm(self, channel, value):
+        value = int(value)
+        if self.values[channel] != value:
+            self._write_channels(channel, [value])
+
+    def set_pose(self, positions):
+        """Set channels 0..len(positions)-1 to the given off-counts.
+
+        Channels that already hold their value are skipped; the rest go out as
+        one block spanning the first to the last changed channel.
+        """
+        positions = [int(p) for p in positions]
+        changed = [ch for ch, value in enumerate(positions) if self.values[ch] != value]
+        if not changed:
+            return
+        first, last = changed[0], changed[-1]
+        for start in range(first, last + 1, MAX_BLOCK_CHANNELS):
+            end = min(start + MAX_BLOCK_CHANNELS, last + 1)
+            self._write_channels(start, positions[start:end])
+
+
+class ServoWriter:
+    """Thread that owns a PCA9685 and drives it toward the latest target pose.
+
+    Producers call set_target() and never touch the bus. The target is a single
+    slot replaced by assignment, so intermediate poses are coalesced: each tick
+    of `rate` Hz writes only the newest one. Fingers ramp toward it together,
+    at most max_step counts per tick (None jumps straight there).
+    """
+
+    def __init__(self, controller, rate=100, max_step=None, pose=None):
+        self.controller = controller
+        self.period = 1.0 / rate
+        self.max_step = max_step
+        self.current = list(pose or (FINGER_STRAIGHT,) * NUM_FINGERS)
+        self.target = (tuple(self.current), False)
+        self.updates = 0
+        self.writes = 0
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='servo-writer', daemon=True)
+
+    def start(self):
+        self.controller.set_pose(self.current)
+        self.thread.start()
+        return self
+
+    def set_target(self, pose, snap=False):
+        """Aim for pose; snap=True skips the ramp (e.g. a reset)"""
+        self.target = (tuple(int(p) for p in pose), snap)
+        self.updates += 1
+        self.wake.set()
+
+    def _step(self):
+        target, snap = self.target
+        if snap or self.max_step is None:
+            self.current = list(target)
+            return
+        self.current = [c + max(-self.max_step, min(self.max_step, t - c))
+                        for c, t in zip(self.current, target)]
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self.stopped.is_set():
+            if tuple(self.current) == self.target[0]:
+                # Idle until a new target arrives
+                self.wake.wait()
+                self.wake.clear()
+                next_tick = time.perf_counter()
+                continue
+            self._step()
+            self.controller.set_pose(self.current)
+            self.writes += 1
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stop(self, pose=None):
+        """Stop the thread, optionally writing a final pose first"""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        if pose is not None:
+            self.current = list(pose)
+            self.controller.set_pose(self.current)
@@ -0,0 +1,100 @@
+"""Client for servo_daemon.py, the long-lived process that owns the servo bus.
+
+Every message, request or reply, is one fixed 12-byte frame:
+
+    struct '<BB5H'  ->  opcode/status, argument, 5 x uint16 finger positions
+
+Requests: OP_POSE (positions), OP_LETTER (argument = ASCII letter),
+OP_RESET and OP_PING. The daemon answers each request with STATUS_OK or an
+error status plus the pose the hand is now holding, so a call returns once
+the servos have been written.
+"""
+import os
+import socket
+import struct
+import threading
+
+DEFAULT_SOCKET = os.environ.get('ASL_SERVO_SOCKET', '/tmp/asl_servo.sock')
+
+FRAME = struct.Struct('<BB5H')
+
+OP_POSE = 1
+OP_LETTER = 2
+OP_RESET = 3
+OP_PING = 4
+
+STATUS_OK = 0
+STATUS_UNKNOWN_LETTER = 1
+STATUS_BAD_REQUEST = 2
+
+
+class ServoError(Exception):
+    pass
+
+
+def recv_frame(sock):
+    data = b''
+    while len(data) < FRAME.size:
+        chunk = sock.recv(FRAME.size - len(data))
+        if not chunk:
+            raise ConnectionError('servo daemon closed the connection')
+        data += chunk
+    return FRAME.unpack(data)
+
+
+class ServoClient:
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        self.sock = None
+        # One request/reply in flight at a time when threads share a client
+        self.lock = threading.Lock()
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+        return self
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        return self.connect() if self.sock is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, opcode, arg=0, positions=(0, 0, 0, 0, 0)):
+        frame = FRAME.pack(opcode, arg, *positions)
+        with self.lock:
+            # Reconnect once if the daemon was restarted since the last call
+            for attempt in (0, 1):
+                try:
+                    if self.sock is None:
+                        self.connect()
+                    self.sock.sendall(frame)
+                    status, _, *pose = recv_frame(self.sock)
+                    break
+                except (ConnectionError, FileNotFoundError):
+                    self.close()
+                    if attempt:
+                        raise
+        if status == STATUS_UNKNOWN_LETTER:
+            raise ServoError(f"No pose for letter {chr(arg)!r}")
+        if status != STATUS_OK:
+            raise ServoError(f"Servo daemon rejected request (status {status})")
+        return pose
+
+    def set_pose(self, positions):
+        """Move all five fingers; returns the pose the hand now holds"""
+        return self._request(OP_POSE, 0, [int(p) for p in positions])
+
+    def show_letter(self, letter):
+        return self._request(OP_LETTER, ord(letter.upper()))
+
+    def reset(self):
+        return self._request(OP_RESET)
+
+    def ping(self):
+        return self._request(OP_PING)
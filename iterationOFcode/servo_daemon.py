@@ -0,0 +1,120 @@
+"""Long-lived servo controller: owns the I2C bus and serves pose commands.
+
+The inference scripts used to spawn ./hand_test (or ./hand_mirror) for every
+letter, which re-opened /dev/i2c-1, re-initialized the PCA9685 and re-parsed
+calibration.conf each time. This process does all of that once and then
+accepts servo_client frames over a Unix socket.
+
+    python servo_daemon.py                 # real bus, /tmp/asl_servo.sock
+    python servo_daemon.py --fake          # in-memory bus, for laptops and benchmarks
+    python servo_daemon.py --fake --letter A   # one-shot, what ./hand_test A used to do
+"""
+import argparse
+import os
+import socket
+import threading
+
+from pose_table import CALIBRATION_FILE, PoseTable
+from servo_bus import FINGER_BENT, FINGER_STRAIGHT, NUM_FINGERS, PCA9685, open_bus
+from servo_client import (DEFAULT_SOCKET, FRAME, OP_LETTER, OP_PING, OP_POSE, OP_RESET,
+                          STATUS_BAD_REQUEST, STATUS_OK, STATUS_UNKNOWN_LETTER, recv_frame)
+
+REST_POSE = (FINGER_STRAIGHT,) * NUM_FINGERS
+
+
+class ServoDaemon:
+    def __init__(self, controller, pose_table, socket_path=DEFAULT_SOCKET):
+        """pose_table: a pose_table.PoseTable, so calibration.conf edits apply while serving"""
+        self.controller = controller
+        self.pose_table = pose_table
+        self.socket_path = socket_path
+        self.pose = REST_POSE
+        self.lock = threading.Lock()
+        self.server = None
+
+    def apply(self, opcode, arg, positions):
+        """Run one request against the bus; returns (status, pose)"""
+        if opcode == OP_POSE:
+            pose = tuple(max(FINGER_BENT, min(FINGER_STRAIGHT, p)) for p in positions)
+        elif opcode == OP_LETTER:
+            pose = self.pose_table.pose(chr(arg))
+            if pose is None:
+                return STATUS_UNKNOWN_LETTER, self.pose
+        elif opcode == OP_RESET:
+            pose = REST_POSE
+        elif opcode == OP_PING:
+            return STATUS_OK, self.pose
+        else:
+            return STATUS_BAD_REQUEST, self.pose
+
+        with self.lock:
+            self.controller.set_pose(pose)
+            self.pose = pose
+        return STATUS_OK, pose
+
+    def handle_client(self, conn):
+        with conn:
+            while True:
+                try:
+                    opcode, arg, *positions = recv_frame(conn)
+                except ConnectionError:
+                    return
+                status, pose = self.apply(opcode, arg, positions)
+                try:
+                    conn.sendall(FRAME.pack(status, arg, *pose))
+                except ConnectionError:
+                    return  # Client went away before reading the reply
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        print(f"Servo daemon listening on {self.socket_path}")
+        try:
+            while True:
+                conn, _ = self.server.accept()
+                threading.Thread(target=self.handle_client, args=(conn,), daemon=True).start()
+        except OSError:
+            pass  # shutdown() closed the listening socket
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servo controller daemon for the robotic hand')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--calibration', default=CALIBRATION_FILE)
+    parser.add_argument('--fake', action='store_true', help='use an in-memory bus instead of /dev/i2c-1')
+    parser.add_argument('--letter', help='show one letter and exit instead of serving')
+    args = parser.parse_args()
+
+    controller = PCA9685(open_bus(args.fake))
+    daemon = ServoDaemon(controller, PoseTable(args.calibration), args.socket)
+
+    if args.letter:
+        status, pose = daemon.apply(OP_LETTER, ord(args.letter[0]), ())
+        if status != STATUS_OK:
+            raise SystemExit(f"Letter configuration not found: {args.letter}")
+        print(f"Displaying letter {args.letter.upper()}: {pose}")
+        return
+
+    controller.set_pose(REST_POSE)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping servo daemon")
+    finally:
+        daemon.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""Binary log of per-frame MediaPipe hands, and a capture source that replays it.
+
+Record a live session once, then run the same detector, classifier and
+servo-mapping code against it repeatedly without a camera or a hand:
+
+    python asl.py --record session.asllog            # live, also writes the log
+    python asl.py --replay session.asllog --headless # as fast as the stages go
+
+Layout (little endian):
+
+    header  b'ASLSESS1', uint16 width, uint16 height, float64 unix start time
+    frame   uint32 index, float64 seconds since start, uint8 hand count
+    hand    int8 handedness (landmark_store codes), float32 score,
+            21 x 3 float32 landmark x, y, z
+
+Landmarks are stored exactly as the recording script saw them, so replay a log
+with the script (or at least the image flip) that recorded it.
+"""
+import argparse
+import struct
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from asl_rules import classify
+from featurizer import NUM_LANDMARKS
+from landmark_store import HANDEDNESS_CODES, HANDEDNESS_UNKNOWN
+from pipeline import FramePacket
+
+MAGIC = b'ASLSESS1'
+HEADER = struct.Struct('<HHd')
+FRAME = struct.Struct('<IdB')
+HAND = struct.Struct('<bf')
+HAND_SIZE = HAND.size + NUM_LANDMARKS * 3 * 4
+
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+
+class SessionRecorder:
+    def __init__(self, path, width=0, height=0):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.start = time.time()
+        self.start_perf = time.perf_counter()
+        self.frames = 0
+        self.file.write(MAGIC + HEADER.pack(width, height, self.start))
+
+    def write_frame(self, index, timestamp, hands):
+        """hands: (xyz (21, 3), handedness code, score) per hand"""
+        chunks = [FRAME.pack(index, timestamp, len(hands))]
+        for xyz, handedness, score in hands:
+            chunks.append(HAND.pack(handedness, score))
+            chunks.append(np.asarray(xyz, dtype='<f4').tobytes())
+        self.file.write(b''.join(chunks))
+        self.frames += 1
+
+    def record(self, packet):
+        """Log a FramePacket whose .results came from MediaPipe Hands.process"""
+        results = packet.results
+        hands = []
+        for i, hand_landmarks in enumerate(getattr(results, 'multi_hand_landmarks', None) or []):
+            xyz = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+            handedness, score = HANDEDNESS_UNKNOWN, 1.0
+            if getattr(results, 'multi_handedness', None):
+                classification = results.multi_handedness[i].classification[0]
+                handedness = HANDEDNESS_CODES.get(classification.label, HANDEDNESS_UNKNOWN)
+                score = classification.score
+            hands.append((xyz, handedness, score))
+        self.write_frame(packet.index, packet.captured_at - self.start_perf, hands)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionLog:
+    """A whole log parsed into arrays.
+
+    frame_index, timestamps, hand_counts are (F,); hand_frame maps each of the
+    H logged hands to its frame, with landmarks (H, 21, 3), handedness and
+    score (H,).
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a session log")
+        self.width, self.height, self.started_at = HEADER.unpack_from(data, len(MAGIC))
+
+        frames, hand_offsets, hand_frame = [], [], []
+        offset = len(MAGIC) + HEADER.size
+        while offset + FRAME.size <= len(data):
+            index, timestamp, count = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            if offset + count * HAND_SIZE > len(data):
+                break  # Truncated last frame from a session that was killed
+            frames.append((index, timestamp, count))
+            for _ in range(count):
+                hand_offsets.append(offset)
+                hand_frame.append(len(frames) - 1)
+                offset += HAND_SIZE
+
+        frames = np.array(frames, dtype=np.float64).reshape(-1, 3)
+        self.frame_index = frames[:, 0].astype(np.int64)
+        self.timestamps = frames[:, 1]
+        self.hand_counts = frames[:, 2].astype(np.int64)
+        self.hand_frame = np.array(hand_frame, dtype=np.int64)
+
+        hand_dtype = np.dtype([('handedness', 'i1'), ('score', '<f4'),
+                               ('landmarks', '<f4', (NUM_LANDMARKS, 3))])
+        buffer = memoryview(data)
+        records = np.frombuffer(b''.join(buffer[start:start + HAND_SIZE] for start in hand_offsets),
+                                dtype=hand_dtype)
+        self.landmarks = records['landmarks']
+        self.handedness = records['handedness']
+        self.score = records['score']
+        self._first_hand = np.cumsum(self.hand_counts) - self.hand_counts
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def hands(self, frame):
+        """(xyz, handedness, score) for each hand logged in frame number `frame`"""
+        first = self._first_hand[frame]
+        return [(self.landmarks[i], int(self.handedness[i]), float(self.score[i]))
+                for i in range(first, first + self.hand_counts[frame])]
+
+    def first_hands(self):
+        """(frames with a hand, (F', 21, 3) landmarks of the first hand in each), for batch re-scoring"""
+        frames = np.flatnonzero(self.hand_counts)
+        return frames, self.landmarks[self._first_hand[frames]]
+
+
+def _proto_types():
+    try:
+        from mediapipe.framework.formats import classification_pb2, landmark_pb2
+        return landmark_pb2, classification_pb2
+    except ImportError:
+        return None, None
+
+
+class _Landmark:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Record:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class ReplayResults:
+    """Looks like the object Hands.process returns: multi_hand_landmarks, multi_handedness.
+
+    Uses MediaPipe's protobuf messages when they are importable, so
+    drawing_utils works on replayed hands; otherwise plain objects with the
+    same attributes.
+    """
+
+    landmark_pb2, classification_pb2 = _proto_types()
+
+    def __init__(self, hands):
+        self.multi_hand_landmarks = [self._landmarks(xyz) for xyz, _, _ in hands] or None
+        self.multi_handedness = [self._handedness(code, score) for _, code, score in hands] or None
+
+    def _landmarks(self, xyz):
+        points = xyz.tolist()
+        if self.landmark_pb2 is not None:
+            return self.landmark_pb2.NormalizedLandmarkList(
+                landmark=[self.landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in points])
+        return _Record(landmark=[_Landmark(x, y, z) for x, y, z in points])
+
+    def _handedness(self, code, score):
+        label = HANDEDNESS_LABELS.get(code, '')
+        if self.classification_pb2 is not None:
+            return self.classification_pb2.ClassificationList(
+                classification=[self.classification_pb2.Classification(label=label, score=score)])
+        return _Record(classification=[_Record(label=label, score=score)])
+
+
+class ReplaySource:
+    """Stands in for cv2.VideoCapture in a Pipeline, feeding logged hands.
+
+    Pipeline calls read_packet(), which returns FramePackets with .results
+    already filled in and .replayed set, so landmark stages skip MediaPipe.
+    Images come from `video` when given, frame for frame, otherwise blank
+    frames of the recorded size. speed=0 replays as fast as the stages take
+    frames; speed=1 keeps the recorded timing.
+    """
+
+    def __init__(self, path, video=None, speed=0.0):
+        self.log = SessionLog(path)
+        self.video = None
+        if video:
+            self.video = cv2.VideoCapture(video)
+        self.speed = speed
+        self.position = 0
+        self._start = None
+
+    def read_packet(self, index):
+        if self.position >= len(self.log):
+            return None
+        frame = self.position
+        self.position += 1
+        if self.speed > 0:
+            if self._start is None:
+                self._start = time.perf_counter() - self.log.timestamps[frame] / self.speed
+            delay = self._start + self.log.timestamps[frame] / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if self.video is not None:
+            ok, image = self.video.read()
+            if not ok:
+                return None
+        else:
+            image = np.zeros((self.log.height or 480, self.log.width or 640, 3), dtype=np.uint8)
+        packet = FramePacket(index, image)
+        packet.results = ReplayResults(self.log.hands(frame))
+        packet.replayed = True
+        return packet
+
+    def read(self):
+        packet = self.read_packet(self.position)
+        return (False, None) if packet is None else (True, packet.image)
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_COUNT: len(self.log),
+                cv2.CAP_PROP_FRAME_WIDTH: self.log.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.log.height}.get(prop, 0)
+
+    def set(self, prop, value):
+        return False
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        if self.video is not None:
+            self.video.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a session log')
+    parser.add_argument('log')
+    parser.add_argument('--rules', action='store_true', help='re-score the first hand of every frame with asl_rules')
+    args = parser.parse_args()
+
+    log = SessionLog(args.log)
+    duration = log.timestamps[-1] - log.timestamps[0] if len(log) > 1 else 0.0
+    print(f"{len(log)} frames, {len(log.landmarks)} hands, {log.width}x{log.height}, "
+          f"{duration:.1f}s recorded ({len(log) / duration if duration else 0:.1f} fps)")
+    if args.rules:
+        _, landmarks = log.first_hands()
+        print(dict(Counter(classify(landmarks)).most_common()))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,7 @@ private:
     static constexpr uint8_t MODE1 = 0x00;
     static constexpr uint8_t PRESCALE = 0xFE;
     static constexpr uint8_t LED0_ON_L = 0x06;
+    static constexpr uint8_t MODE1_AI = 0x20;  // Register auto-increment
     
     // Servo position constants
     static constexpr int FINGER_STRAIGHT = 375;  // Fully extended (0 degrees)
@@ -142,7 +143,7 @@ public:
         }
 
         // Initialize PCA9685
-        writeRegister(MODE1, 0x00);
+        writeRegister(MODE1, MODE1_AI);
         usleep(5000);
         setFrequency(50);  // 50Hz for servos
         
@@ -171,14 +172,40 @@ public:
         writeRegister(MODE1, oldmode);
         
         usleep(5000);
-        writeRegister(MODE1, oldmode | 0x80);
+        writeRegister(MODE1, oldmode | 0x80 | MODE1_AI);
+    }
+
+    // With MODE1_AI set, one write fills consecutive LEDn registers
+    bool writeChannels(uint8_t channel, const uint16_t* on, const uint16_t* off, int count) {
+        uint8_t buffer[1 + 4 * 16];
+        buffer[0] = LED0_ON_L + 4 * channel;
+        for (int i = 0; i < count; i++) {
+            buffer[1 + 4 * i] = on[i] & 0xFF;
+            buffer[2 + 4 * i] = on[i] >> 8;
+            buffer[3 + 4 * i] = off[i] & 0xFF;
+            buffer[4 + 4 * i] = off[i] >> 8;
+        }
+        int len = 1 + 4 * count;
+        if (write(i2c_fd, buffer, len) != len) {
+            std::cerr << "Failed to write channels " << (int)channel << ".."
+                      << (int)channel + count - 1 << std::endl;
+            return false;
+        }
+        return true;
     }
 
     void setPWM(uint8_t channel, uint16_t on, uint16_t off) {
-        writeRegister(LED0_ON_L + 4 * channel, on & 0xFF);
-        writeRegister(LED0_ON_L + 4 * channel + 1, on >> 8);
-        writeRegister(LED0_ON_L + 4 * channel + 2, off & 0xFF);
-        writeRegister(LED0_ON_L + 4 * channel + 3, off >> 8);
+        writeChannels(channel, &on, &off, 1);
+    }
+
+    // All five fingers in a single I2C transaction
+    void setPose(const std::vector<int>& positions) {
+        uint16_t on[5] = {0, 0, 0, 0, 0};
+        uint16_t off[5];
+        for (int finger = 0; finger < 5; finger++) {
+            off[finger] = positions[finger];
+        }
+        writeChannels(0, on, off, 5);
     }
 
     bool isLetterCalibrated(char letter) {
@@ -219,18 +246,12 @@ public:
         }
         std::cout << std::endl;
         
-        for (int finger = 0; finger < 5; finger++) {
-            setPWM(finger, 0, config.positions[finger]);
-            usleep(100000);  // Small delay between finger movements
-        }
+        setPose(config.positions);
     }
 
     void resetPosition() {
         std::cout << "Resetting to rest position..." << std::endl;
-        for (int finger = 0; finger < 5; finger++) {
-            setPWM(finger, 0, FINGER_STRAIGHT);
-            usleep(100000);
-        }
+        setPose(std::vector<int>(5, FINGER_STRAIGHT));
     }
 
     void testSequence() {
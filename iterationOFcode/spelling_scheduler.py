@@ -0,0 +1,162 @@
+"""Spell text on the servo hand as one timed pose timeline.
+
+spell_word used to show a letter, sleep a fixed 0.5-1 s and show the next,
+so every letter cost the same whether two fingers moved or none did. The
+scheduler compiles the text up front instead:
+
+    - TransitionTable holds, for every pair of letter poses, the time until
+      the new pose is legible -- every finger within `legible_within`
+      counts of it: the largest finger travel over the servo speed (all
+      five fingers move at once), plus a fixed settle time.
+    - compile_text walks the text, starting each letter's move as soon as
+      the previous letter has been legible for `hold` seconds. Spaces add
+      `word_gap`; a doubled letter is held for an extra `hold`.
+    - play sends the timeline's poses on time through any set_pose
+      (ServoClient.set_pose, a PCA9685, or SimulatedServos).
+
+    scheduler = SpellingScheduler(pose_table.as_dict())
+    timeline = scheduler.compile_text('hello world')
+    scheduler.play(timeline, servo.set_pose)
+
+bench_spelling.py compares words per minute with the old fixed-delay loop on
+simulated servos and checks every letter is actually held legibly.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from servo_bus import FINGER_STRAIGHT, NUM_FINGERS
+
+# Hobby servo at 5 V: about 0.1 s per 60 degrees, ~180 degrees over 150..375 counts
+SERVO_SPEED = 750.0
+SETTLE = 0.03
+LEGIBLE_WITHIN = 20
+HOLD = 0.25
+WORD_GAP = 0.6
+REST = '_'
+REST_POSE = (FINGER_STRAIGHT,) * NUM_FINGERS
+
+# at: when the pose is sent; legible_at: when every finger is within LEGIBLE_WITHIN of it
+Step = namedtuple('Step', 'at letter pose legible_at')
+Timeline = namedtuple('Timeline', 'steps duration skipped')
+
+
+class TransitionTable:
+    def __init__(self, letter_poses, speed=SERVO_SPEED, settle=SETTLE, legible_within=LEGIBLE_WITHIN,
+                 rest_pose=REST_POSE):
+        self.letters = [REST] + sorted(letter_poses)
+        self.index = {letter: i for i, letter in enumerate(self.letters)}
+        self.poses = np.array([rest_pose] + [letter_poses[letter] for letter in self.letters[1:]],
+                              dtype=np.float64)
+        travel = np.abs(self.poses[:, None, :] - self.poses[None, :, :]).max(axis=-1)
+        # (from, to) seconds until the new pose is legible; staying put costs nothing
+        self.seconds = np.where(travel > 0, np.maximum(travel - legible_within, 0) / speed + settle, 0.0)
+
+    def __call__(self, before, after):
+        """Seconds from letter `before` to `after`; from an unknown pose, the slowest way in"""
+        column = self.seconds[:, self.index[after]]
+        return float(column[self.index[before]] if before in self.index else column.max())
+
+
+class SpellingScheduler:
+    def __init__(self, letter_poses, speed=SERVO_SPEED, settle=SETTLE, legible_within=LEGIBLE_WITHIN,
+                 hold=HOLD, word_gap=WORD_GAP):
+        """hold: seconds a letter stays legible before the next move starts; keep
+        hold * speed above legible_within so each pose is fully reached by then"""
+        self.speed = speed
+        self.settle = settle
+        self.legible_within = legible_within
+        self.set_poses(letter_poses)
+        self.hold = hold
+        self.word_gap = word_gap
+        self.current = REST
+
+    def set_poses(self, letter_poses):
+        """Use new letter poses, e.g. after PoseTable reloaded calibration.conf"""
+        self.letter_poses = {letter.upper(): tuple(pose) for letter, pose in letter_poses.items()}
+        self.table = TransitionTable(self.letter_poses, self.speed, self.settle, self.legible_within)
+
+    def compile_text(self, text, start=None):
+        """Timeline for text, starting from letter `start` (default: where the last timeline ended)"""
+        previous = self.current if start is None else start
+        steps, skipped = [], []
+        t = 0.0
+        for char in text.upper():
+            if char.isspace():
+                t += self.word_gap
+                continue
+            if char not in self.letter_poses:
+                skipped.append(char)
+                continue
+            if char == previous:
+                # Same pose again: hold longer so the repeat can be read as two letters
+                t += self.hold
+            legible_at = t + self.table(previous, char)
+            steps.append(Step(t, char, self.letter_poses[char], legible_at))
+            t = legible_at + self.hold
+            previous = char
+        self.current = previous
+        return Timeline(steps, t, skipped)
+
+    def play(self, timeline, set_pose, on_letter=None, clock=time.perf_counter, sleep=time.sleep):
+        """Send each step's pose at its time; returns the seconds it took"""
+        start = clock()
+        for step in timeline.steps:
+            delay = start + step.at - clock()
+            if delay > 0:
+                sleep(delay)
+            set_pose(step.pose)
+            if on_letter is not None:
+                on_letter(step.letter)
+        delay = start + timeline.duration - clock()
+        if delay > 0:
+            sleep(delay)
+        return clock() - start
+
+
+class SimulatedServos:
+    """Five servos that each start `settle` s after a command and move toward it at `speed` counts/s.
+
+    set_pose stamps the command with the clock, so it can stand in for
+    ServoClient.set_pose during play; positions(times) replays the motion.
+    """
+
+    def __init__(self, clock, speed=SERVO_SPEED, settle=SETTLE, pose=REST_POSE):
+        self.clock = clock
+        self.speed = speed
+        self.settle = settle
+        self.initial = np.array(pose, dtype=np.float64)
+        self.commands = []
+
+    def set_pose(self, pose):
+        self.commands.append((self.clock(), tuple(pose)))
+
+    def positions(self, times):
+        """(T, 5) finger positions at the given times"""
+        times = np.asarray(times, dtype=np.float64)
+        out = np.tile(self.initial, (len(times), 1))
+        current = self.initial
+        begins = [at + self.settle for at, _ in self.commands] + [np.inf]
+        for (_, pose), begin, end in zip(self.commands, begins, begins[1:]):
+            target = np.array(pose, dtype=np.float64)
+            rows = (times >= begin) & (times < end)
+            reach = (times[rows] - begin)[:, None] * self.speed
+            out[rows] = current + np.clip(target - current, -reach, reach)
+            if np.isfinite(end):
+                reach = (end - begin) * self.speed
+                current = current + np.clip(target - current, -reach, reach)
+        return out
+
+
+class VirtualClock:
+    """clock/sleep pair that advances instantly, for simulated playback"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,177 @@
+"""Replay finger angles through each smoothing filter and report lag vs. jitter.
+
+    python tune_filters.py session.asllog [more.asllog ...] [--filters average:window=5 one_euro ...]
+    python tune_filters.py                      # synthetic hand motion with known truth
+
+The angles are mimic_fingers.py's (hand_kinematics 'mimic' layout) of the
+first hand in every frame of the logs, with the logged timestamps. Without a
+log, fingers hold random poses and flick between them in 80-300 ms, plus
+--noise degrees of tracking noise. The tuner compares each filter's output
+with a reference: the true angles when synthetic, otherwise a centred (no
+lag) 5-frame average of the raw angles.
+
+    lag      shift in ms that best lines the output up with the reference
+    jitter   RMS deviation from the reference while the finger is still
+             (slower than 20 deg/s for 200 ms either side)
+    error    RMS deviation from the reference overall
+    moves/s  servo moves per finger per still second, after mimic_fingers'
+             2-count deadband: the buzzing a user sees
+    us       cost of one five-finger update
+
+With logs, it also replays them through mimic_fingers' one-hand servo stage
+on a fake bus, as `mimic_fingers.py --replay` would.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from filters import RATE, make_filter
+from hand_kinematics import Kinematics
+from mimic_fingers import FingerAngles, RoboticHand, mimic_main_hand
+from session_log import ReplaySource, SessionLog
+
+FILTER_SPECS = [
+    'none',
+    'average:window=3',
+    'average:window=5',
+    'ema:alpha=0.5',
+    'ema:alpha=0.3',
+    'one_euro',
+    'one_euro:min_cutoff=1.0,beta=0.02',
+    'one_euro:min_cutoff=0.3,beta=0.1',
+    'kalman',
+    'kalman:process_noise=5000',
+]
+STILL_SPEED = 20.0  # deg/s below which a reference finger counts as still
+STILL_AROUND = 0.2
+DEADBAND = 2
+
+
+def logged_angles(paths, kinematics):
+    """(T, 5) angles and (T,) timestamps of the first hand of every frame that has one"""
+    angles, times, offset = [], [], 0.0
+    for path in paths:
+        log = SessionLog(path)
+        frames, landmarks = log.first_hands()
+        if not len(frames):
+            continue
+        timestamps = log.timestamps[frames]
+        angles.append(kinematics.angles(landmarks))
+        times.append(timestamps - timestamps[0] + offset)
+        offset = times[-1][-1] + 1.0
+    if not angles:
+        raise SystemExit("No hands in the given logs")
+    return np.concatenate(angles), np.concatenate(times)
+
+
+def synthetic_angles(seconds, rate, noise, seed=0):
+    """(T, 5) noisy angles, (T,) timestamps and the (T, 5) true angles"""
+    rng = np.random.default_rng(seed)
+    times = np.arange(0, seconds, 1.0 / rate)
+    truth = np.empty((len(times), 5))
+    for finger in range(5):
+        t, angle, knots = 0.0, rng.uniform(0, 100), []
+        while t < seconds:
+            hold, move = rng.uniform(0.3, 1.5), rng.uniform(0.08, 0.3)
+            target = rng.uniform(0, 100)
+            knots.append((t + hold, t + hold + move, angle, target))
+            t, angle = t + hold + move, target
+        truth[:, finger] = knots[0][2]
+        for start, end, begin, target in knots:
+            s = np.clip((times - start) / (end - start), 0, 1)
+            moving = times >= start
+            truth[moving, finger] = begin + (target - begin) * s[moving] * s[moving] * (3 - 2 * s[moving])
+    return truth + rng.normal(0, noise, truth.shape), times, truth
+
+
+def centred_average(angles, window=5):
+    kernel = np.ones(window) / window
+    padded = np.pad(angles, ((window // 2, window // 2), (0, 0)), mode='edge')
+    return np.stack([np.convolve(padded[:, i], kernel, mode='valid') for i in range(angles.shape[1])], axis=1)
+
+
+def run_filter(spec, angles, times):
+    smoother = make_filter(spec)
+    start = time.perf_counter()
+    out = np.array([smoother(sample, t) for sample, t in zip(angles, times)])
+    return out, (time.perf_counter() - start) / len(angles)
+
+
+def best_lag(out, reference, max_shift=15):
+    """Frames the output trails the reference by"""
+    errors = [np.mean((out[shift:] - reference[:len(reference) - shift]) ** 2) for shift in range(max_shift)]
+    return int(np.argmin(errors))
+
+
+def still_moves(out, still, servo_targets):
+    """Servo moves per frame while still, as RoboticHand.move_servos would send them"""
+    servo = servo_targets(out).astype(int)
+    position = servo[0].copy()
+    moves = 0
+    for row, quiet in zip(servo[1:], still[1:]):
+        moved = np.abs(row - position) > DEADBAND
+        position[moved] = row[moved]
+        moves += np.sum(moved & quiet)
+    return moves
+
+
+def replay_mimic(paths, spec):
+    """Replay the logs through mimic_fingers' one-hand servo stage on a fake bus;
+    returns (frames, frames with a hand, final servo positions)"""
+    tracker, robot = FingerAngles(1, spec), RoboticHand(fake=True)
+    frames = with_hand = 0
+    for path in paths:
+        source = ReplaySource(path)
+        packet = source.read_packet(frames)
+        while packet is not None:
+            mimic_main_hand(tracker, robot, packet)
+            frames += 1
+            with_hand += packet.prediction is not None
+            packet = source.read_packet(frames)
+    return frames, with_hand, robot.positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('logs', nargs='*', help='session logs to replay')
+    parser.add_argument('--filters', nargs='+', default=FILTER_SPECS)
+    parser.add_argument('--seconds', type=float, default=60.0, help='length of the synthetic run')
+    parser.add_argument('--rate', type=float, default=RATE, help='frame rate of the synthetic run')
+    parser.add_argument('--noise', type=float, default=2.0, help='synthetic tracking noise in degrees')
+    args = parser.parse_args()
+
+    kinematics = Kinematics.load('mimic')
+    if args.logs:
+        angles, times = logged_angles(args.logs, kinematics)
+        reference = centred_average(angles)
+        print(f"{len(angles)} frames from {len(args.logs)} logs, reference: centred 5-frame average")
+    else:
+        angles, times, reference = synthetic_angles(args.seconds, args.rate, args.noise)
+        print(f"{len(angles)} synthetic frames at {args.rate:g} fps, {args.noise:g} deg noise")
+    frame_s = np.median(np.diff(times))
+    # Still: slow for STILL_AROUND seconds either side, so catching up after a move isn't jitter
+    speed = np.abs(np.gradient(reference, times, axis=0))
+    around = max(int(round(STILL_AROUND / frame_s)), 1)
+    padded = np.pad(speed, ((around, around), (0, 0)), mode='edge')
+    still = np.lib.stride_tricks.sliding_window_view(padded, 2 * around + 1, axis=0).max(axis=-1) < STILL_SPEED
+
+    print(f"{'filter':40s} {'lag':>7s} {'jitter':>8s} {'error':>8s} {'moves/s':>8s} {'us':>6s}")
+    for spec in args.filters:
+        out, cost = run_filter(spec, angles, times)
+        residual = out - reference
+        jitter = np.sqrt(np.mean(residual[still] ** 2))
+        error = np.sqrt(np.mean(residual ** 2))
+        moves = still_moves(out, still, kinematics.servo_targets) / (still.sum() * frame_s)
+        print(f"{spec:40s} {best_lag(out, reference) * frame_s * 1e3:5.0f}ms {jitter:6.2f}deg "
+              f"{error:6.2f}deg {moves:8.2f} {cost * 1e6:6.1f}")
+
+    if args.logs:
+        # The same logs through the live code path, so a broken servo stage shows up here
+        frames, with_hand, positions = replay_mimic(args.logs, args.filters[-1])
+        print(f"mimic_fingers one-hand replay ({args.filters[-1]}): {frames} frames, "
+              f"{with_hand} with a hand, servos at {positions}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,17 @@
-import pickle
+import os
+import sys
 
 import cv2
 import mediapipe as mp
-import numpy as np
 
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'iterationOFcode'))
+
+from featurizer import Featurizer, feature_set_of
+from numpy_model import load_classifier
+from roi import RoiLandmarker
+
+# Exported NumPy arrays when present: no scikit-learn import at startup
+model = load_classifier()
 
 cap = cv2.VideoCapture(2)
 
@@ -14,21 +20,18 @@ mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
 hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+# Processes a crop around last frame's hand; the whole frame only when it is lost
+landmarker = RoiLandmarker(hands)
+featurizer = Featurizer(feature_set_of(model))
 
 labels_dict = {0: 'A', 1: 'B', 2: 'L'}
 while True:
 
-    data_aux = []
-    x_ = []
-    y_ = []
-
     ret, frame = cap.read()
 
     H, W, _ = frame.shape
 
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    results = hands.process(frame_rgb)
+    results = landmarker.process(frame)
     if results.multi_hand_landmarks:
         for hand_landmarks in results.multi_hand_landmarks:
             mp_drawing.draw_landmarks(
@@ -38,27 +41,11 @@ while True:
                 mp_drawing_styles.get_default_hand_landmarks_style(),
                 mp_drawing_styles.get_default_hand_connections_style())
 
-        for hand_landmarks in results.multi_hand_landmarks:
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-
-                x_.append(x)
-                y_.append(y)
-
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                data_aux.append(x - min(x_))
-                data_aux.append(y - min(y_))
-
-        x1 = int(min(x_) * W) - 10
-        y1 = int(min(y_) * H) - 10
-
-        x2 = int(max(x_) * W) - 10
-        y2 = int(max(y_) * H) - 10
+        # The classifier was trained on a single hand
+        features = featurizer(results.multi_hand_landmarks[0])
+        x1, y1, x2, y2 = featurizer.bbox(W, H)
 
-        prediction = model.predict([np.asarray(data_aux)])
+        prediction = model.predict(features)
 
         predicted_character = labels_dict[int(prediction[0])]
 
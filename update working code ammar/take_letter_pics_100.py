@@ -1,10 +1,15 @@
+import argparse
 import os
-import cv2
+import sys
 import time
 
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'iterationOFcode'))
+
+from landmark_store import DEFAULT_STORE_DIR, LandmarkStore
+
 DATA_DIR = './data'
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
 
 number_of_classes = 25
 dataset_size = 100
@@ -21,50 +26,139 @@ def find_working_camera():
             cap.release()
     return None
 
-# Initialize camera
-cap = find_working_camera()
-if cap is None:
-    print("No working camera found!")
-    exit()
+def wait_until_ready(cap):
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            print("Failed to grab frame")
+            return False
 
-try:
+        cv2.putText(frame, 'Ready? Press "Q" ! :)', (100, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 255, 0), 3,
+                    cv2.LINE_AA)
+        cv2.imshow('frame', frame)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            return True
+
+def capture_images(cap, data_dir):
     for j in range(number_of_classes):
-        if not os.path.exists(os.path.join(DATA_DIR, str(j))):
-            os.makedirs(os.path.join(DATA_DIR, str(j)))
-        
+        if not os.path.exists(os.path.join(data_dir, str(j))):
+            os.makedirs(os.path.join(data_dir, str(j)))
+
         print('Collecting data for class {}'.format(j))
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Failed to grab frame")
-                break
-                
-            cv2.putText(frame, 'Ready? Press "Q" ! :)', (100, 50), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 255, 0), 3,
-                        cv2.LINE_AA)
-            cv2.imshow('frame', frame)
-            
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            
+        if not wait_until_ready(cap):
+            break
+
         counter = 0
         while counter < dataset_size:
             ret, frame = cap.read()
             if not ret:
                 print("Failed to grab frame")
                 break
-                
+
             cv2.imshow('frame', frame)
             cv2.waitKey(1)
-            
-            cv2.imwrite(os.path.join(DATA_DIR, str(j), '{}.jpg'.format(counter)), frame)
+
+            cv2.imwrite(os.path.join(data_dir, str(j), '{}.jpg'.format(counter)), frame)
             counter += 1
-            
+
             # Add a small delay
             time.sleep(0.1)
 
-finally:
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+def capture_landmarks(cap, store_dir, rate, min_confidence, thumbnail_width):
+    """Run MediaPipe live and keep only the landmarks of good frames, class by class.
+
+    A frame is kept when it has exactly one hand whose handedness score is at
+    least min_confidence, and at most `rate` frames are kept per second. Each
+    class is appended to the store as soon as it is complete, so stopping
+    early loses at most the class being captured.
+    """
+    import mediapipe as mp
+    from landmark_extraction import results_to_sample
+
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                     min_detection_confidence=min_confidence,
+                                     min_tracking_confidence=min_confidence)
+    store = LandmarkStore.open(store_dir, mmap_mode=None) if LandmarkStore.exists(store_dir) \
+        else LandmarkStore.empty()
+    session = time.strftime('%Y%m%d-%H%M%S')
+    interval = 1.0 / rate
+
+    for j in range(number_of_classes):
+        label = str(j)
+        print('Collecting landmarks for class {}'.format(j))
+        if not wait_until_ready(cap):
+            break
+
+        landmarks, sources, handedness, scores = [], [], [], []
+        rejected = 0
+        last_kept = 0.0
+        while len(landmarks) < dataset_size:
+            ret, frame = cap.read()
+            if not ret:
+                print("Failed to grab frame")
+                break
+
+            # Frames between samples are still processed so tracking stays warm
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            sample = results_to_sample(results)
+            now = time.monotonic()
+            if sample is None or sample[2] < min_confidence:
+                rejected += 1
+            elif now - last_kept >= interval:
+                last_kept = now
+                source = f'capture:{session}/{label}/{len(landmarks)}'
+                if thumbnail_width:
+                    path = os.path.join(store_dir, 'thumbnails', session, label, f'{len(landmarks)}.jpg')
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    height = max(1, round(frame.shape[0] * thumbnail_width / frame.shape[1]))
+                    cv2.imwrite(path, cv2.resize(frame, (thumbnail_width, height), interpolation=cv2.INTER_AREA))
+                xyz, hand, score = sample
+                landmarks.append(xyz)
+                sources.append(source)
+                handedness.append(hand)
+                scores.append(score)
+
+            color = (0, 255, 0) if sample is not None else (0, 0, 255)
+            cv2.putText(frame, f'{label}: {len(landmarks)}/{dataset_size} (rejected {rejected})', (10, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2, cv2.LINE_AA)
+            cv2.imshow('frame', frame)
+            cv2.waitKey(1)
+
+        if landmarks:
+            store = store.append(landmarks, [label] * len(landmarks), sources, handedness, scores)
+            store.save(store_dir)
+        print(f"Class {label}: kept {len(landmarks)}, rejected {rejected} frames; store has {len(store)} samples")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Capture training data for every letter class')
+    parser.add_argument('--landmarks', action='store_true',
+                        help='run MediaPipe live and append landmarks to the landmark store instead of '
+                             'writing images (no create_dataset.py step needed)')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='image directory when capturing images')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='landmark store for --landmarks')
+    parser.add_argument('--rate', type=float, default=10.0, help='samples kept per second with --landmarks')
+    parser.add_argument('--min-confidence', type=float, default=0.7,
+                        help='reject frames whose hand is detected with a lower score')
+    parser.add_argument('--thumbnail', type=int, default=0, metavar='WIDTH',
+                        help='also save a WIDTH-pixel-wide JPEG of each kept frame under <store>/thumbnails')
+    args = parser.parse_args()
+
+    # Initialize camera
+    cap = find_working_camera()
+    if cap is None:
+        print("No working camera found!")
+        exit()
+
+    try:
+        if args.landmarks:
+            capture_landmarks(cap, args.store, args.rate, args.min_confidence, args.thumbnail)
+        else:
+            if not os.path.exists(args.data_dir):
+                os.makedirs(args.data_dir)
+            capture_images(cap, args.data_dir)
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()